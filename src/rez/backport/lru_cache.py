@@ -129,8 +129,24 @@ def lru_cache(maxsize=100):
                 root = nonlocal_root[0]
                 root[:] = [root, root, None, None]
 
+        def cache_discard(func):
+            """Remove the entries whose arguments satisfy `func(*args, **kwds)`"""
+            with lock:
+                for key in list(cache.keys()):
+                    args, kwds = key
+                    if not func(*args, **dict(kwds)):
+                        continue
+
+                    value = cache.pop(key)
+                    if maxsize:
+                        # unlink from the list of recently used keys
+                        link_prev, link_next = value[PREV], value[NEXT]
+                        link_prev[NEXT] = link_next
+                        link_next[PREV] = link_prev
+
         wrapper.__wrapped__ = user_function
         wrapper.cache_clear = cache_clear
+        wrapper.cache_discard = cache_discard
         return update_wrapper(wrapper, user_function)
 
     return decorating_function
@@ -169,6 +169,13 @@ def run_rez_interpret():
     return run("interpret")
 
 
+@scriptname("rez-index")
+def run_rez_index():
+    check_production_install()
+    from rez.cli._main import run
+    return run("index")
+
+
 @scriptname("rez-memcache")
 def run_rez_memcache():
     check_production_install()
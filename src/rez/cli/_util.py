@@ -42,6 +42,7 @@ subcommands = {
     },
     "gui": {},
     "help": {},
+    "index": {},
     "interpret": {},
     "memcache": {},
     "pip": {},
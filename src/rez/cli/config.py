@@ -21,6 +21,11 @@ def setup_parser(parser, completions=False):
     parser.add_argument(
         "--source-list", dest="source_list", action="store_true",
         help="list the config files sourced")
+    parser.add_argument(
+        "--resource-stats", dest="resource_stats", metavar="FAMILY", nargs='*',
+        help="print the limits and statistics of the resource cache (see the "
+        "resource_caching_* settings), after loading the variants of the given "
+        "package families, if any")
     FIELD_action = parser.add_argument(
         "FIELD", type=str, nargs='?',
         help="print the value of a specific setting")
@@ -45,6 +50,10 @@ def command(opts, parser, extra_arg_groups=None):
             print(filepath)
         return
 
+    if opts.resource_stats is not None:
+        _print_resource_stats(opts)
+        return
+
     data = config.data
     if opts.FIELD:
         keys = opts.FIELD.split('.')
@@ -65,3 +74,32 @@ def command(opts, parser, extra_arg_groups=None):
         print(txt.strip())
     else:
         print(data)
+
+
+def _print_resource_stats(opts):
+    from rez.config import config
+    from rez.package_repository import package_repository_manager
+    from rez.packages import iter_packages
+    from rez.utils.yaml import dump_yaml
+
+    # Note that this is the cache of this process only. Long-running processes
+    # can get their own statistics from `ResourcePool.get_stats`.
+    #
+    for name in opts.resource_stats:
+        for package in iter_packages(name):
+            for variant in package.iter_variants():
+                pass
+
+    data = {
+        "limits": {
+            "maxsize": config.resource_caching_maxsize,
+            "max_memory": config.resource_caching_max_memory,
+            "subpools": config.resource_caching_limits
+        },
+        "stats": package_repository_manager.pool.get_stats()
+    }
+
+    if opts.json:
+        print(json.dumps(data))
+    else:
+        print(dump_yaml(data).strip())
@@ -21,6 +21,11 @@ def setup_parser(parser, completions=False):
     parser.add_argument(
         "-p", "--private-build-requires", action="store_true",
         help="Include private build requirements of PKG, if any")
+    parser.add_argument(
+        "--no-cache", dest="no_cache", action="store_true",
+        help="don't cache packages as they are searched. This uses far less "
+        "memory when searching large repositories, but packages are not "
+        "scanned concurrently")
     parser.add_argument(
         "-g", "--graph", action="store_true",
         help="display the dependency tree as an image")
@@ -64,7 +69,8 @@ def command(opts, parser, extra_arg_groups=None):
         depth=opts.depth,
         paths=pkg_paths,
         build_requires=opts.build_requires,
-        private_build_requires=opts.private_build_requires)
+        private_build_requires=opts.private_build_requires,
+        cache=(not opts.no_cache))
 
     if opts.graph or opts.print_graph or opts.write_graph:
         gstr = write_dot(g)
@@ -91,6 +91,15 @@ def setup_parser(parser, completions=False):
     parser.add_argument(
         "--patch-rank", type=int, metavar="N", default=0,
         help="patch rank. Ignored if --patch is not present")
+    batch_action = parser.add_argument(
+        "--batch", type=str, metavar="FILE",
+        help="resolve each request listed in FILE (one request per line, '#' "
+        "starts a comment) and print the results, instead of starting a shell. "
+        "Package loading is shared between the resolves")
+    parser.add_argument(
+        "--batch-workers", type=int, metavar="N", default=0,
+        help="distribute --batch resolves over N worker processes. Results are "
+        "printed as they complete")
     parser.add_argument(
         "--no-cache", dest="no_cache", action="store_true",
         help="do not fetch cached resolves")
@@ -117,6 +126,11 @@ def setup_parser(parser, completions=False):
     parser.add_argument(
         "--no-pkg-cache", action="store_true",
         help="Disable package caching")
+    solver_trace_action = parser.add_argument(
+        "--solver-trace", type=str, metavar="FILE",
+        help="write a timed trace of the solve to FILE, in Chrome trace json "
+        "format (viewable in chrome://tracing or https://www.speedscope.app). "
+        "Cached resolves are ignored")
     parser.add_argument(
         "--pre-command", type=str, help=SUPPRESS)
     PKG_action = parser.add_argument(
@@ -131,6 +145,8 @@ def setup_parser(parser, completions=False):
             ExecutablesCompleter, AndCompleter, SequencedCompleter
         command_action.completer = AndCompleter(ExecutablesCompleter, FilesCompleter())
         input_action.completer = FilesCompleter(dirs=False, file_patterns=["*.rxt"])
+        batch_action.completer = FilesCompleter()
+        solver_trace_action.completer = FilesCompleter()
         PKG_action.completer = PackageCompleter
         extra_0_action.completer = SequencedCompleter(
             "extra_0", ExecutablesCompleter, FilesCompleter())
@@ -141,6 +157,7 @@ def command(opts, parser, extra_arg_groups=None):
     from rez.resolver import ResolverStatus
     from rez.package_filter import PackageFilterList, Rule
     from rez.utils.formatting import get_epoch_time_from_str
+    from rez.utils.trace import Trace
     from rez.config import config
     import select
     import sys
@@ -154,6 +171,7 @@ def command(opts, parser, extra_arg_groups=None):
         command = extra_arg_groups[0] or None
 
     context = None
+    seed_context = None
     request = opts.PKG
     t = get_epoch_time_from_str(opts.time) if opts.time else None
 
@@ -164,6 +182,14 @@ def command(opts, parser, extra_arg_groups=None):
         pkg_paths = opts.paths.split(os.pathsep)
         pkg_paths = [os.path.expanduser(x) for x in pkg_paths if x]
 
+    if opts.batch:
+        if opts.PKG or opts.input or opts.patch or opts.output or opts.solver_trace:
+            parser.error("Cannot use --batch with PKG(s), --input, --patch, "
+                         "--output or --solver-trace.")
+
+    if opts.solver_trace and opts.input and not opts.patch:
+        parser.error("Cannot use --solver-trace with --input, unless patching.")
+
     if opts.input:
         if opts.PKG and not opts.patch:
             parser.error("Cannot use --input and provide PKG(s), unless patching.")
@@ -182,6 +208,7 @@ def command(opts, parser, extra_arg_groups=None):
         request = context.get_patched_request(request,
                                               strict=opts.strict,
                                               rank=opts.patch_rank)
+        seed_context = context
         context = None
 
     if context is None:
@@ -199,6 +226,12 @@ def command(opts, parser, extra_arg_groups=None):
             rule = Rule.parse_rule(rule_str)
             package_filter.add_inclusion(rule)
 
+        if opts.batch:
+            success = _resolve_batch(opts, pkg_paths, package_filter, t)
+            sys.exit(0 if success else 1)
+
+        solver_trace = Trace() if opts.solver_trace else None
+
         # perform the resolve
         context = ResolvedContext(
             package_requests=request,
@@ -213,9 +246,14 @@ def command(opts, parser, extra_arg_groups=None):
             caching=(not opts.no_cache),
             suppress_passive=opts.no_passive,
             print_stats=opts.stats,
-            package_caching=(not opts.no_pkg_cache)
+            package_caching=(not opts.no_pkg_cache),
+            seed_context=seed_context,
+            solver_trace=solver_trace
         )
 
+        if solver_trace is not None:
+            solver_trace.write(opts.solver_trace)
+
     success = (context.status == ResolverStatus.solved)
 
     if not success:
@@ -261,3 +299,47 @@ def command(opts, parser, extra_arg_groups=None):
         block=True)
 
     sys.exit(returncode)
+
+
+def _resolve_batch(opts, pkg_paths, package_filter, timestamp):
+    from rez.resolved_context import resolve_many
+    from rez.resolver import ResolverStatus
+    import sys
+
+    requests = []
+    with open(opts.batch) as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                requests.append(line.split())
+
+    success = True
+    it = resolve_many(
+        requests,
+        package_paths=pkg_paths,
+        package_filter=package_filter,
+        max_workers=opts.batch_workers,
+        timestamp=timestamp,
+        building=opts.build,
+        add_implicit_packages=(not opts.no_implicit),
+        max_fails=opts.max_fails,
+        time_limit=opts.time_limit,
+        caching=(not opts.no_cache),
+        package_caching=(not opts.no_pkg_cache)
+    )
+
+    for i, context in it:
+        request_str = ' '.join(requests[i])
+
+        if context.status == ResolverStatus.solved:
+            pkgs_str = ' '.join(x.qualified_package_name
+                                for x in context.resolved_packages)
+            print("%s: solved in %.2f secs: %s"
+                  % (request_str, context.solve_time, pkgs_str))
+        else:
+            success = False
+            print("%s: %s: %s" % (request_str, context.status.name,
+                                  context.failure_description),
+                  file=sys.stderr)
+
+    return success
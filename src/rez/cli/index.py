@@ -0,0 +1,58 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright Contributors to the Rez Project
+
+
+'''
+Create, update or remove the index of a package repository.
+'''
+from __future__ import print_function
+
+
+def setup_parser(parser, completions=False):
+    parser.add_argument(
+        "-f", "--family", dest="families", type=str, nargs='+', metavar="NAME",
+        help="only update the index entries of the given package families. "
+        "If the repository has no index, a full index is created")
+    parser.add_argument(
+        "--remove", action="store_true",
+        help="remove the index")
+    PATH_action = parser.add_argument(
+        "PATH", type=str, nargs='*',
+        help="the package repositories to index (default: the local packages "
+        "path)")
+
+    if completions:
+        from rez.cli._complete_util import FilesCompleter
+        PATH_action.completer = FilesCompleter(files=False)
+
+
+def command(opts, parser, extra_arg_groups=None):
+    from rez.config import config
+    from rez.package_repository import package_repository_manager
+    import time
+    import sys
+
+    paths = opts.PATH or [config.local_packages_path]
+
+    for path in paths:
+        repo = package_repository_manager.get_repository(path)
+
+        if not hasattr(repo, "update_index"):
+            print("%s: repository type does not support indexing" % repo,
+                  file=sys.stderr)
+            sys.exit(1)
+
+        if opts.remove:
+            if repo.remove_index():
+                print("%s: index removed" % repo)
+            else:
+                print("%s: no index to remove" % repo)
+            continue
+
+        t = time.time()
+        index = repo.update_index(family_names=opts.families)
+
+        families = index.data["families"].values()
+        num_packages = sum(len(x["packages"] or {}) for x in families)
+        print("%s: indexed %d families, %d packages in %.2f secs"
+              % (repo, len(families), num_packages, time.time() - t))
@@ -38,6 +38,12 @@ def setup_parser(parser, completions=False):
         "--clean", action="store_true",
         help="Remove unused variants and other cache files pending deletion"
     )
+    group.add_argument(
+        "--prefetch", metavar="SOURCE", nargs='+',
+        help="Resolve contexts and add their variants to the cache. Each source "
+        "is an rxt file, a suite directory, or a package request such as "
+        "'foo-1 bah'"
+    )
     # run as a daemon that adds pending variants to the cache, then exits
     group.add_argument(
         "--daemon", action="store_true", help=SUPPRESS
@@ -50,7 +56,18 @@ def setup_parser(parser, completions=False):
     parser.add_argument(
         "-f", "--force", action="store_true",
         help="Force a package add, even if package is not cachable. Only "
-        "applicable with --add"
+        "applicable with --add and --prefetch"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, metavar="N",
+        help="Number of variants to copy at once (default: config setting "
+        "'package_cache_workers'). Only applicable with --prefetch"
+    )
+    parser.add_argument(
+        "--max-bandwidth", type=int, metavar="MB",
+        help="Maximum copy rate, in megabytes per second (default: config "
+        "setting 'package_cache_max_bandwidth'). Only applicable with --add and "
+        "--prefetch"
     )
     parser.add_argument(
         "DIR", nargs='?',
@@ -103,6 +120,71 @@ def remove_variant(pkgcache, uri, opts):
         print_info("Variant successfully removed")
 
 
+def prefetch(pkgcache, opts):
+    from rez.exceptions import RezError
+    from rez.resolved_context import ResolvedContext
+    from rez.suite import Suite
+    from rez.util import ProgressBar
+    from rez.utils.logging_ import print_info, print_warning, print_error
+    from rez.package_cache import PackageCache
+
+    variants = []
+    failed_resolve = False
+
+    for source in opts.prefetch:
+        try:
+            if os.path.isdir(source):
+                suite = Suite.load(source)
+                contexts = [suite.context(x) for x in suite.context_names]
+            elif os.path.isfile(source):
+                contexts = [ResolvedContext.load(source)]
+            else:
+                print_info("Resolving %r...", source)
+                contexts = [ResolvedContext(source.split())]
+        except RezError as e:
+            print_error("Failed to load contexts from %r: %s", source, e)
+            failed_resolve = True
+            continue
+
+        for context in contexts:
+            if context.success:
+                variants.extend(context.resolved_packages)
+            else:
+                print_error("Failed to resolve context from %r", source)
+                failed_resolve = True
+
+    print_info("Adding variants to package cache at %s:", pkgcache.path)
+
+    bar = ProgressBar("Caching", len(set(variants)))
+    errors = []
+
+    def _callback(variant, rootpath, status, error):
+        if error:
+            errors.append(error)
+        bar.next()
+
+    results = pkgcache.prefetch(variants, force=opts.force, callback=_callback)
+    bar.finish()
+
+    for error in errors:
+        print_warning(error)
+
+    statuses = [x[2] for x in results]
+    num_created = statuses.count(PackageCache.VARIANT_CREATED)
+    num_found = statuses.count(PackageCache.VARIANT_FOUND)
+    num_stalled = statuses.count(PackageCache.VARIANT_COPY_STALLED)
+    num_not_cached = len(statuses) - num_created - num_found - num_stalled
+
+    print_info(
+        "%d variants cached, %d already cached, %d stalled copying in another "
+        "process, %d not cached",
+        num_created, num_found, num_stalled, num_not_cached
+    )
+
+    if failed_resolve:
+        sys.exit(1)
+
+
 def view_logs(pkgcache, opts):
     from rez.utils.logging_ import view_file_logs
 
@@ -132,6 +214,11 @@ def command(opts, parser, extra_arg_groups=None):
             "'cache_packages_path'"
         )
 
+    if opts.jobs is not None:
+        config.override("package_cache_workers", opts.jobs)
+    if opts.max_bandwidth is not None:
+        config.override("package_cache_max_bandwidth", opts.max_bandwidth)
+
     pkgcache = PackageCache(cachepath)
 
     if opts.daemon:
@@ -148,6 +235,9 @@ def command(opts, parser, extra_arg_groups=None):
     elif opts.clean:
         pkgcache.clean()
 
+    elif opts.prefetch:
+        prefetch(pkgcache, opts)
+
     elif opts.logs:
         view_logs(pkgcache, opts)
 
@@ -57,6 +57,11 @@ def setup_parser(parser, completions=False):
         help="only show packages released after the given time. Supported "
         "formats are: epoch time (eg 1393014494), or relative time (eg -10s, "
         "-5m, -0.5h, -10d)")
+    parser.add_argument(
+        "--no-cache", dest="no_cache", action="store_true",
+        help="don't cache packages as they are searched, and print results as "
+        "they are found. This uses far less memory when searching large "
+        "repositories, but packages are not scanned concurrently")
     parser.add_argument(
         "-s", "--sort", action="store_true",
         help="print results in sorted order (deprecated)")
@@ -101,25 +106,31 @@ def command(opts, parser, extra_arg_groups=None):
         latest=opts.latest,
         after_time=after_time,
         before_time=before_time,
-        validate=(opts.validate or opts.errors)
+        validate=(opts.validate or opts.errors),
+        cache=(not opts.no_cache)
     )
 
-    resource_type, search_results = searcher.search(opts.PKG)
-
-    if opts.errors:
-        search_results = [x for x in search_results if x.validation_error]
-
-        if not search_results:
-            print("No matching erroneous %s found." % resource_type, file=sys.stderr)
-            sys.exit(1)
-
-    elif not search_results:
-        print("No matching %s found." % resource_type, file=sys.stderr)
-        sys.exit(1)
-
     formatter = ResourceSearchResultFormatter(
         output_format=opts.format,
         suppress_newlines=opts.no_newlines
     )
 
-    formatter.print_search_results(search_results)
+    if opts.no_cache:
+        resource_type, search_results = searcher.iter_resources(opts.PKG)
+    else:
+        resource_type, search_results = searcher.search(opts.PKG)
+
+    if opts.errors:
+        search_results = (x for x in search_results if x.validation_error)
+
+    found = False
+    for search_result in search_results:
+        formatter.print_search_results([search_result])
+        found = True
+
+    if not found:
+        if opts.errors:
+            print("No matching erroneous %s found." % resource_type, file=sys.stderr)
+        else:
+            print("No matching %s found." % resource_type, file=sys.stderr)
+        sys.exit(1)
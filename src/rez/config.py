@@ -338,6 +338,7 @@ config_schema = Schema({
     "default_relocatable_per_repository":           OptionalDict,
     "default_cachable_per_package":                 OptionalDict,
     "default_cachable_per_repository":              OptionalDict,
+    "resource_caching_limits":                      OptionalDict,
     "default_cachable":                             OptionalBool,
     "implicit_packages":                            StrList,
     "parent_variables":                             StrList,
@@ -369,6 +370,8 @@ config_schema = Schema({
     "create_executable_script_mode":                ExecutableScriptMode_,
     "suite_alias_prefix_char":                      Char,
     "cache_packages_path":                          OptionalStr,
+    "resolve_cache_path":                           OptionalStr,
+    "package_file_cache_path":                      OptionalStr,
     "package_definition_python_path":               OptionalStr,
     "tmpdir":                                       OptionalStr,
     "context_tmpdir":                               OptionalStr,
@@ -404,21 +407,32 @@ config_schema = Schema({
     "variant_shortlinks_dirname":                   OptionalStr,
     "build_thread_count":                           BuildThreadCount_,
     "resource_caching_maxsize":                     Int,
+    "resource_caching_max_memory":                  Int,
     "max_package_changelog_chars":                  Int,
     "max_package_changelog_revisions":              Int,
     "memcached_package_file_min_compress_len":      Int,
     "memcached_context_file_min_compress_len":      Int,
     "memcached_listdir_min_compress_len":           Int,
     "memcached_resolve_min_compress_len":           Int,
+    "resolve_cache_max_size":                       Int,
+    "package_file_cache_max_days":                  Int,
     "shell_error_truncate_cap":                     Int,
+    "solver_parallel_workers":                      Int,
     "package_cache_log_days":                       Int,
     "package_cache_max_variant_days":               Int,
+    "package_cache_max_size":                       Int,
+    "package_cache_low_watermark":                  Float,
     "package_cache_clean_limit":                    Float,
+    "package_cache_workers":                        Int,
+    "package_cache_copy_threads":                   Int,
+    "package_cache_max_bandwidth":                  Int,
+    "package_file_cache_clean_limit":               Float,
     "allow_unversioned_packages":                   Bool,
     "rxt_as_yaml":                                  Bool,
     "package_cache_during_build":                   Bool,
     "package_cache_local":                          Bool,
     "package_cache_same_device":                    Bool,
+    "package_cache_dedupe":                         Bool,
     "color_enabled":                                ForceOrBool,
     "resolve_caching":                              Bool,
     "cache_package_files":                          Bool,
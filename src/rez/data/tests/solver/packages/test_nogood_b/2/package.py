@@ -0,0 +1,4 @@
+name = "test_nogood_b"
+version = "2"
+
+requires = ["test_nogood_c"]
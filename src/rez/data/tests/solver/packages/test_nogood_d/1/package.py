@@ -0,0 +1,4 @@
+name = "test_nogood_d"
+version = "1"
+
+requires = ["test_nogood_start-2"]
@@ -0,0 +1,4 @@
+name = "test_nogood_start"
+version = "1"
+
+requires = ["test_nogood_a", "test_nogood_b"]
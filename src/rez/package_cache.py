@@ -15,19 +15,23 @@ import platform
 import time
 import logging
 import random
+import socket
 import threading
 from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
 
 from rez.config import config
 from rez.exceptions import PackageCacheError
 from rez.vendor.lockfile import LockFile, NotLocked
 from rez.utils import json
+from rez.vendor.atomicwrites import atomic_write
 from rez.utils.filesystem import safe_listdir, safe_makedirs, safe_remove, \
-    forceful_rmtree
+    forceful_rmtree, parallel_copytree
 from rez.utils.colorize import ColorizedStreamHandler
 from rez.utils.logging_ import print_warning
 from rez.packages import get_variant
 from rez.system import system
+from rez.util import dedup
 
 
 class PackageCache(object):
@@ -60,6 +64,28 @@ class PackageCache(object):
     correct variant within the hash subdir. The intent is to keep cached paths
     short, and avoid having to search too many variant.json files to find the
     matching variant.
+
+    An index of all cached variants is also kept in '/<cache_dir>/.sys/index.json'.
+    This maps each variant handle to its cached root and status, so that many
+    variants can be looked up by reading a single file. The index is replaced
+    atomically whenever it changes, so it can be read without acquiring the lock.
+    Variants not present in the index (eg those cached by an older version of
+    rez) are still found by searching their hash subdir.
+
+    Processes that use cached variants record them in
+    '/<cache_dir>/.sys/in_use/<host>-<pid>.json' (see `mark_in_use`). These
+    variants are not removed by clean() until the process has exited.
+
+    If 'config.package_cache_dedupe' is True, payload files are stored once per
+    unique content (and permissions) in a blob store, and hardlinked into each
+    variant's payload:
+
+        /<cache_dir>/.sys/blobs/3f/3f786850e387550fdab836ed7e6dc881de23001b-755
+
+    A blob's hardlink count tells us whether any variant still uses it, so
+    clean() deletes blobs whose only link is the one in the blob store. Note
+    that hardlinked files share their modification time, which is taken from
+    the first file stored with that content.
     """
 
     VARIANT_NOT_FOUND = 0  # Variant was not found
@@ -73,6 +99,12 @@ class PackageCache(object):
     _FILELOCK_TIMEOUT = 10
     _COPYING_TIME_INC = 0.2
     _COPYING_TIME_MAX = 5.0
+    _COPY_CHUNK_SIZE = 1 << 20
+    _BLOB_TMP_MAX_AGE = 3600
+
+    # cache path -> cached variant roots in use by this process
+    _in_use = {}
+    _in_use_lock = threading.Lock()
 
     def __init__(self, path):
         """Create a package cache.
@@ -84,9 +116,17 @@ class PackageCache(object):
             raise PackageCacheError("Not a directory: %s" % path)
 
         self.path = path
+        self._index = None
+        self._lock_state = threading.local()  # see `_lock`
+
+        if config.package_cache_max_bandwidth > 0:
+            self._throttle = _Throttle(config.package_cache_max_bandwidth * 1024 * 1024)
+        else:
+            self._throttle = None
 
         # make dirs for internal use
         safe_makedirs(self._log_dir)
+        safe_makedirs(self._in_use_dir)
         safe_makedirs(self._pending_dir)
         safe_makedirs(self._remove_dir)
 
@@ -117,6 +157,42 @@ class PackageCache(object):
 
         return rootpath
 
+    def mark_in_use(self, rootpaths):
+        """Record that this process is using some cached variants.
+
+        The variants will not be removed by clean() while this process is still
+        running. Note that variants remain marked until the process exits, and
+        that processes that are given the environment of a context by this
+        process (for example by sourcing its interpreted code) are not tracked.
+
+        Args:
+            rootpaths (list of str): Cached variant roots, as returned by
+                `get_cached_root`.
+        """
+        rootpaths = set(
+            os.path.relpath(x, self.path).replace(os.sep, '/')
+            for x in rootpaths
+        )
+
+        with self._in_use_lock:
+            in_use = self._in_use.setdefault(self.path, set())
+            if rootpaths.issubset(in_use):
+                return
+
+            in_use.update(rootpaths)
+
+            data = {
+                "host": socket.gethostname(),
+                "pid": os.getpid(),
+                "roots": sorted(in_use)
+            }
+
+            filename = "%s-%d.json" % (data["host"], data["pid"])
+            filepath = os.path.join(self._in_use_dir, filename)
+
+            with atomic_write(filepath, overwrite=True) as f:
+                f.write(json.dumps(data))
+
     def add_variant(self, variant, force=False):
         """Copy a variant's payload into the cache.
 
@@ -131,9 +207,13 @@ class PackageCache(object):
            be used yet;
         4. The file '/<cache_dir>/foo/1.0.0/af8d/a.json' is created. Now
            another proc/thread can't create the same local variant;
-        5. The file lock is released;
-        6. The variant payload is copied to '/<cache_dir>/foo/1.0.0/af8d/a';
-        7. The '.copying-a' file is removed.
+        5. The variant is added to the index as VARIANT_COPYING, and the file
+           lock is released;
+        6. The variant payload is copied to '/<cache_dir>/foo/1.0.0/af8d/a'
+           (several files at once, see 'config.package_cache_copy_threads',
+           and limited to 'config.package_cache_max_bandwidth');
+        7. The '.copying-a' file is removed;
+        8. The variant is updated to VARIANT_FOUND in the index.
 
         Note that the variant will not be cached in the following circumstances,
         unless `force` is True:
@@ -235,8 +315,9 @@ class PackageCache(object):
         safe_makedirs(path)
 
         # construct data to store to json file
+        handle_dict = variant.handle.to_dict()
         data = {
-            "handle": variant.handle.to_dict()
+            "handle": handle_dict
         }
 
         if variant.index is not None:
@@ -273,6 +354,10 @@ class PackageCache(object):
             with open(json_filepath, 'w') as f:
                 f.write(json.dumps(data))
 
+            # 5.
+            rootpath = os.path.join(path, incname)
+            self._update_index(handle_dict, rootpath, self.VARIANT_COPYING)
+
         # 6.
         #
         # Here we continually update mtime on the .copying file, to indicate
@@ -289,13 +374,22 @@ class PackageCache(object):
                 except:
                     pass
 
-        rootpath = os.path.join(path, incname)
         th = threading.Thread(target=_while_copying)
         th.daemon = True
         th.start()
 
+        if config.package_cache_dedupe and hasattr(os, "link"):
+            safe_makedirs(self._blobs_tmp_dir)
+            copy_function = self._copy_file_deduplicated
+        elif self._throttle:
+            copy_function = self._copy_file_throttled
+        else:
+            copy_function = None
+
         try:
-            shutil.copytree(variant_root, rootpath)
+            parallel_copytree(variant_root, rootpath,
+                              num_threads=config.package_cache_copy_threads,
+                              copy_function=copy_function)
         finally:
             still_copying = False
 
@@ -303,6 +397,14 @@ class PackageCache(object):
         th.join()
         os.remove(copying_filepath)
 
+        # 8.
+        size = self._get_payload_size(rootpath)
+
+        with self._lock():
+            # the variant may have been removed as stalled in the meantime
+            if os.path.exists(json_filepath):
+                self._update_index(handle_dict, rootpath, self.VARIANT_FOUND, size)
+
         return (rootpath, self.VARIANT_CREATED)
 
     def remove_variant(self, variant):
@@ -331,6 +433,8 @@ class PackageCache(object):
         # when clean() is called.
         #
         with self._lock():
+            self._update_index(variant.handle.to_dict())
+
             # move the payload
             dest_filename = variant.parent.qualified_name + '-' + uuid4().hex
             dest_rootpath = os.path.join(self._remove_dir, dest_filename)
@@ -371,6 +475,67 @@ class PackageCache(object):
 
         return self.VARIANT_REMOVED
 
+    def prefetch(self, variants, force=False, callback=None):
+        """Copy variants into the cache, and wait for them to finish copying.
+
+        This is used to populate a cache ahead of time (see
+        `rez-pkg-cache --prefetch`), rather than waiting for variants to be
+        cached as contexts are used. Up to 'config.package_cache_workers'
+        variants are copied at once. Variants that another process is already
+        copying are waited for, until that copy finishes or stalls.
+
+        Args:
+            variants (list of `Variant`): Variants to cache.
+            force (bool): See `add_variant`.
+            callback (callable): Called as `callback(variant, rootpath, status,
+                error)` each time a variant has been processed.
+
+        Returns:
+            List of 4-tuple:
+            - `Variant`: The variant;
+            - str: Path to cached payload, or '' if not cached;
+            - int: Status as returned by `add_variant` (but never
+              VARIANT_COPYING), or None if not cached;
+            - str: Reason the variant was not cached, or None.
+        """
+        variants = list(dedup(variants))
+        if not variants:
+            return []
+
+        def _add_variant(variant):
+            try:
+                rootpath, status = self.add_variant(variant, force=force)
+
+                # wait for copies by another process to finish or stall
+                while status == self.VARIANT_COPYING:
+                    time.sleep(self._COPYING_TIME_INC)
+                    status, rootpath = self._get_cached_root(variant)
+
+                    if status == self.VARIANT_NOT_FOUND:
+                        # the other copy was removed, so copy it ourselves
+                        rootpath, status = self.add_variant(variant, force=force)
+
+                return (variant, rootpath, status, None)
+            except PackageCacheError as e:
+                return (variant, '', None, str(e))
+            except Exception as e:
+                return (variant, '', None, "Failed to cache %s: %s" % (variant.uri, e))
+
+        num_workers = max(1, min(config.package_cache_workers, len(variants)))
+        pool = ThreadPool(num_workers)
+        results = []
+
+        try:
+            for result in pool.imap_unordered(_add_variant, variants):
+                results.append(result)
+                if callback:
+                    callback(*result)
+        finally:
+            pool.close()
+            pool.join()
+
+        return results
+
     def add_variants_async(self, variants):
         """Update the package cache by adding some or all of the given variants.
 
@@ -570,20 +735,8 @@ class PackageCache(object):
 
         logger = self._init_logging()
 
-        # somewhere for the daemon to store stateful info
-        state = {
-            "logger": logger
-        }
-
         # copy variants into cache
-        try:
-            while True:
-                keep_running = self._run_daemon_step(state)
-                if not keep_running:
-                    break
-        except Exception:
-            logger.exception("An error occurred while adding variants to the cache")
-            raise
+        self._add_pending_variants(logger)
 
         # do some cleanup
         if config.package_cache_clean_limit > 0:
@@ -600,18 +753,30 @@ class PackageCache(object):
         This removes:
         - Variants that have not been used in more than
           'config.package_cache_max_variant_days' days;
+        - The least recently used variants, if the cache is larger than
+          'config.package_cache_max_size'. Variants are removed until the cache
+          is reduced to 'config.package_cache_low_watermark' of this size;
         - Variants that have stalled;
-        - Variants that are already pending deletion (remove_variant() was used).
+        - Variants that are already pending deletion (remove_variant() was used);
+        - Blobs that are no longer used by any variant (see
+          'config.package_cache_dedupe').
 
         Args:
             time_limit (float): Perform cleaning operations only up until this
                 limit, resulting in a possibly incomplete cleanup. This is used
                 to keep the cache size down without having to periodically
                 run 'rez-pkg-cache --clean'.
+
+        Variants in use by a running process (see `mark_in_use`) are never
+        removed, other than those that have stalled. This only covers processes
+        that created or interpreted a context themselves. A shell that sourced
+        the interpreted code of a context, after the interpreting process has
+        exited, does not keep its variants in use.
         """
         logger = self._init_logging()
         unused_variants = []
         stalled_variants = []
+        used_variants = []
         now = time.time()
 
         def should_exit():
@@ -620,13 +785,12 @@ class PackageCache(object):
                 and (time.time() - now) > time_limit
             )
 
+        in_use = self._get_roots_in_use()
+        max_secs = config.package_cache_max_variant_days * 3600 * 24
+
         # find variants to delete
         for variant, rootpath, status in self.get_variants():
             if status == self.VARIANT_FOUND:
-                max_secs = config.package_cache_max_variant_days * 3600 * 24
-                if max_secs == 0:
-                    continue  # 0 means no age limit on unused variants
-
                 # determine how long since cached variant has been used
                 json_filepath = rootpath + ".json"
                 try:
@@ -635,9 +799,12 @@ class PackageCache(object):
                     # may have just been deleted
                     continue
 
+                # 0 means no age limit on unused variants
                 since = int(now - st.st_mtime)
-                if since > max_secs:
+                if max_secs and since > max_secs and rootpath not in in_use:
                     unused_variants.append(variant)
+                else:
+                    used_variants.append((st.st_mtime, variant, rootpath))
 
             elif status == self.VARIANT_COPY_STALLED:
                 stalled_variants.append(variant)
@@ -651,6 +818,43 @@ class PackageCache(object):
             if should_exit():
                 return
 
+        # remove least recently used variants, until the cache is small enough
+        max_size = config.package_cache_max_size * 1024 * 1024
+
+        if max_size > 0:
+            sizes = []
+
+            # variants cached before sizes were recorded in the index have to
+            # be walked, which can be slow
+            for _, variant, rootpath in used_variants:
+                sizes.append(self._get_variant_size(variant, rootpath))
+
+                if should_exit():
+                    return
+
+            total_size = sum(sizes)
+
+            if total_size > max_size:
+                min_size = max_size * config.package_cache_low_watermark
+                used_variants = sorted(zip(used_variants, sizes), key=lambda x: x[0][0])
+
+                for (_, variant, rootpath), size in used_variants:
+                    if total_size <= min_size:
+                        break
+
+                    if rootpath in in_use:
+                        continue
+
+                    status = self.remove_variant(variant)
+                    if status == self.VARIANT_REMOVED:
+                        logger.info(
+                            "Removed least recently used variant %s from cache",
+                            variant.uri)
+                        total_size -= size
+
+                    if should_exit():
+                        return
+
         # Remove stalled variants. This puts them in our to_delete dir.
         #
         # Note that this is not done when cleaning up as part of cache updating.
@@ -678,31 +882,114 @@ class PackageCache(object):
             if should_exit():
                 return
 
+        # delete unreferenced blobs
+        num_blobs = 0
+
+        for dirname in safe_listdir(self._blobs_dir):
+            path = os.path.join(self._blobs_dir, dirname)
+            is_tmp_dir = (path == self._blobs_tmp_dir)
+
+            for name in safe_listdir(path):
+                filepath = os.path.join(path, name)
+
+                try:
+                    st = os.stat(filepath)
+                except OSError:
+                    continue  # may have just been deleted
+
+                if st.st_nlink > 1:
+                    continue  # still linked into a variant payload
+
+                if is_tmp_dir and (time.time() - st.st_mtime) < self._BLOB_TMP_MAX_AGE:
+                    continue  # probably still being written
+
+                safe_remove(filepath)
+                num_blobs += 1
+
+            if should_exit():
+                break
+
+        if num_blobs:
+            logger.info("Deleted %d unused blobs", num_blobs)
+
     @contextmanager
     def _lock(self):
+        # re-entrant within a thread
+        if getattr(self._lock_state, "locked", False):
+            yield
+            return
+
         lock_filepath = os.path.join(self._sys_dir, ".lock")
         lock = LockFile(lock_filepath)
 
         try:
             lock.acquire(timeout=self._FILELOCK_TIMEOUT)
+            self._lock_state.locked = True
             yield
         finally:
+            self._lock_state.locked = False
             try:
                 lock.release()
             except NotLocked:
                 pass
 
+    def _add_pending_variants(self, logger):
+        """Copy pending variants into the cache, until there are none left.
+
+        Up to 'config.package_cache_workers' variants are copied at once.
+        """
+        # somewhere for the daemon to store stateful info
+        state = {
+            "logger": logger,
+            "lock": threading.Lock(),
+            "active": set(),  # pending files being handled by a worker
+            "copying": set()  # pending files being handled by another proc
+        }
+
+        def _run_worker(_):
+            try:
+                while True:
+                    keep_running = self._run_daemon_step(state)
+                    if not keep_running:
+                        break
+            except Exception:
+                logger.exception("An error occurred while adding variants to the cache")
+                raise
+
+        num_workers = config.package_cache_workers
+        if num_workers < 2:
+            _run_worker(None)
+            return
+
+        pool = ThreadPool(num_workers)
+        try:
+            pool.map(_run_worker, range(num_workers), chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
     def _run_daemon_step(self, state):
-        logger = state["logger"]
+        # pick a random pending variant to copy, that no other worker is
+        # already handling
+        with state["lock"]:
+            pending_filenames = set(os.listdir(self._pending_dir))
+            pending_filenames -= state["copying"]
+            pending_filenames -= state["active"]
+            if not pending_filenames:
+                return False
+
+            i = random.randint(0, len(pending_filenames) - 1)
+            filename = list(pending_filenames)[i]
+            state["active"].add(filename)
 
-        # pick a random pending variant to copy
-        pending_filenames = set(os.listdir(self._pending_dir))
-        pending_filenames -= set(state.get("copying", set()))
-        if not pending_filenames:
-            return False
+        try:
+            return self._add_pending_variant(state, filename)
+        finally:
+            with state["lock"]:
+                state["active"].discard(filename)
 
-        i = random.randint(0, len(pending_filenames) - 1)
-        filename = list(pending_filenames)[i]
+    def _add_pending_variant(self, state, filename):
+        logger = state["logger"]
         filepath = os.path.join(self._pending_dir, filename)
 
         try:
@@ -729,7 +1016,7 @@ class PackageCache(object):
             return True
 
         except Exception:
-            # This is probably an error during shutil.copytree (eg a perms fail).
+            # This is probably an error during the payload copy (eg a perms fail).
             # In this case, the variant will be in VARIANT_COPYING status, and
             # will shortly transition to VARIANT_COPY_STALLED. Thus we can
             # remove the pending variant, as there's nothing more we can do.
@@ -754,7 +1041,8 @@ class PackageCache(object):
             # variant, so it's responsible); but we also have to ignore this
             # variant from now on.
             #
-            state.setdefault("copying", set()).add(filename)
+            with state["lock"]:
+                state["copying"].add(filename)
         else:
             safe_remove(filepath)
 
@@ -813,19 +1101,117 @@ class PackageCache(object):
     def _remove_dir(self):
         return os.path.join(self.path, ".sys", "to_delete")
 
+    @property
+    def _in_use_dir(self):
+        return os.path.join(self.path, ".sys", "in_use")
+
+    @property
+    def _index_filepath(self):
+        return os.path.join(self.path, ".sys", "index.json")
+
+    @property
+    def _blobs_dir(self):
+        return os.path.join(self.path, ".sys", "blobs")
+
+    @property
+    def _blobs_tmp_dir(self):
+        return os.path.join(self.path, ".sys", "blobs", "tmp")
+
+    def _copy_file_deduplicated(self, src, dst):
+        # Copy a file into the blob store (if a blob with the same content and
+        # permissions isn't already there), then hardlink the blob to `dst`.
+        # The source is only read once, since it is typically on slow shared
+        # storage, so the content hash is calculated while copying.
+        #
+        st = os.stat(src)
+        tmp_filepath = os.path.join(self._blobs_tmp_dir, uuid4().hex)
+        h = sha1()
+
+        try:
+            with open(src, "rb") as fsrc:
+                with open(tmp_filepath, "wb") as fdst:
+                    while True:
+                        buf = fsrc.read(self._COPY_CHUNK_SIZE)
+                        if not buf:
+                            break
+                        if self._throttle:
+                            self._throttle.consume(len(buf))
+                        h.update(buf)
+                        fdst.write(buf)
+
+            digest = h.hexdigest()
+            blob_filepath = os.path.join(
+                self._blobs_dir, digest[:2],
+                "%s-%o" % (digest, stat.S_IMODE(st.st_mode))
+            )
+
+            if not os.path.exists(blob_filepath):
+                shutil.copystat(src, tmp_filepath)
+                safe_makedirs(os.path.dirname(blob_filepath))
+
+                try:
+                    os.rename(tmp_filepath, blob_filepath)
+                except OSError:
+                    # may have just been created by another thread/proc (this
+                    # is only an error on Windows)
+                    if not os.path.exists(blob_filepath):
+                        raise
+        finally:
+            safe_remove(tmp_filepath)
+
+        try:
+            os.link(blob_filepath, dst)
+        except OSError as e:
+            if e.errno == errno.ENOENT:
+                # blob deleted by clean() between its creation and linking
+                shutil.copy2(src, dst)
+            else:
+                # eg too many links to the blob
+                shutil.copy2(blob_filepath, dst)
+
+    def _copy_file_throttled(self, src, dst):
+        with open(src, "rb") as fsrc:
+            with open(dst, "wb") as fdst:
+                while True:
+                    buf = fsrc.read(self._COPY_CHUNK_SIZE)
+                    if not buf:
+                        break
+                    self._throttle.consume(len(buf))
+                    fdst.write(buf)
+
+        shutil.copystat(src, dst)
+
     def _get_cached_root(self, variant):
+        handle_dict = variant.handle.to_dict()
+
+        index = self._get_index()
+        if index is not None:
+            entry = index.get(self._get_index_key(handle_dict))
+            if entry is not None:
+                relpath, status = entry[:2]
+                rootpath = os.path.join(self.path, *relpath.split('/'))
+
+                if os.path.exists(rootpath + ".json"):
+                    if status == self.VARIANT_COPYING:
+                        status = self._get_copying_status(rootpath)
+                    return (status, rootpath)
+
+                # The variant was removed without updating the index - by hand,
+                # or by a version of rez that predates the index.
+                self._remove_stale_index_entry(handle_dict, relpath)
+
+        # Not in the index. The variant may still have been cached by a version
+        # of rez that predates the index, so search its hash subdir.
+        #
         path = self._get_hash_path(variant)
         if not os.path.exists(path):
             return (self.VARIANT_NOT_FOUND, '')
 
-        handle_dict = variant.handle.to_dict()
-
         for name in os.listdir(path):
             if name.endswith(".json"):
                 incname = os.path.splitext(name)[0]
                 json_filepath = os.path.join(path, name)
                 rootpath = os.path.join(path, incname)
-                copying_filepath = os.path.join(path, ".copying-" + incname)
 
                 try:
                     with open(json_filepath) as f:
@@ -838,22 +1224,196 @@ class PackageCache(object):
                         raise
 
                 if data.get("handle") == handle_dict:
-                    if os.path.exists(copying_filepath):
-                        try:
-                            st = os.stat(copying_filepath)
-                            secs = time.time() - st.st_mtime
-                            if secs > self._COPYING_TIME_MAX:
-                                return (self.VARIANT_COPY_STALLED, rootpath)
-                        except:
-                            # maybe .copying file was deleted just now
-                            pass
-
-                        return (self.VARIANT_COPYING, rootpath)
-                    else:
-                        return (self.VARIANT_FOUND, rootpath)
+                    return (self._get_copying_status(rootpath), rootpath)
 
         return (self.VARIANT_NOT_FOUND, '')
 
+    def _get_copying_status(self, rootpath):
+        path, incname = os.path.split(rootpath)
+        copying_filepath = os.path.join(path, ".copying-" + incname)
+
+        if os.path.exists(copying_filepath):
+            try:
+                st = os.stat(copying_filepath)
+                secs = time.time() - st.st_mtime
+                if secs > self._COPYING_TIME_MAX:
+                    return self.VARIANT_COPY_STALLED
+            except:
+                # maybe .copying file was deleted just now
+                pass
+
+            return self.VARIANT_COPYING
+        else:
+            return self.VARIANT_FOUND
+
+    @classmethod
+    def _get_index_key(cls, handle_dict):
+        s = json.dumps(handle_dict, sort_keys=True)
+        return sha1(s.encode('utf-8')).hexdigest()
+
+    def _get_index(self):
+        """Get the index of cached variants.
+
+        The last read index is reused if the index file has not changed since.
+
+        Returns:
+            dict: Index key -> [root path relative to cache, status, size], or
+            None if there is no index. Size is in bytes, and is only present
+            for variants that have finished copying.
+        """
+        try:
+            st = os.stat(self._index_filepath)
+        except OSError:
+            return None
+
+        file_key = (st.st_ino, st.st_mtime, st.st_size)
+        index = self._index
+
+        if index is None or index[0] != file_key:
+            try:
+                with open(self._index_filepath) as f:
+                    data = json.loads(f.read())
+            except (IOError, OSError, ValueError):
+                return None
+
+            index = (file_key, data["variants"])
+            self._index = index
+
+        return index[1]
+
+    def _build_index(self):
+        """Build the index of cached variants by searching the cache."""
+        variants = {}
+
+        for pkg_name in safe_listdir(self.path):
+            if pkg_name.startswith('.'):
+                continue  # dirs for internal cache use
+
+            path1 = os.path.join(self.path, pkg_name)
+
+            for ver_str in safe_listdir(path1):
+                path2 = os.path.join(path1, ver_str)
+
+                for hash_str in safe_listdir(path2):
+                    path3 = os.path.join(path2, hash_str)
+
+                    for name in safe_listdir(path3):
+                        if not name.endswith(".json"):
+                            continue
+
+                        try:
+                            with open(os.path.join(path3, name)) as f:
+                                data = json.loads(f.read())
+                        except (IOError, OSError, ValueError):
+                            continue  # maybe got cleaned up by other process
+
+                        incname = os.path.splitext(name)[0]
+                        relpath = '/'.join((pkg_name, ver_str, hash_str, incname))
+                        status = self._get_copying_status(os.path.join(path3, incname))
+                        if status == self.VARIANT_COPY_STALLED:
+                            status = self.VARIANT_COPYING
+
+                        key = self._get_index_key(data["handle"])
+                        variants[key] = [relpath, status]
+
+        return variants
+
+    def _remove_stale_index_entry(self, handle_dict, relpath):
+        with self._lock():
+            # check again, the variant may have been re-added in the meantime
+            entry = (self._get_index() or {}).get(self._get_index_key(handle_dict))
+            if entry is None or entry[0] != relpath:
+                return
+
+            rootpath = os.path.join(self.path, *relpath.split('/'))
+            if not os.path.exists(rootpath + ".json"):
+                self._update_index(handle_dict)
+
+    def _update_index(self, handle_dict, rootpath=None, status=None, size=None):
+        """Add, update or remove (if `rootpath` is None) an index entry.
+
+        The index is created if it does not yet exist. Must be called with the
+        lock acquired.
+        """
+        variants = self._get_index()
+        if variants is None:
+            variants = self._build_index()
+            changed = True
+        else:
+            variants = dict(variants)
+            changed = False
+
+        key = self._get_index_key(handle_dict)
+
+        if rootpath is None:
+            if variants.pop(key, None) is None and not changed:
+                return
+        else:
+            relpath = os.path.relpath(rootpath, self.path)
+            variants[key] = [relpath.replace(os.sep, '/'), status]
+            if size is not None:
+                variants[key].append(size)
+
+        with atomic_write(self._index_filepath, overwrite=True) as f:
+            f.write(json.dumps({"variants": variants}))
+
+        self._index = None
+
+    def _get_variant_size(self, variant, rootpath):
+        index = self._get_index() or {}
+        entry = index.get(self._get_index_key(variant.handle.to_dict()))
+
+        if entry is not None and len(entry) > 2:
+            return entry[2]
+        else:
+            return self._get_payload_size(rootpath)
+
+    @classmethod
+    def _get_payload_size(cls, rootpath):
+        # Note that deduplicated files are counted once per variant that they
+        # are linked into, so this overestimates disk usage in that case.
+        #
+        size = 0
+
+        for dirpath, dirnames, filenames in os.walk(rootpath):
+            for filename in filenames:
+                try:
+                    size += os.lstat(os.path.join(dirpath, filename)).st_size
+                except OSError:
+                    pass
+
+        return size
+
+    def _get_roots_in_use(self):
+        """Get cached variant roots in use by running processes.
+
+        Records left by processes that have exited are deleted.
+
+        Returns:
+            set of str: Cached variant roots.
+        """
+        host = socket.gethostname()
+        roots = set()
+
+        for name in safe_listdir(self._in_use_dir):
+            filepath = os.path.join(self._in_use_dir, name)
+
+            try:
+                with open(filepath) as f:
+                    data = json.loads(f.read())
+            except (IOError, OSError, ValueError):
+                continue  # maybe just deleted, or being written
+
+            # we can't tell if a process on another host is still running
+            if data["host"] == host and not _is_process_alive(data["pid"]):
+                safe_remove(filepath)
+                continue
+
+            for relpath in data["roots"]:
+                roots.add(os.path.join(self.path, *relpath.split('/')))
+
+        return roots
+
     def _get_hash_path(self, variant):
         dirs = [self.path, variant.name]
 
@@ -867,3 +1427,52 @@ class PackageCache(object):
         dirs.append(hash_dirname)
 
         return os.path.join(*dirs)
+
+
+class _Throttle(object):
+    """Limits the rate at which data is copied, across all threads.
+    """
+    def __init__(self, rate):
+        self.rate = float(rate)  # bytes per second
+        self.next_time = time.time()
+        self.lock = threading.Lock()
+
+    def consume(self, size):
+        """Wait until `size` bytes can be copied without exceeding the rate."""
+        with self.lock:
+            now = time.time()
+            start = max(now, self.next_time)
+            self.next_time = start + (size / self.rate)
+
+        if start > now:
+            time.sleep(start - now)
+
+
+def _is_process_alive(pid):
+    if platform.system() == "Windows":
+        import ctypes
+
+        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+        STILL_ACTIVE = 259
+        ERROR_ACCESS_DENIED = 5
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return (kernel32.GetLastError() == ERROR_ACCESS_DENIED)
+
+        try:
+            exit_code = ctypes.c_ulong()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+                return True
+            return (exit_code.value == STILL_ACTIVE)
+        finally:
+            kernel32.CloseHandle(handle)
+
+    try:
+        os.kill(pid, 0)
+    except OSError as e:
+        # EPERM means the process exists but belongs to another user
+        return (e.errno == errno.EPERM)
+
+    return True
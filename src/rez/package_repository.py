@@ -33,6 +33,34 @@ def create_memory_package_repository(repository_data):
     return cls_.create_repository(repository_data)
 
 
+def create_resource_pool():
+    """Create a resource pool, as configured by the 'resource_caching_*'
+    settings.
+
+    Returns:
+        `ResourcePool`: The pool.
+    """
+    def _megabytes(value):
+        return int(value * 1024 * 1024) if value else None
+
+    cache_size = config.resource_caching_maxsize
+    if cache_size < 0:  # -1 == unlimited
+        cache_size = None
+
+    subpool_limits = {}
+    for key, limits in (config.resource_caching_limits or {}).items():
+        subpool_limits[key] = {
+            "maxsize": limits.get("maxsize"),
+            "max_memory": _megabytes(limits.get("max_memory"))
+        }
+
+    return ResourcePool(
+        cache_size=cache_size,
+        max_memory=_megabytes(config.resource_caching_max_memory),
+        subpool_limits=subpool_limits
+    )
+
+
 class PackageRepositoryGlobalStats(threading.local):
     """Gathers stats across package repositories.
     """
@@ -41,16 +69,33 @@ class PackageRepositoryGlobalStats(threading.local):
         # repositories, since process start
         self.package_load_time = 0.0
 
+        # the number of package loads since process start
+        self.package_load_count = 0
+
+        # if set, package loads are recorded to this `rez.utils.trace.Trace`
+        # (see `Solver.solve`)
+        self.trace = None
+
     @contextmanager
-    def package_loading(self):
+    def package_loading(self, name=None, **args):
         """Use this around code in your package repository that is loading a
         package, for example from file or cache.
+
+        Args:
+            name (str): Name of the package being loaded, if known. This is
+                used to label trace events.
+            args: Extra trace event data, eg the filepath being loaded.
         """
         t1 = time.time()
         yield None
 
         t2 = time.time()
         self.package_load_time += t2 - t1
+        self.package_load_count += 1
+
+        if self.trace is not None:
+            self.trace.add_event("read %s" % (name or "package"), "repository",
+                                 t1, t2, package=name, **args)
 
 
 package_repo_stats = PackageRepositoryGlobalStats()
@@ -84,6 +129,7 @@ class PackageRepository(object):
         """
         self.location = location
         self.pool = resource_pool
+        self.pool.add_eviction_listener(self)
 
     def __str__(self):
         return "%s@%s" % (self.name(), self.location)
@@ -100,6 +146,18 @@ class PackageRepository(object):
         """Clear any cached resources in the pool."""
         self.pool.clear_caches()
 
+    def on_resource_evicted(self, resource_handle):
+        """Called when a resource is evicted from the pool.
+
+        Repositories that cache resources outside of the pool should discard
+        them here, so that the pool's limits actually limit memory use. Note
+        that the resource may belong to another repository sharing the pool.
+
+        Args:
+            resource_handle (`ResourceHandle`): Handle of the evicted resource.
+        """
+        pass
+
     @cached_property
     def uid(self):
         """Returns a unique identifier for this repository.
@@ -163,6 +221,37 @@ class PackageRepository(object):
         """
         raise NotImplementedError
 
+    def prefetch_packages(self, family_names=None):
+        """Prepare to iterate over the packages of many families.
+
+        This is called before a scan over many families, such as a reverse
+        dependency search. Repositories that can load families concurrently
+        may implement this to fill their caches ahead of time. The default
+        implementation does nothing.
+
+        Args:
+            family_names (list of str): Families about to be iterated over. If
+                None, all families are.
+        """
+        pass
+
+    def uncached_copy(self):
+        """Get a copy of this repository that does not cache resources.
+
+        This is used for scans over entire repositories (see the `cache`
+        argument of `rez.packages.iter_package_families`), where caching every
+        family and package would use memory in proportion to the size of the
+        repository. The copy should create resources as they are iterated over,
+        yield families in name order, and yield packages in version order.
+
+        The default implementation returns the repository itself, which is
+        appropriate for repositories that hold their contents in memory anyway.
+
+        Returns:
+            `PackageRepository`: Uncached repository.
+        """
+        return self
+
     def iter_variants(self, package_resource):
         """Iterate over the variants within the given package.
 
@@ -414,6 +503,30 @@ class PackageRepository(object):
         """
         return 0
 
+    def get_last_release_times(self, family_names):
+        """Get the last release times of many package families.
+
+        This is used to validate cached resolves, which depend on the release
+        times of every package in the resolve. Repositories that can get many
+        release times faster than one at a time should implement this. The
+        default implementation calls `get_last_release_time` for each family.
+
+        Args:
+            family_names (list of str): Names of the package families.
+
+        Returns:
+            dict: Family name -> epoch time at which a package was last
+            changed/added/removed from the family, or zero if unknown. Families
+            that are not in this repository are not included.
+        """
+        times = {}
+        for name in family_names:
+            family_resource = self.get_package_family(name)
+            if family_resource:
+                times[name] = self.get_last_release_time(family_resource)
+
+        return times
+
     def make_resource_handle(self, resource_key, **variables):
         """Create a `ResourceHandle`
 
@@ -525,11 +638,7 @@ class PackageRepositoryManager(object):
                 None, a default pool is created based on config settings.
         """
         if resource_pool is None:
-            cache_size = config.resource_caching_maxsize
-            if cache_size < 0:  # -1 == disable caching
-                cache_size = None
-
-            resource_pool = ResourcePool(cache_size=cache_size)
+            resource_pool = create_resource_pool()
 
         self.pool = resource_pool
         self.repositories = {}
@@ -388,9 +388,45 @@ class VariantResource(PackageResource):
 
 class PackageResourceHelper(PackageResource):
     """PackageResource with some common functionality included.
+
+    Keys in `light_keys` (those needed by the solver) are read from
+    `_light_data` if the repository provides it, so that a package can take
+    part in a resolve without its definition being loaded. The definition is
+    only loaded when some other attribute, such as `commands`, is accessed.
     """
     variant_key = None
 
+    # keys that can be read from `_light_data`. Note that 'version' is a
+    # resource variable, so is always available
+    light_keys = frozenset([
+        "requires",
+        "build_requires",
+        "private_build_requires",
+        "variants",
+        "timestamp"
+    ])
+
+    @property
+    def _light_data(self):
+        """Get package data that is cheaper to get than loading the package.
+
+        Override this in your repository's package resource to provide it.
+
+        Returns:
+            dict: Data containing all of the package's `light_keys` that the
+            package defines, or None if not available.
+        """
+        return None
+
+    def _data_for_key(self, key):
+        # use loaded data if present, the light data is never more current
+        if key in self.light_keys and "_data" not in self.__dict__:
+            data = self._light_data
+            if data is not None:
+                return data
+
+        return self._data
+
     @cached_property
     def commands(self):
         return self._convert_to_rex(self._commands)
@@ -11,10 +11,11 @@ that do not provide an implementation.
 """
 
 import fnmatch
-from collections import defaultdict
+from collections import defaultdict, deque
 import sys
 
-from rez.packages import iter_package_families, iter_packages, get_latest_package
+from rez.packages import iter_package_families, iter_packages, get_latest_package, \
+    prefetch_packages
 from rez.exceptions import PackageFamilyNotFoundError, ResourceContentError
 from rez.util import ProgressBar
 from rez.utils.colorize import critical, info, error, Printer
@@ -28,7 +29,7 @@ from rez.vendor.version.requirement import Requirement
 
 def get_reverse_dependency_tree(package_name, depth=None, paths=None,
                                 build_requires=False,
-                                private_build_requires=False):
+                                private_build_requires=False, cache=True):
     """Find packages that depend on the given package.
 
     This is a reverse dependency lookup. A tree is constructed, showing what
@@ -44,6 +45,10 @@ def get_reverse_dependency_tree(package_name, depth=None, paths=None,
         build_requires (bool): If True, includes packages' build_requires.
         private_build_requires (bool): If True, include `package_name`'s
             private_build_requires.
+        cache (bool): If False, packages are not cached as they are searched,
+            so that memory use does not grow with the size of the searched
+            repositories. Package families are then scanned one at a time,
+            rather than concurrently (see `prefetch_packages`).
 
     Returns:
         A 2-tuple:
@@ -57,7 +62,7 @@ def get_reverse_dependency_tree(package_name, depth=None, paths=None,
     g.add_node(package_name)
 
     # build reverse lookup
-    it = iter_package_families(paths)
+    it = iter_package_families(paths, cache=cache)
     package_names = set(x.name for x in it)
     if package_name not in package_names:
         raise PackageFamilyNotFoundError("No such package family %r" % package_name)
@@ -65,16 +70,27 @@ def get_reverse_dependency_tree(package_name, depth=None, paths=None,
     if depth == 0:
         return pkgs_list, g
 
+    if cache:
+        prefetch_packages(package_names, paths=paths)
+
     bar = ProgressBar("Searching", len(package_names))
     lookup = defaultdict(set)
 
     for i, package_name_ in enumerate(package_names):
-        it = iter_packages(name=package_name_, paths=paths)
-        packages = list(it)
-        if not packages:
-            continue
+        it = iter_packages(name=package_name_, paths=paths, cache=cache)
+        if cache:
+            packages = list(it)
+            if not packages:
+                continue
+
+            pkg = max(packages, key=lambda x: x.version)
+        else:
+            # packages are in version order
+            packages = deque(it, maxlen=1)
+            if not packages:
+                continue
 
-        pkg = max(packages, key=lambda x: x.version)
+            pkg = packages[0]
         requires = []
 
         for variant in pkg.iter_variants():
@@ -142,6 +158,8 @@ def get_plugins(package_name, paths=None):
 
     it = iter_package_families(paths)
     package_names = set(x.name for x in it)
+    prefetch_packages(package_names, paths=paths)
+
     bar = ProgressBar("Searching", len(package_names))
 
     plugin_pkgs = []
@@ -176,7 +194,8 @@ class ResourceSearcher(object):
     """Search for resources (packages, variants or package families).
     """
     def __init__(self, package_paths=None, resource_type=None, no_local=False,
-                 latest=False, after_time=None, before_time=None, validate=False):
+                 latest=False, after_time=None, before_time=None, validate=False,
+                 cache=True):
         """Create resource search.
 
         Args:
@@ -193,6 +212,9 @@ class ResourceSearcher(object):
                 epoch time
             validate (bool): Validate each resource that is found. If False,
                 results are not validated (ie, `validation_error` is None).
+            cache (bool): If False, packages are not cached as they are
+                searched. Use this with `iter_resources` to search large
+                repositories with bounded memory use.
 
         Returns:
             List of `ResourceSearchResult` objects
@@ -203,6 +225,7 @@ class ResourceSearcher(object):
         self.after_time = after_time
         self.before_time = before_time
         self.validate = validate
+        self.cache = cache
 
         if package_paths:
             self.package_paths = package_paths
@@ -225,27 +248,12 @@ class ResourceSearcher(object):
               in alphabetical order if families, and version ascending for
               packages or variants.
         """
-
-    def search(self, resources_request=None):
-        """Search for resources.
-
-        Args:
-            resources_request (str): Resource to search, glob-style patterns
-                are supported. If None, returns all matching resource types.
-
-        Returns:
-            2-tuple:
-            - str: resource type (family, package, variant);
-            - List of `ResourceSearchResult`: Matching resources. Will be in
-              alphabetical order if families, and version ascending for
-              packages or variants.
-        """
-
         # Find matching package families
         name_pattern, version_range = self._parse_request(resources_request)
 
         family_names = set(
-            x.name for x in iter_package_families(paths=self.package_paths)
+            x.name for x in iter_package_families(paths=self.package_paths,
+                                                  cache=self.cache)
             if fnmatch.fnmatch(x.name, name_pattern)
         )
 
@@ -260,22 +268,32 @@ class ResourceSearcher(object):
             resource_type = "family"
 
         if not family_names:
-            return resource_type, []
+            return resource_type, iter([])
 
-        # return list of family names (validation is n/a in this case)
+        # return family names (validation is n/a in this case)
         if resource_type == "family":
-            results = [ResourceSearchResult(x, "family") for x in family_names]
+            results = (ResourceSearchResult(x, "family") for x in family_names)
             return "family", results
 
-        results = []
+        if self.cache and len(family_names) > 1:
+            prefetch_packages(family_names, paths=self.package_paths)
 
+        results = self._iter_resources(resource_type, family_names, version_range)
+        return resource_type, results
+
+    def _iter_resources(self, resource_type, family_names, version_range):
         # iterate over packages/variants
         for name in family_names:
-            it = iter_packages(name, version_range, paths=self.package_paths)
-            packages = sorted(it, key=lambda x: x.version)
+            it = iter_packages(name, version_range, paths=self.package_paths,
+                               cache=self.cache)
+
+            if self.cache:
+                packages = sorted(it, key=lambda x: x.version)
+            else:
+                packages = it  # already in version order
 
-            if self.latest and packages:
-                packages = [packages[-1]]
+            if self.latest:
+                packages = deque(packages, maxlen=1)
 
             for package in packages:
                 # validate and check time (accessing timestamp may cause
@@ -293,13 +311,13 @@ class ResourceSearcher(object):
                 except ResourceContentError as e:
                     if resource_type == "package":
                         result = ResourceSearchResult(package, "package", str(e))
-                        results.append(result)
+                        yield result
 
                     continue
 
                 if resource_type == "package":
                     result = ResourceSearchResult(package, "package")
-                    results.append(result)
+                    yield result
                     continue
 
                 # iterate variants
@@ -311,17 +329,32 @@ class ResourceSearcher(object):
                             except ResourceContentError as e:
                                 result = ResourceSearchResult(
                                     variant, "variant", str(e))
-                                results.append(result)
+                                yield result
                                 continue
 
                         result = ResourceSearchResult(variant, "variant")
-                        results.append(result)
+                        yield result
 
                 except ResourceContentError:
                     # this may happen if 'variants' in package is malformed
                     continue
 
-        return resource_type, results
+    def search(self, resources_request=None):
+        """Search for resources.
+
+        Args:
+            resources_request (str): Resource to search, glob-style patterns
+                are supported. If None, returns all matching resource types.
+
+        Returns:
+            2-tuple:
+            - str: resource type (family, package, variant);
+            - List of `ResourceSearchResult`: Matching resources. Will be in
+              alphabetical order if families, and version ascending for
+              packages or variants.
+        """
+        resource_type, results = self.iter_resources(resources_request)
+        return resource_type, list(results)
 
     @classmethod
     def _parse_request(cls, resources_request):
@@ -20,6 +20,7 @@ from rez.vendor.six import six
 from rez.serialise import FileFormat
 from rez.config import config
 
+import heapq
 import os
 import sys
 
@@ -518,7 +519,7 @@ class PackageSearchPath(object):
 # resource acquisition functions
 # ------------------------------------------------------------------------------
 
-def iter_package_families(paths=None):
+def iter_package_families(paths=None, cache=True):
     """Iterate over package families, in no particular order.
 
     Note that multiple package families with the same name can be returned.
@@ -528,22 +529,26 @@ def iter_package_families(paths=None):
     Args:
         paths (list of str, optional): paths to search for package families,
             defaults to `config.packages_path`.
+        cache (bool): If False, families are read from uncached copies of the
+            repositories (see `PackageRepository.uncached_copy`), and are
+            yielded in name order within each repository. Use this to scan
+            entire repositories without holding them in memory.
 
     Returns:
         `PackageFamily` iterator.
     """
     for path in (paths or config.packages_path):
-        repo = package_repository_manager.get_repository(path)
+        repo = _get_repository(path, cache=cache)
         for resource in repo.iter_package_families():
             yield PackageFamily(resource)
 
 
-def iter_packages(name, range_=None, paths=None):
+def iter_packages(name, range_=None, paths=None, cache=True):
     """Iterate over `Package` instances, in no particular order.
 
     Packages of the same name and version earlier in the search path take
     precedence - equivalent packages later in the paths are ignored. Packages
-    are not returned in any specific order.
+    are not returned in any specific order, unless `cache` is False.
 
     Args:
         name (str): Name of the package, eg 'maya'.
@@ -551,27 +556,71 @@ def iter_packages(name, range_=None, paths=None):
             to those in `range_`.
         paths (list of str, optional): paths to search for packages, defaults
             to `config.packages_path`.
+        cache (bool): If False, packages are read from uncached copies of the
+            repositories (see `PackageRepository.uncached_copy`), and are
+            yielded in ascending version order.
 
     Returns:
         `Package` iterator.
     """
-    entries = _get_families(name, paths)
+    if range_ and isinstance(range_, basestring):
+        range_ = VersionRange(range_)
 
-    seen = set()
-    for repo, family_resource in entries:
-        for package_resource in repo.iter_packages(family_resource):
-            key = (package_resource.name, package_resource.version)
-            if key in seen:
-                continue
-
-            seen.add(key)
-            if range_:
-                if isinstance(range_, basestring):
-                    range_ = VersionRange(range_)
-                if package_resource.version not in range_:
+    entries = _get_families(name, paths, cache=cache)
+
+    if cache:
+        seen = set()
+        for repo, family_resource in entries:
+            for package_resource in repo.iter_packages(family_resource):
+                key = (package_resource.name, package_resource.version)
+                if key in seen:
+                    continue
+
+                seen.add(key)
+                if range_ and package_resource.version not in range_:
                     continue
 
-            yield Package(package_resource)
+                yield Package(package_resource)
+        return
+
+    # Merge the (version-ordered) packages of each repository. Equal versions
+    # are adjacent, and ordered by searchpath position, so only the first of
+    # each needs to be kept.
+    def _iter_packages(i, repo, family_resource):
+        for package_resource in repo.iter_packages(family_resource):
+            yield (package_resource.version, i), package_resource
+
+    its = [_iter_packages(i, repo, family_resource)
+           for i, (repo, family_resource) in enumerate(entries)]
+
+    prev_version = None
+    for (version, _), package_resource in heapq.merge(*its):
+        if version == prev_version:
+            continue
+
+        prev_version = version
+        if range_ and version not in range_:
+            continue
+
+        yield Package(package_resource)
+
+
+def prefetch_packages(family_names=None, paths=None):
+    """Prepare to iterate over the packages of many families.
+
+    Call this before iterating over the packages of many families. Some
+    repository types (such as 'filesystem') will scan the families
+    concurrently, which is much faster on high-latency filesystems.
+
+    Args:
+        family_names (list of str, optional): Families about to be iterated
+            over. If None, all families are.
+        paths (list of str, optional): paths to search for packages, defaults
+            to `config.packages_path`.
+    """
+    for path in (paths or config.packages_path):
+        repo = package_repository_manager.get_repository(path)
+        repo.prefetch_packages(family_names)
 
 
 def get_package(name, version, paths=None):
@@ -837,15 +886,41 @@ def get_last_release_time(name, paths=None):
         int: Epoch time of last package release, or zero if this cannot be
         determined.
     """
-    entries = _get_families(name, paths)
-    max_time = 0
+    return get_last_release_times([name], paths=paths)[name]
+
+
+def get_last_release_times(names, paths=None):
+    """Returns the most recent release times of many packages.
+
+    This is equivalent to calling `get_last_release_time` for each package,
+    but each repository is queried only once.
+
+    Args:
+        names (list of str): Package family names.
+        paths (list of str): paths to search for packages, defaults to
+            `config.packages_path`.
+
+    Returns:
+        dict: Package family name -> epoch time of last package release, or
+        zero if this cannot be determined.
+    """
+    names = list(names)
+    max_times = dict((x, 0) for x in names)
+    unknown = set()
+
+    for path in (paths or config.packages_path):
+        repo = package_repository_manager.get_repository(path)
+        times = repo.get_last_release_times(names)
+
+        for name, time_ in times.items():
+            if time_ == 0:
+                unknown.add(name)
+            else:
+                max_times[name] = max(max_times[name], time_)
 
-    for repo, family_resource in entries:
-        time_ = repo.get_last_release_time(family_resource)
-        if time_ == 0:
-            return 0
-        max_time = max(max_time, time_)
-    return max_time
+    for name in unknown:
+        max_times[name] = 0
+    return max_times
 
 
 def get_completions(prefix, paths=None, family_only=False):
@@ -949,10 +1024,17 @@ def get_latest_package_from_string(txt, paths=None, error=False):
                               error=error)
 
 
-def _get_families(name, paths=None):
+def _get_repository(path, cache=True):
+    repo = package_repository_manager.get_repository(path)
+    if not cache:
+        repo = repo.uncached_copy()
+    return repo
+
+
+def _get_families(name, paths=None, cache=True):
     entries = []
     for path in (paths or config.packages_path):
-        repo = package_repository_manager.get_repository(path)
+        repo = _get_repository(path, cache=cache)
         family_resource = repo.get_package_family(name)
         if family_resource:
             entries.append((repo, family_resource))
@@ -164,7 +164,9 @@ class ResolvedContext(object):
                  package_filter=None, package_orderers=None, max_fails=-1,
                  add_implicit_packages=True, time_limit=-1, callback=None,
                  package_load_callback=None, buf=None, suppress_passive=False,
-                 print_stats=False, package_caching=None):
+                 print_stats=False, package_caching=None,
+                 package_variant_cache=None, seed_context=None,
+                 solver_trace=None):
         """Perform a package resolve, and store the result.
 
         Args:
@@ -203,6 +205,17 @@ class ResolvedContext(object):
             package_caching (bool|None): If True, apply package caching settings
                 as per the config. If None, enable as determined by config
                 setting 'package_cache_during_build'.
+            package_variant_cache (`PackageVariantCache`): Cache of loaded
+                package variants, shared between resolves. See `resolve_many`.
+            seed_context (`ResolvedContext`): A previous context, typically
+                the one being patched (see `get_patched_request`). Its resolved
+                variants are tried first, which makes resolving a small change
+                to the context much faster. The result may differ from an
+                unseeded resolve, since still-valid seed variants are kept.
+            solver_trace (`rez.utils.trace.Trace`): If not None, timed solver
+                events are recorded to this trace, which can then be written
+                to file for viewing in chrome://tracing or speedscope. A traced
+                resolve never reads from the resolve cache.
         """
         self.load_path = None
 
@@ -296,6 +309,10 @@ class ResolvedContext(object):
 
         request = self.requested_packages(include_implicit=True)
 
+        seed_variants = None
+        if seed_context is not None and seed_context.success:
+            seed_variants = seed_context.resolved_packages
+
         resolver = Resolver(context=self,
                             package_requests=request,
                             package_paths=self.package_paths,
@@ -309,7 +326,10 @@ class ResolvedContext(object):
                             verbosity=verbosity,
                             buf=buf,
                             suppress_passive=suppress_passive,
-                            print_stats=print_stats)
+                            print_stats=print_stats,
+                            package_variant_cache=package_variant_cache,
+                            seed_variants=seed_variants,
+                            trace=solver_trace)
 
         resolver.solve()
 
@@ -2005,9 +2025,13 @@ class ResolvedContext(object):
         else:
             pkgcache = None
 
+        cached_roots = []
+
         for pkg in resolved_pkgs:
             if pkgcache:
                 cached_root = pkgcache.get_cached_root(pkg)
+                if cached_root:
+                    cached_roots.append(cached_root)
             else:
                 cached_root = None
 
@@ -2016,6 +2040,10 @@ class ResolvedContext(object):
             )
             variant_bindings[pkg.name] = variant_binding
 
+        # stop cached variants being cleaned while this context is in use
+        if cached_roots:
+            pkgcache.mark_in_use(cached_roots)
+
         # binds objects such as 'request', which are accessible before a resolve
         pre_resolve_bindings = self._get_pre_resolve_bindings()
         for k, v in pre_resolve_bindings.items():
@@ -2157,3 +2185,124 @@ class ResolvedContext(object):
         for path in suite_paths:
             tools_path = os.path.join(path, "bin")
             executor.env.PATH.append(tools_path)
+
+
+def resolve_many(package_requests, package_paths=None, package_filter=None,
+                 package_orderers=None, max_workers=0, **kwargs):
+    """Resolve many package requests, sharing package loading between them.
+
+    All resolves share a single `PackageVariantCache`, so each package is
+    loaded, filtered and has its requirements parsed only once, rather than
+    once per resolve. This is considerably faster than creating many
+    `ResolvedContext` objects in a loop.
+
+    Args:
+        package_requests (list of list of str): The requests to resolve.
+        package_paths: See `ResolvedContext`.
+        package_filter (`PackageFilterBase`): See `ResolvedContext`.
+        package_orderers (list of `PackageOrder`): See `ResolvedContext`.
+        max_workers (int): If greater than 1, resolves are distributed over
+            this many worker processes, each of which holds its own shared
+            cache. In this case, contexts are yielded in order of completion,
+            rather than in request order.
+        kwargs: Extra arguments passed to each `ResolvedContext`. Note that
+            callables (such as `callback`) and `buf` are not supported when
+            `max_workers` is greater than 1.
+
+    Yields:
+        2-tuple: (int, `ResolvedContext`), where the int is the index of the
+        request in `package_requests`.
+
+    Note:
+        Late binding package attributes that are evaluated during a solve (such
+        as a late bound 'requires') are evaluated with the first context that
+        loaded the package.
+    """
+    from rez.solver import PackageVariantCache
+
+    if max_workers > 1:
+        for i, context in _resolve_many_parallel(package_requests,
+                                                 package_paths=package_paths,
+                                                 package_filter=package_filter,
+                                                 package_orderers=package_orderers,
+                                                 max_workers=max_workers,
+                                                 **kwargs):
+            yield i, context
+        return
+
+    package_variant_cache = PackageVariantCache()
+
+    for i, request in enumerate(package_requests):
+        context = ResolvedContext(package_requests=request,
+                                  package_paths=package_paths,
+                                  package_filter=package_filter,
+                                  package_orderers=package_orderers,
+                                  package_variant_cache=package_variant_cache,
+                                  **kwargs)
+        yield i, context
+
+
+def _resolve_many_parallel(package_requests, package_paths, package_filter,
+                           package_orderers, max_workers, **kwargs):
+    import multiprocessing
+
+    # the package filter and orderers are passed to the workers in POD form
+    if package_filter is not None:
+        package_filter = package_filter.to_pod()
+    if package_orderers is not None:
+        package_orderers = [package_order.to_pod(x) for x in package_orderers]
+
+    init_args = (package_paths, package_filter, package_orderers, kwargs)
+    jobs = [(i, [str(x) for x in request])
+            for i, request in enumerate(package_requests)]
+
+    pool = multiprocessing.Pool(processes=max_workers,
+                                initializer=_init_resolve_worker,
+                                initargs=init_args)
+    try:
+        for i, data in pool.imap_unordered(_resolve_many_job, jobs):
+            yield i, ResolvedContext.from_dict(data)
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+# state held by each resolve_many worker process
+_resolve_worker_state = {}
+
+
+def _init_resolve_worker(package_paths, package_filter, package_orderers, kwargs):
+    import signal
+
+    # the rez cli's SIGTERM handler kills the whole process group, so restore
+    # the default, and leave keyboard interrupts to the parent process
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    from rez.solver import PackageVariantCache
+
+    if package_filter is not None:
+        package_filter = PackageFilterList.from_pod(package_filter)
+    if package_orderers is not None:
+        package_orderers = [package_order.from_pod(x) for x in package_orderers]
+
+    _resolve_worker_state.update(
+        package_paths=package_paths,
+        package_filter=package_filter,
+        package_orderers=package_orderers,
+        package_variant_cache=PackageVariantCache(),
+        kwargs=kwargs
+    )
+
+
+def _resolve_many_job(job):
+    i, request = job
+    state = _resolve_worker_state
+
+    context = ResolvedContext(package_requests=request,
+                              package_paths=state["package_paths"],
+                              package_filter=state["package_filter"],
+                              package_orderers=state["package_orderers"],
+                              package_variant_cache=state["package_variant_cache"],
+                              **state["kwargs"])
+    return i, context.to_dict()
@@ -2,9 +2,10 @@
 # Copyright Contributors to the Rez Project
 
 
-from rez.solver import Solver, SolverStatus
+from rez import __version__
+from rez.solver import Solver, SolverStatus, PackageVariantCache
 from rez.package_repository import package_repository_manager
-from rez.packages import get_variant, get_last_release_time
+from rez.packages import get_variant, get_last_release_times
 from rez.package_filter import PackageFilterList, TimestampRule
 from rez.utils.memcached import memcached_client, pool_memcached_connections
 from rez.utils.logging_ import log_duration
@@ -13,6 +14,10 @@ from rez.vendor.enum import Enum
 from rez.vendor.version.requirement import Requirement
 from contextlib import contextmanager
 from hashlib import sha1
+import pickle
+import sqlite3
+import time
+import os
 
 
 class ResolverStatus(Enum):
@@ -29,16 +34,263 @@ class ResolverStatus(Enum):
         self.description = description
 
 
+class ResolveCache(object):
+    """A cache of resolves.
+
+    Entries are keyed by strings (see `Resolver._memcache_key`), and values are
+    picklable objects. `Resolver` takes care of validating entries - a cache
+    only has to store them. Implementations must be safe to use from many
+    processes at once.
+    """
+    def get(self, key):
+        """Get a cached entry.
+
+        Returns:
+            object: The cached value, or None if there is no entry.
+        """
+        raise NotImplementedError
+
+    def set(self, key, value):
+        """Store an entry."""
+        raise NotImplementedError
+
+    def delete(self, key):
+        """Remove an entry, if it exists."""
+        raise NotImplementedError
+
+
+class MemcachedResolveCache(ResolveCache):
+    """Resolve cache stored in memcached."""
+    def __init__(self, servers):
+        self.servers = servers
+
+    def get(self, key):
+        with self._client() as client:
+            return client.get(key) or None
+
+    def set(self, key, value):
+        with self._client() as client:
+            client.set(key, value)
+
+    def delete(self, key):
+        with self._client() as client:
+            client.delete(key)
+
+    @contextmanager
+    def _client(self):
+        with memcached_client(self.servers,
+                              debug=config.debug_memcache) as client:
+            yield client
+
+
+class FileResolveCache(ResolveCache):
+    """Resolve cache stored in a sqlite database on local disk.
+
+    When the total size of the cache exceeds `max_size`, least recently used
+    entries are evicted. Sqlite locking makes it safe for many processes to
+    read and write the cache at once, however this is unreliable over NFS, so
+    the cache should be on local disk.
+
+    Errors accessing the database are never raised - a resolve simply does not
+    get cached.
+    """
+    db_filename = "resolves.db"
+
+    # seconds to wait on a database locked by another process
+    timeout = 10
+
+    # last-access times are not updated more often than this (in seconds),
+    # to avoid a write on every cache hit
+    atime_resolution = 60
+
+    def __init__(self, path, max_size=0):
+        """Create a file resolve cache.
+
+        Args:
+            path (str): Directory to store the cache in. It is created if it
+                does not exist.
+            max_size (int): Maximum size of the cache in bytes. If zero, the
+                cache size is unbounded.
+        """
+        self.path = path
+        self.max_size = max_size
+        self._conn = None
+        self._print = config.debug_printer("resolve_memcache")
+
+    @property
+    def filepath(self):
+        return os.path.join(self.path, self.db_filename)
+
+    def get(self, key):
+        try:
+            return self._get(self._hash_key(key))
+        except Exception as e:
+            # includes unpickling errors - a cache read must never break a
+            # resolve
+            self._print("Error reading resolve cache %r: %s", self.filepath, e)
+            return None
+
+    def set(self, key, value):
+        data = pickle.dumps(value, protocol=2)
+
+        try:
+            self._set(self._hash_key(key), data)
+        except (sqlite3.Error, EnvironmentError) as e:
+            self._print("Error writing resolve cache %r: %s", self.filepath, e)
+
+    def delete(self, key):
+        try:
+            with self._transaction() as conn:
+                conn.execute("DELETE FROM resolves WHERE key = ?",
+                             (self._hash_key(key),))
+        except (sqlite3.Error, EnvironmentError) as e:
+            self._print("Error writing resolve cache %r: %s", self.filepath, e)
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM resolves")
+
+    def get_size(self):
+        """Get the total size of entries in the cache.
+
+        Returns:
+            int: Size in bytes.
+        """
+        row = self.connection.execute("SELECT SUM(size) FROM resolves").fetchone()
+        return row[0] or 0
+
+    @property
+    def connection(self):
+        if self._conn is None:
+            if not os.path.exists(self.path):
+                try:
+                    os.makedirs(self.path)
+                except OSError:
+                    if not os.path.isdir(self.path):
+                        raise
+
+            conn = sqlite3.connect(self.filepath, timeout=self.timeout,
+                                   isolation_level=None)
+
+            # allows readers to continue while another process writes
+            conn.execute("PRAGMA journal_mode=WAL")
+
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS resolves ("
+                "key TEXT PRIMARY KEY, value BLOB, size INTEGER, atime REAL)")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS resolves_atime ON resolves (atime)")
+
+            self._conn = conn
+
+        return self._conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self.connection
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    def _get(self, hashed_key):
+        row = self.connection.execute(
+            "SELECT value, atime FROM resolves WHERE key = ?",
+            (hashed_key,)).fetchone()
+
+        if row is None:
+            return None
+
+        data, atime = row
+        now = time.time()
+
+        if now - atime > self.atime_resolution:
+            with self._transaction() as conn:
+                conn.execute("UPDATE resolves SET atime = ? WHERE key = ?",
+                             (now, hashed_key))
+
+        return pickle.loads(bytes(data))
+
+    def _set(self, hashed_key, data):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO resolves (key, value, size, atime) "
+                "VALUES (?, ?, ?, ?)",
+                (hashed_key, sqlite3.Binary(data), len(data), time.time()))
+
+            if self.max_size > 0:
+                self._evict(conn)
+
+    def _evict(self, conn):
+        # remove least recently used entries until the cache fits
+        total_size = conn.execute("SELECT SUM(size) FROM resolves").fetchone()[0]
+        excess = (total_size or 0) - self.max_size
+        if excess <= 0:
+            return
+
+        evicted_keys = []
+        for key, size in conn.execute(
+                "SELECT key, size FROM resolves ORDER BY atime"):
+            evicted_keys.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+
+        conn.executemany("DELETE FROM resolves WHERE key = ?", evicted_keys)
+        self._print("Evicted %d entries from resolve cache %r",
+                    len(evicted_keys), self.filepath)
+
+    @classmethod
+    def _hash_key(cls, key):
+        # entries pickled by other rez versions may not be compatible
+        txt = "%s:%s" % (__version__, key)
+        return sha1(txt.encode("utf-8")).hexdigest()
+
+
+def get_resolve_cache():
+    """Get the resolve cache, as determined by config.
+
+    Memcached is used if `memcached_uri` is set, otherwise a `FileResolveCache`
+    is used if `resolve_cache_path` is set.
+
+    Returns:
+        `ResolveCache`: The resolve cache, or None if resolve caching is
+        disabled.
+    """
+    if not config.resolve_caching:
+        return None
+
+    if config.memcached_uri:
+        return MemcachedResolveCache(config.memcached_uri)
+
+    if config.resolve_cache_path:
+        path = os.path.expanduser(config.resolve_cache_path)
+        max_size = config.resolve_cache_max_size * 1024 * 1024
+        return FileResolveCache(path, max_size=max_size)
+
+    return None
+
+
 class Resolver(object):
     """The package resolver.
 
     The Resolver uses a combination of Solver(s) and cache(s) to resolve a
     package request as quickly as possible.
     """
+    # max number of seeded solves tried before a full solve (see
+    # `_solve_seeded`)
+    max_seed_attempts = 5
+
     def __init__(self, context, package_requests, package_paths, package_filter=None,
                  package_orderers=None, timestamp=0, callback=None, building=False,
                  verbosity=False, buf=None, package_load_callback=None, caching=True,
-                 suppress_passive=False, print_stats=False):
+                 suppress_passive=False, print_stats=False, resolve_cache=None,
+                 package_variant_cache=None, seed_variants=None, trace=None):
         """Create a Resolver.
 
         Args:
@@ -55,6 +307,16 @@ class Resolver(object):
             caching: If True, cache(s) may be used to speed the resolve. If
                 False, caches will not be used.
             print_stats (bool): If true, print advanced solver stats at the end.
+            resolve_cache (`ResolveCache`): Cache to store resolves in. If
+                None, the cache is determined by config (see
+                `get_resolve_cache`).
+            package_variant_cache (`PackageVariantCache`): See `Solver`.
+            seed_variants (list of `Variant`): Variants from a previous
+                resolve, such as the context being patched. These are tried
+                first, and only the variants that no longer satisfy the request
+                are searched for again (see `_solve_seeded`).
+            trace (`rez.utils.trace.Trace`): See `Solver`. Cached resolves
+                are not read when tracing, so that the solve is always traced.
         """
         self.context = context
         self.package_requests = package_requests
@@ -69,6 +331,9 @@ class Resolver(object):
         self.buf = buf
         self.suppress_passive = suppress_passive
         self.print_stats = print_stats
+        self.package_variant_cache = package_variant_cache
+        self.seed_variants = seed_variants
+        self.trace = trace
 
         # store hash of package orderers. This is used in the memcached key
         if package_orderers:
@@ -101,7 +366,8 @@ class Resolver(object):
         self.failure_description = None
         self.graph_ = None
         self.from_cache = False
-        self.memcached_servers = config.memcached_uri if config.resolve_caching else None
+        self.from_seed = False
+        self.resolve_cache = resolve_cache or get_resolve_cache()
 
         self.solve_time = 0.0  # time spent solving
         self.load_time = 0.0   # time spent loading package resources
@@ -112,8 +378,11 @@ class Resolver(object):
     def solve(self):
         """Perform the solve.
         """
-        with log_duration(self._print, "memcache get (resolve) took %s"):
-            solver_dict = self._get_cached_solve()
+        if self.trace is None:
+            with log_duration(self._print, "memcache get (resolve) took %s"):
+                solver_dict = self._get_cached_solve()
+        else:
+            solver_dict = None
 
         if solver_dict:
             self.from_cache = True
@@ -124,8 +393,11 @@ class Resolver(object):
             solver_dict = self._solver_to_dict(solver)
             self._set_result(solver_dict)
 
-            with log_duration(self._print, "memcache set (resolve) took %s"):
-                self._set_cached_solve(solver_dict)
+            # a seeded solve may differ from an unseeded solve of the same
+            # request, so it isn't stored
+            if not self.from_seed:
+                with log_duration(self._print, "memcache set (resolve) took %s"):
+                    self._set_cached_solve(solver_dict)
 
     @property
     def status(self):
@@ -171,7 +443,7 @@ class Resolver(object):
         return get_variant(variant_handle, context=self.context)
 
     def _get_cached_solve(self):
-        """Find a memcached resolve.
+        """Find a cached resolve.
 
         If there is NOT a resolve timestamp:
             - fetch a non-timestamped memcache entry;
@@ -211,7 +483,7 @@ class Resolver(object):
         consider a workflow where a work area is tied down to a particular
         timestamp in order to 'lock' it from any further software releases).
         """
-        if not (self.caching and self.memcached_servers):
+        if not (self.caching and self.resolve_cache):
             return None
 
         # these caches avoids some potentially repeated file stats
@@ -227,15 +499,13 @@ class Resolver(object):
             return None
 
         def _delete_cache_entry(key):
-            with self._memcached_client() as client:
-                client.delete(key)
+            self.resolve_cache.delete(key)
             self._print("Discarded entry: %r", key)
 
         def _retrieve(timestamped):
             key = self._memcache_key(timestamped=timestamped)
             self._print("Retrieving memcache key: %r", key)
-            with self._memcached_client() as client:
-                data = client.get(key)
+            data = self.resolve_cache.get(key)
             return key, data
 
         def _packages_changed(key, data):
@@ -266,11 +536,15 @@ class Resolver(object):
 
         def _releases_since_solve(key, data):
             _, release_times_dict, _ = data
+
+            names = [x for x in release_times_dict.keys()
+                     if x not in last_release_times]
+            if names:
+                last_release_times.update(
+                    get_last_release_times(names, self.package_paths))
+
             for package_name, release_time in release_times_dict.items():
-                time_ = last_release_times.get(package_name)
-                if time_ is None:
-                    time_ = get_last_release_time(package_name, self.package_paths)
-                    last_release_times[package_name] = time_
+                time_ = last_release_times[package_name]
 
                 if time_ != release_time:
                     self._print(
@@ -316,14 +590,8 @@ class Resolver(object):
             else:
                 return _hit(data)
 
-    @contextmanager
-    def _memcached_client(self):
-        with memcached_client(self.memcached_servers,
-                              debug=config.debug_memcache) as client:
-            yield client
-
     def _set_cached_solve(self, solver_dict):
-        """Store a solve to memcached.
+        """Store a solve to the resolve cache.
 
         If there is NOT a resolve timestamp:
             - store the solve to a non-timestamped entry.
@@ -337,7 +605,7 @@ class Resolver(object):
         if self.status_ != ResolverStatus.solved:
             return  # don't cache failed solves
 
-        if not (self.caching and self.memcached_servers):
+        if not (self.caching and self.resolve_cache):
             return
 
         # most recent release times get stored with solve result in the cache
@@ -345,8 +613,11 @@ class Resolver(object):
         release_times_dict = {}
         variant_states_dict = {}
 
+        last_release_times = get_last_release_times(
+            [x.name for x in self.resolved_packages_], self.package_paths)
+
         for variant in self.resolved_packages_:
-            time_ = get_last_release_time(variant.name, self.package_paths)
+            time_ = last_release_times[variant.name]
 
             # don't cache if a release time isn't known
             if time_ == 0:
@@ -366,8 +637,7 @@ class Resolver(object):
         timestamped = (self.timestamp and releases_since_solve)
         key = self._memcache_key(timestamped=timestamped)
         data = (solver_dict, release_times_dict, variant_states_dict)
-        with self._memcached_client() as client:
-            client.set(key, data)
+        self.resolve_cache.set(key, data)
         self._print("Sent memcache key: %r", key)
 
     def _memcache_key(self, timestamped=False):
@@ -392,23 +662,94 @@ class Resolver(object):
         return str(tuple(t))
 
     def _solve(self):
-        solver = Solver(package_requests=self.package_requests,
-                        package_paths=self.package_paths,
-                        context=self.context,
-                        package_filter=self.package_filter,
-                        package_orderers=self.package_orderers,
-                        callback=self.callback,
-                        package_load_callback=self.package_load_callback,
-                        building=self.building,
-                        verbosity=self.verbosity,
-                        prune_unfailed=config.prune_failed_graph,
-                        buf=self.buf,
-                        suppress_passive=self.suppress_passive,
-                        print_stats=self.print_stats)
-        solver.solve()
+        solver = None
+        package_variant_cache = self.package_variant_cache
+
+        if self.seed_variants:
+            # share package loading between the seeded and full solves
+            if package_variant_cache is None:
+                package_variant_cache = PackageVariantCache()
+            solver = self._solve_seeded(package_variant_cache)
+
+        if solver is None:
+            solver = self._create_solver(self.package_requests,
+                                         package_variant_cache)
+            solver.solve()
 
         return solver
 
+    def _solve_seeded(self, package_variant_cache):
+        """Solve, preferring the seed variants.
+
+        Each seed variant is added to the request as a weak, exact version
+        requirement, which (in the common case) leaves a single version in
+        each scope and makes the solve very fast. If this fails, the seed
+        requirements involved in the failure are dropped and the solve is
+        retried. If the failure does not involve any seed requirements, or too
+        many retries are needed, None is returned and a full solve is done.
+
+        Returns:
+            `Solver`: The successful solver, or None.
+        """
+        pins = {}
+        for variant in self.seed_variants:
+            pin = Requirement("~%s==%s" % (variant.name, str(variant.version)))
+
+            # skip seeds that the request has changed
+            if any(x.name == variant.name and not x.conflict
+                   and not pin.range.issubset(x.range)
+                   for x in self.package_requests):
+                continue
+
+            pins[variant.name] = pin
+
+        t = time.time()
+        for _ in range(self.max_seed_attempts):
+            if not pins:
+                break
+
+            solver = self._create_solver(list(self.package_requests)
+                                         + list(pins.values()),
+                                         package_variant_cache)
+            solver.solve()
+
+            if solver.status == SolverStatus.solved:
+                self.from_seed = True
+                solver.solve_time = time.time() - t
+                return solver
+
+            if solver.status != SolverStatus.failed:
+                break
+
+            names = set(x.name for x in solver.failure_packages() or [])
+            names &= set(pins.keys())
+            if not names:
+                break
+
+            self._print("Dropping seed requirements after failed seeded "
+                        "solve: %s", ", ".join(sorted(names)))
+            for name in names:
+                del pins[name]
+
+        return None
+
+    def _create_solver(self, package_requests, package_variant_cache):
+        return Solver(package_requests=package_requests,
+                      package_paths=self.package_paths,
+                      context=self.context,
+                      package_filter=self.package_filter,
+                      package_orderers=self.package_orderers,
+                      callback=self.callback,
+                      package_load_callback=self.package_load_callback,
+                      building=self.building,
+                      verbosity=self.verbosity,
+                      prune_unfailed=config.prune_failed_graph,
+                      buf=self.buf,
+                      suppress_passive=self.suppress_passive,
+                      print_stats=self.print_stats,
+                      package_variant_cache=package_variant_cache,
+                      trace=self.trace)
+
     def _set_result(self, solver_dict):
         self.status_ = solver_dict.get("status")
         self.graph_ = solver_dict.get("graph")
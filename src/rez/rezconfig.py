@@ -160,6 +160,25 @@ cache_listdir = True
 # of unlimited size. The size refers to the number of entries, not byte count.
 resource_caching_maxsize = -1
 
+# The approximate maximum memory used by the local resource cache, in megabytes.
+# When exceeded, the least recently used resources are evicted. Memory use is
+# estimated from the loaded data of each resource. Zero means unlimited.
+resource_caching_max_memory = 0
+
+# Limits for specific resource types, which are cached separately. Keys are
+# resource types (such as "filesystem.variant"), and values are dicts that may
+# contain "maxsize" (number of entries) and "max_memory" (megabytes). For
+# example:
+#
+#     resource_caching_limits = {
+#         "filesystem.variant": {"max_memory": 100}
+#     }
+#
+# The limits, and the cache statistics after loading some package families, can
+# be seen with 'rez-config --resource-stats [FAMILY ...]'. A long-running process
+# can get its own statistics from 'package_repository_manager.pool.get_stats()'.
+resource_caching_limits = {}
+
 # Uris of running memcached server(s) to use as a file and resolve cache. For
 # example, the uri "127.0.0.1:11211" points to memcached running on localhost on
 # its default port. Must be either null, or a list of strings.
@@ -181,6 +200,37 @@ memcached_listdir_min_compress_len = 16384
 # means never compress.
 memcached_resolve_min_compress_len = 1
 
+# Directory of a local on-disk resolve cache. This is used to cache resolves
+# when memcached is not available (ie, when memcached_uri is empty). Entries are
+# invalidated in the same way as memcached resolve entries. The cache is safe to
+# share between processes, but should be on local disk rather than shared
+# storage. If None, resolves are only cached in memcached.
+resolve_cache_path = None
+
+# Maximum size of the on-disk resolve cache (see resolve_cache_path), in
+# megabytes. When exceeded, the least recently used resolves are evicted. Zero
+# means unlimited.
+resolve_cache_max_size = 256
+
+# Directory of a local on-disk cache of loaded package definition files. This
+# stores the contents of each package.py after its @early functions have been
+# evaluated, so that each file is only executed once (until it changes). Only
+# installed packages are cached - developer packages (such as those built by
+# rez-build and rez-release) are always loaded from their file. Entries
+# are keyed on the file's path, modification time and size, and on the rez
+# version. The cache should be on local disk. If None, this cache is disabled.
+package_file_cache_path = None
+
+# Entries in the package file cache (see package_file_cache_path) that have not
+# been used in this many days are deleted. Zero means never delete entries.
+package_file_cache_max_days = 30
+
+# When an entry is added to the package file cache, the cache is cleaned (see
+# package_file_cache_max_days) if this has not happened in the last day. This
+# is the time limit of that cleanup, in seconds. Zero or less disables
+# automatic cleaning.
+package_file_cache_clean_limit = 0.5
+
 
 ###############################################################################
 # Package Copy
@@ -266,6 +316,21 @@ write_package_cache = True
 # To disable, set to zero.
 package_cache_max_variant_days = 30
 
+# Maximum size of the package cache, in megabytes. When exceeded, cleaning the
+# cache (see `rez-pkg-cache --clean` and package_cache_clean_limit) removes the
+# least recently used variants, until the cache is reduced to
+# package_cache_low_watermark of this size. Variants in use by a running process
+# are never removed. Note that this refers to the process that created or
+# interpreted the context. A shell that has sourced a context's environment
+# (such as from 'rez-env --output' or 'rez-context --interpret') does not keep
+# its variants in use, so they may still be removed. Zero means unlimited.
+package_cache_max_size = 0
+
+# Fraction of package_cache_max_size that the cache is reduced to, when it
+# grows larger than package_cache_max_size. Using a value noticeably less than
+# 1.0 avoids the cache being cleaned again every time a variant is added.
+package_cache_low_watermark = 0.8
+
 # Enable package caching during a package build.
 package_cache_during_build = False
 
@@ -287,6 +352,27 @@ package_cache_clean_limit = 0.5
 # Logs are written to {pkg-cache-root}/.sys/log/*.log
 package_cache_log_days = 7
 
+# Number of variants that the package caching daemon ('rez-pkg-cache --daemon')
+# copies into the cache at once.
+package_cache_workers = 4
+
+# Number of files copied at once when copying a variant into the package cache.
+# Set to 1 to copy files one at a time.
+package_cache_copy_threads = 8
+
+# Maximum rate at which variants are copied into the package cache, in megabytes
+# per second. This is shared between all files copied at once by a process, and
+# is useful to avoid saturating shared storage when many hosts populate their
+# caches at the same time (see `rez-pkg-cache --prefetch`). Zero means unlimited.
+package_cache_max_bandwidth = 0
+
+# If True, files in the package cache are stored once per unique content, and
+# hardlinked into each cached variant that contains them. This saves disk space
+# when cached variants share files (such as bundled libraries). Unused files are
+# deleted by 'rez-pkg-cache --clean'. This has no effect on platforms that do
+# not support hardlinks.
+package_cache_dedupe = False
+
 
 ###############################################################################
 # Package Resolution
@@ -472,6 +558,14 @@ package_orderers = None
 # this value is False.
 allow_unversioned_packages = True
 
+# Number of worker processes used to speculatively solve alternative branches
+# of a resolve in parallel. When the solver has to split a phase, the branch it
+# does not try first is handed to a worker, so that when the first branch fails
+# the result of the alternative is already available. The result of a resolve
+# is identical to that of the serial solver. A value of 0 or 1 disables
+# parallel solving.
+solver_parallel_workers = 0
+
 
 ###############################################################################
 # Environment Resolution
@@ -7,8 +7,12 @@ Read and write data from file. File caching via a memcached server is supported.
 """
 from contextlib import contextmanager
 from inspect import isfunction, ismodule
+from hashlib import sha1
+import pickle
+import time
 import sys
 import stat
+import errno
 import os
 import os.path
 import threading
@@ -21,7 +25,9 @@ from rez.utils.data_utils import ModifyList
 from rez.exceptions import ResourceError, InvalidPackageError
 from rez.utils.memcached import memcached
 from rez.utils.execution import add_sys_paths
+from rez.utils.logging_ import print_warning
 from rez.utils import py23
+from rez.utils._version import _rez_version
 from rez.config import config
 from rez.vendor.atomicwrites import atomic_write
 from rez.vendor.enum import Enum
@@ -109,7 +115,7 @@ def open_file_for_write(filepath, mode=None):
 
 
 def load_from_file(filepath, format_=FileFormat.py, update_data_callback=None,
-                   disable_memcache=False):
+                   disable_memcache=False, use_package_file_cache=False):
     """Load data from a file.
 
     Note:
@@ -121,6 +127,10 @@ def load_from_file(filepath, format_=FileFormat.py, update_data_callback=None,
         update_data_callback (callable): Used to change data before it is
             returned or cached.
         disable_memcache (bool): If True, don't r/w to memcache.
+        use_package_file_cache (bool): If True, r/w to the on-disk package file
+            cache (see 'config.package_file_cache_path'). Only use this for
+            files whose loaded contents depend on nothing but the file itself,
+            such as installed package definitions.
 
     Returns:
         dict.
@@ -138,14 +148,17 @@ def load_from_file(filepath, format_=FileFormat.py, update_data_callback=None,
     elif disable_memcache:
         return _load_file(filepath=filepath,
                           format_=format_,
-                          update_data_callback=update_data_callback)
+                          update_data_callback=update_data_callback,
+                          use_package_file_cache=use_package_file_cache)
     else:
         return _load_from_file(filepath=filepath,
                                format_=format_,
-                               update_data_callback=update_data_callback)
+                               update_data_callback=update_data_callback,
+                               use_package_file_cache=use_package_file_cache)
 
 
-def _load_from_file__key(filepath, format_, update_data_callback):
+def _load_from_file__key(filepath, format_, update_data_callback,
+                         use_package_file_cache=False):
     st = os.stat(filepath)
     if update_data_callback is None:
         callback_key = 'None'
@@ -160,11 +173,29 @@ def _load_from_file__key(filepath, format_, update_data_callback):
            min_compress_len=config.memcached_package_file_min_compress_len,
            key=_load_from_file__key,
            debug=config.debug_memcache)
-def _load_from_file(filepath, format_, update_data_callback):
-    return _load_file(filepath, format_, update_data_callback)
-
+def _load_from_file(filepath, format_, update_data_callback,
+                    use_package_file_cache=False):
+    return _load_file(filepath, format_, update_data_callback,
+                      use_package_file_cache=use_package_file_cache)
+
+
+def _load_file(filepath, format_, update_data_callback, original_filepath=None,
+               use_package_file_cache=False):
+    # files written by this process are not cached, nor are files loaded
+    # while early-bound build variables are set (see `set_objects`)
+    cache = None
+    if use_package_file_cache and original_filepath is None \
+            and format_ != FileFormat.txt \
+            and not getattr(_set_objects, "variables", None):
+        cache = get_package_file_cache()
+
+    if cache is not None:
+        key = cache.get_key(filepath, format_, update_data_callback)
+        result = cache.get(filepath, key)
+        if result is not None:
+            debug_print("Loading file: %s (from package file cache)", filepath)
+            return result
 
-def _load_file(filepath, format_, update_data_callback, original_filepath=None):
     load_func = load_functions[format_]
 
     if debug_print:
@@ -179,9 +210,204 @@ def _load_file(filepath, format_, update_data_callback, original_filepath=None):
 
     if update_data_callback:
         result = update_data_callback(format_, result)
+
+    if cache is not None:
+        cache.set(filepath, key, result)
     return result
 
 
+class PackageFileCache(object):
+    """A cache of loaded package definition files, on local disk.
+
+    Entries are keyed on the file's path, mtime and size, as well as the rez
+    and python versions, so a changed file is simply loaded again. Each entry
+    stores the data as returned by `load_from_file` - for a package.py, this is
+    after @early functions have been evaluated, and with other functions
+    converted to `SourceCode` objects, which are pickled as source.
+
+    Entries are touched when they are used (at most once per
+    `atime_resolution` seconds), and entries that haven't been used in
+    `max_days` days are deleted by `clean`. This is done in the same way as
+    variants in the package cache, and replaced entries (of changed files)
+    age out like any other.
+
+    Errors accessing the cache are never raised - a file simply gets loaded
+    without it.
+    """
+    # last-access times are not updated more often than this (in seconds),
+    # to avoid a write on every cache hit
+    atime_resolution = 3600
+
+    # `clean` is called automatically no more often than this (in seconds)
+    clean_interval = 3600 * 24
+
+    def __init__(self, path, max_days=30, clean_limit=-1):
+        """Create a package file cache.
+
+        Args:
+            path (str): Directory to store the cache in. It is created if it
+                does not exist.
+            max_days (int): Delete entries that haven't been used in this many
+                days. Zero means entries are never deleted.
+            clean_limit (float): If > 0, spend up to this many seconds cleaning
+                the cache, at most once per `clean_interval`, when an entry is
+                added.
+        """
+        self.path = path
+        self.max_days = max_days
+        self.clean_limit = clean_limit
+        self._print = config.debug_printer("file_loads")
+
+    @classmethod
+    def get_key(cls, filepath, format_, update_data_callback=None):
+        st = os.stat(filepath)
+        callback_key = getattr(update_data_callback, "__name__", None)
+
+        key = repr((
+            filepath, st.st_mtime, st.st_size, format_.name, callback_key,
+            _rez_version, sys.version_info[:2],
+            tuple(config.package_definition_build_python_paths)
+        ))
+        return sha1(key.encode("utf-8")).hexdigest()
+
+    def get(self, filepath, key):
+        """Get cached file data.
+
+        Returns:
+            dict: The cached data, or None if there is no entry.
+        """
+        entry_filepath = self._get_entry_filepath(key)
+
+        try:
+            with open(entry_filepath, "rb") as f:
+                entry = pickle.load(f)
+
+            if entry.get("filepath") != filepath:
+                return None
+
+            # update last-access time
+            st = os.stat(entry_filepath)
+            now = time.time()
+            if (now - st.st_mtime) > self.atime_resolution:
+                os.utime(entry_filepath, None)
+
+            return entry["data"]
+
+        except EnvironmentError as e:
+            if e.errno != errno.ENOENT:
+                self._print("Error reading package file cache %r: %s",
+                            entry_filepath, e)
+        except Exception as e:
+            # includes unpickling errors
+            self._print("Error reading package file cache %r: %s",
+                        entry_filepath, e)
+
+        return None
+
+    def set(self, filepath, key, data):
+        """Store file data.
+
+        Note that data that cannot be pickled (such as a package.py that
+        contains an object of a custom class) is not cached.
+        """
+        entry_filepath = self._get_entry_filepath(key)
+        entry = {"filepath": filepath, "data": data}
+
+        try:
+            content = pickle.dumps(entry, protocol=2)
+        except Exception as e:
+            self._print("Not caching %r: %s", filepath, e)
+            return
+
+        try:
+            path = os.path.dirname(entry_filepath)
+            if not os.path.exists(path):
+                os.makedirs(path)
+
+            with atomic_write(entry_filepath, mode="wb", overwrite=True) as f:
+                f.write(content)
+        except EnvironmentError as e:
+            self._print("Error writing package file cache %r: %s",
+                        entry_filepath, e)
+            return
+
+        if self.clean_limit > 0:
+            self._clean_periodically()
+
+    def clean(self, time_limit=None):
+        """Delete entries that haven't been used in `max_days` days.
+
+        Args:
+            time_limit (float): Perform cleaning only up until this limit (in
+                seconds), resulting in a possibly incomplete cleanup.
+
+        Returns:
+            int: Number of entries deleted.
+        """
+        if not self.max_days or not os.path.isdir(self.path):
+            return 0
+
+        now = time.time()
+        max_secs = self.max_days * 3600 * 24
+        num_removed = 0
+
+        for dirname in os.listdir(self.path):
+            path = os.path.join(self.path, dirname)
+            if not os.path.isdir(path):
+                continue
+
+            for name in os.listdir(path):
+                filepath = os.path.join(path, name)
+
+                try:
+                    if (now - os.stat(filepath).st_mtime) > max_secs:
+                        os.remove(filepath)
+                        num_removed += 1
+                except EnvironmentError:
+                    pass  # may have just been deleted
+
+            if time_limit is not None and (time.time() - now) > time_limit:
+                break
+
+        return num_removed
+
+    def _clean_periodically(self):
+        # the mtime of this file records the last time the cache was cleaned
+        filepath = os.path.join(self.path, ".clean")
+
+        try:
+            if os.path.exists(filepath):
+                if (time.time() - os.stat(filepath).st_mtime) < self.clean_interval:
+                    return
+                os.utime(filepath, None)
+            else:
+                open(filepath, 'w').close()
+
+            self.clean(time_limit=self.clean_limit)
+        except EnvironmentError as e:
+            print_warning("Error cleaning package file cache %r: %s", self.path, e)
+
+    def _get_entry_filepath(self, key):
+        return os.path.join(self.path, key[:2], key)
+
+
+def get_package_file_cache():
+    """Get the package file cache, as determined by config.
+
+    Returns:
+        `PackageFileCache`: The cache, or None if `package_file_cache_path`
+        is not set.
+    """
+    if not config.package_file_cache_path:
+        return None
+
+    return PackageFileCache(
+        os.path.expanduser(config.package_file_cache_path),
+        max_days=config.package_file_cache_max_days,
+        clean_limit=config.package_file_cache_clean_limit
+    )
+
+
 _set_objects = threading.local()
 
 
@@ -245,9 +471,16 @@ def _load_py(stream, filepath=None):
              ModifyList=ModifyList,
              InvalidPackageError=InvalidPackageError)
 
-    try:
+    # the stream is only read if there is no file, such as for package
+    # definitions stored in a database
+    if filepath and os.path.isfile(filepath):
         with open(filepath, "rb") as f:
-            exec(compile(f.read(), filepath, 'exec'), g)
+            source = f.read()
+    else:
+        source = stream.read()
+
+    try:
+        exec(compile(source, filepath or "<string>", 'exec'), g)
     except Exception as e:
         import traceback
         frames = traceback.extract_tb(sys.exc_info()[2])
@@ -16,8 +16,11 @@ from __future__ import print_function
 from rez.config import config
 from rez.packages import iter_packages
 from rez.package_repository import package_repo_stats
+from rez.package_filter import PackageFilterList
+from rez import package_order
 from rez.utils.logging_ import print_debug
 from rez.utils.data_utils import cached_property
+from rez.utils.trace import null_span
 from rez.vendor.pygraph.classes.digraph import digraph
 from rez.vendor.pygraph.algorithms.cycles import find_cycle
 from rez.vendor.pygraph.algorithms.accessibility import accessibility
@@ -28,8 +31,13 @@ from rez.vendor.version.requirement import VersionedObject, Requirement, \
     RequirementList
 from rez.vendor.enum import Enum
 from contextlib import contextmanager
+from bisect import bisect_left, bisect_right
 from itertools import product, chain
+from collections import deque, OrderedDict
+import threading
+import weakref
 import copy
+import signal
 import time
 import sys
 import os
@@ -293,6 +301,81 @@ class Cycle(FailureReason):
         return " --> ".join(map(str, stmts))
 
 
+class _Nogood(_Common):
+    """A combination of package scopes that is known to have no solution.
+
+    Nogoods are learned from failed phases. They consist of a 'fact' for each
+    scope involved in the failure. Any phase in which each of those scopes is
+    equally or more narrow than its fact cannot be solved either, and so can be
+    failed without being solved.
+    """
+    def __init__(self, scopes, failure_reason):
+        """
+        Args:
+            scopes (list of `_PackageScope`): Scopes involved in the failure.
+            failure_reason (`FailureReason`): The failure.
+        """
+        self.failure_reason = failure_reason
+        self.requests = [x.package_request for x in scopes]
+        self.facts = {}
+
+        for scope in scopes:
+            if scope.variant_slice is None:
+                fact = (scope.is_conflict, scope.package_request.range, None)
+            else:
+                fact = (False, None, scope.variant_slice.variant_keys)
+            self.facts[scope.package_name] = fact
+
+    @property
+    def key(self):
+        return frozenset(
+            (name, conflict, str(range_), variant_keys)
+            for name, (conflict, range_, variant_keys) in self.facts.items()
+        )
+
+    def implied_by(self, scopes):
+        """Determine if the given scopes are at least as narrow as this nogood.
+
+        Args:
+            scopes (dict): Package scopes, keyed by package name.
+
+        Returns:
+            bool: True if the scopes cannot be solved.
+        """
+        for name, (conflict, range_, variant_keys) in self.facts.items():
+            scope = scopes.get(name)
+            if scope is None:
+                return False
+
+            if conflict:
+                # a conflict scope is narrower if it excludes more
+                if not scope.is_conflict:
+                    return False
+                if range_ is None:
+                    continue
+
+                range__ = scope.package_request.range
+                if range__ is None or not range__.issuperset(range_):
+                    return False
+
+            elif variant_keys is None:
+                if scope.is_conflict or not scope.is_ephemeral:
+                    return False
+                if not scope.package_request.range.issubset(range_):
+                    return False
+
+            else:
+                if scope.variant_slice is None:
+                    return False
+                if not scope.variant_slice.variant_keys.issubset(variant_keys):
+                    return False
+
+        return True
+
+    def __str__(self):
+        return ' '.join(str(x) for x in self.requests)
+
+
 class PackageVariant(_Common):
     """A variant of a package.
     """
@@ -457,6 +540,81 @@ class _PackageEntry(object):
         self.sorted = True
 
 
+class _FamilyVersionIndex(object):
+    """A sorted index of the package versions in a family.
+
+    This allows the packages within a version range to be found by binary
+    search on each of the range's bounds, rather than by testing each package.
+    Indexes are cached per process (see `_get_family_version_index`). They only
+    weakly reference the package resources, so that the cache does not keep
+    resources alive after the repository has discarded them.
+    """
+    def __init__(self, packages):
+        self.resources = [weakref.ref(x.resource) for x in packages]
+        self.order = sorted(range(len(packages)),
+                            key=lambda i: packages[i].version)
+        self.versions = [packages[i].version for i in self.order]
+
+    def is_valid(self, packages):
+        """Test that the index still matches the given packages.
+
+        Packages wrap resources that are cached by the repository, so unchanged
+        packages will have the same resources as when the index was created.
+        """
+        return (
+            len(packages) == len(self.resources)
+            and all(x.resource is y() for x, y in zip(packages, self.resources))
+        )
+
+    def iter_slices(self, range_):
+        """Iterate over the index positions of versions within a range.
+
+        Yields:
+            2-tuple: (int, int) start and end index of each group of versions
+            in `range_`, in ascending version order.
+        """
+        for bound in range_.bounds:
+            lower, upper = bound.lower, bound.upper
+
+            if lower.inclusive:
+                i = bisect_left(self.versions, lower.version)
+            else:
+                i = bisect_right(self.versions, lower.version)
+
+            if upper.inclusive:
+                j = bisect_right(self.versions, upper.version, lo=i)
+            else:
+                j = bisect_left(self.versions, upper.version, lo=i)
+
+            if i < j:
+                yield i, j
+
+
+# {(package_name, package_paths): _FamilyVersionIndex}, least recently used
+# first. The number of cached indexes is limited by
+# `_max_family_version_indexes`.
+_family_version_indexes = OrderedDict()
+_family_version_indexes_lock = threading.Lock()
+_max_family_version_indexes = 1000
+
+
+def _get_family_version_index(package_name, package_paths, packages):
+    key = (package_name, tuple(package_paths))
+
+    with _family_version_indexes_lock:
+        index = _family_version_indexes.pop(key, None)
+
+    if index is None or not index.is_valid(packages):
+        index = _FamilyVersionIndex(packages)
+
+    with _family_version_indexes_lock:
+        _family_version_indexes[key] = index
+        while len(_family_version_indexes) > _max_family_version_indexes:
+            _family_version_indexes.popitem(last=False)
+
+    return index
+
+
 class _PackageVariantList(_Common):
     """A list of package variants, loaded lazily.
     """
@@ -464,72 +622,87 @@ class _PackageVariantList(_Common):
         self.package_name = package_name
         self.solver = solver
 
-        # note: we do not apply package filters here, because doing so might
-        # cause package loads (eg, timestamp rules). We only apply filters
-        # during an intersection, which minimises the amount of filtering.
-        #
-        self.entries = []
-
-        for package in iter_packages(self.package_name,
-                                     paths=self.solver.package_paths):
-            package.set_context(solver.context)
-            self.entries.append([package, False])
+        packages = []
+        with solver.traced_loading("load family %s" % package_name,
+                                   package_name):
+            for package in iter_packages(self.package_name,
+                                         paths=self.solver.package_paths):
+                package.set_context(solver.context)
+                packages.append(package)
 
-        if not self.entries:
+        if not packages:
             raise PackageFamilyNotFoundError(
                 "package family not found: %s (searched: %s)"
                 % (package_name, "; ".join(self.solver.package_paths)))
 
-    def get_intersection(self, range_):
+        # note: we do not apply package filters here, because doing so might
+        # cause package loads (eg, timestamp rules). We only apply filters
+        # during an intersection, which minimises the amount of filtering.
+        #
+        # entries are kept in ascending version order, matching the index.
+        #
+        self.index = _get_family_version_index(
+            package_name, self.solver.package_paths, packages)
+        self.entries = [[packages[i], False] for i in self.index.order]
+
+    def get_intersection(self, range_, solver=None):
         """Get a list of variants that intersect with the given range.
 
         Args:
             range_ (`VersionRange`): Package version range.
+            solver (`Solver`): Solver performing the intersection, if different
+                to the solver this list was created by (see
+                `PackageVariantCache`).
 
         Returns:
-            List of `_PackageEntry` objects.
+            List of `_PackageEntry` objects, in descending version order.
         """
+        solver = solver or self.solver
         result = []
 
-        for entry in self.entries:
-            package, value = entry
+        slices = list(self.index.iter_slices(range_))
 
-            if value is None:
-                continue  # package was blocked by package filters
+        for i, j in reversed(slices):
+            for entry in reversed(self.entries[i:j]):
+                entry_ = self._get_entry(entry, solver)
+                if entry_ is not None:
+                    result.append(entry_)
 
-            if package.version not in range_:
-                continue
+        return result or None
 
-            if isinstance(value, list):
-                variants = value
-                entry_ = _PackageEntry(package, variants, self.solver)
-                result.append(entry_)
-                continue
+    def _get_entry(self, entry, solver):
+        package, value = entry
 
-            # apply package filter
-            if self.solver.package_filter:
-                rule = self.solver.package_filter.excludes(package)
-                if rule:
-                    if config.debug_package_exclusions:
-                        print_debug("Package '%s' was excluded by rule '%s'"
-                                    % (package.qualified_name, str(rule)))
-                    entry[1] = None
-                    continue
+        if value is None:
+            return None  # package was blocked by package filters
+
+        if isinstance(value, list):
+            variants = value
+            return _PackageEntry(package, variants, solver)
 
-            # expand package entry into list of variants
-            if self.solver.package_load_callback:
-                self.solver.package_load_callback(package)
+        # apply package filter
+        if solver.package_filter:
+            rule = solver.package_filter.excludes(package)
+            if rule:
+                if config.debug_package_exclusions:
+                    print_debug("Package '%s' was excluded by rule '%s'"
+                                % (package.qualified_name, str(rule)))
+                entry[1] = None
+                return None
 
-            variants_ = []
+        # expand package entry into list of variants
+        if solver.package_load_callback:
+            solver.package_load_callback(package)
+
+        variants_ = []
+        with solver.traced_loading("load %s" % package.qualified_name,
+                                   package.name):
             for var in package.iter_variants():
-                variant = PackageVariant(var, self.solver.building)
+                variant = PackageVariant(var, solver.building)
                 variants_.append(variant)
 
-            entry[1] = variants_
-            entry_ = _PackageEntry(package, variants_, self.solver)
-            result.append(entry_)
-
-        return result or None
+        entry[1] = variants_
+        return _PackageEntry(package, variants_, solver)
 
     def dump(self):
         print(self.package_name)
@@ -583,6 +756,7 @@ class _PackageVariantSlice(_Common):
         self._range = None
         self._fam_requires = None
         self._common_fams = None
+        self._variant_keys = None
 
     @property
     def pr(self):
@@ -595,6 +769,14 @@ class _PackageVariantSlice(_Common):
             self._range = VersionRange.from_versions(versions)
         return self._range
 
+    @property
+    def variant_keys(self):
+        """Set of (version, index) tuples of the variants in the slice."""
+        if self._variant_keys is None:
+            self._variant_keys = frozenset(
+                (x.version, x.index) for x in self.iter_variants())
+        return self._variant_keys
+
     @property
     def fam_requires(self):
         self._update_fam_info()
@@ -925,35 +1107,77 @@ class _PackageVariantSlice(_Common):
 
 
 class PackageVariantCache(object):
-    def __init__(self, solver):
+    """Cache of package variants, and their parsed requirements.
+
+    A cache is normally private to a single `Solver`. However, a cache can also
+    be passed to many solvers (see `Solver.package_variant_cache`), so that
+    packages are loaded, filtered and have their requirements parsed only once
+    across all the solves (see `resolved_context.resolve_many`).
+
+    Variant lists are stored separately per package search path, package filter
+    and build mode, since each of these affects the variants that are loaded.
+
+    Note:
+        Late binding package attributes that are evaluated during a solve are
+        bound to the context of the first solve that loaded the package.
+    """
+    def __init__(self, solver=None):
         self.solver = solver
-        self.variant_lists = {}  # {package-name: _PackageVariantList}
+        self.variant_lists_by_key = {}
 
-    def get_variant_slice(self, package_name, range_):
+    @property
+    def variant_lists(self):
+        """Variant lists for the solver this cache was created for.
+
+        Returns:
+            dict: {package-name: `_PackageVariantList`}.
+        """
+        return self._get_variant_lists(self.solver)
+
+    def get_variant_slice(self, package_name, range_, solver=None):
         """Get a list of variants from the cache.
 
         Args:
             package_name (str): Name of package.
             range_ (`VersionRange`): Package version range.
+            solver (`Solver`): Solver requesting the variants. Defaults to the
+                solver this cache was created for.
 
         Returns:
             `_PackageVariantSlice` object.
         """
-        variant_list = self.variant_lists.get(package_name)
+        solver = solver or self.solver
+        variant_lists = self._get_variant_lists(solver)
+        variant_list = variant_lists.get(package_name)
 
         if variant_list is None:
-            variant_list = _PackageVariantList(package_name, self.solver)
-            self.variant_lists[package_name] = variant_list
+            variant_list = _PackageVariantList(package_name, solver)
+            variant_lists[package_name] = variant_list
 
-        entries = variant_list.get_intersection(range_)
+        entries = variant_list.get_intersection(range_, solver=solver)
         if not entries:
             return None
 
         slice_ = _PackageVariantSlice(package_name,
                                       entries=entries,
-                                      solver=self.solver)
+                                      solver=solver)
         return slice_
 
+    def _get_variant_lists(self, solver):
+        package_filter = solver.package_filter
+        key = (
+            tuple(solver.package_paths),
+            package_filter.sha1 if package_filter else '',
+            bool(solver.building)
+        )
+
+        variant_lists = self.variant_lists_by_key.get(key)
+        if variant_lists is None:
+            variant_lists = {}  # {package-name: _PackageVariantList}
+            self.variant_lists_by_key[key] = variant_lists
+
+        return variant_lists
+
 
 class _PackageScope(_Common):
     """Contains possible solutions for a package, such as a list of variants,
@@ -1238,6 +1462,10 @@ class _ResolvePhase(_Common):
         self.extractions = {}
         self.status = SolverStatus.pending
 
+        # the sequence of split choices (0 for the preferred phase, 1 for the
+        # alternative) that lead from the initial phase to this one
+        self.split_path = ()
+
         self.scopes = []
         for package_request in self.solver.request_list:
             scope = _PackageScope(package_request, solver=solver)
@@ -1282,17 +1510,31 @@ class _ResolvePhase(_Common):
 
             # iteratively extract until no more extractions possible
             while True:
+                # fail early if the scopes are known to have no solution
+                nogood = self.solver._find_nogood(scopes)
+                if nogood is not None:
+                    if self.pr:
+                        self.pr("phase is known to fail: %s", nogood)
+                    failure_reason = nogood.failure_reason
+                    return _create_phase(SolverStatus.failed)
+
                 self.pr.subheader("EXTRACTING:")
                 extracted_requests = []
+                extracted_scopes_i = {}  # {package-name: [scope index]}
 
                 # perform all possible extractions
                 with self.solver.timed(self.solver.extraction_time):
                     for i in range(len(scopes)):
                         while True:
-                            scope_, extracted_request = scopes[i].extract()
+                            with self.solver.traced("extract %s" % scopes[i].package_name,
+                                                    "extract",
+                                                    package=scopes[i].package_name):
+                                scope_, extracted_request = scopes[i].extract()
 
                             if extracted_request:
                                 extracted_requests.append(extracted_request)
+                                extracted_scopes_i.setdefault(
+                                    extracted_request.name, []).append(i)
                                 k = (scopes[i].package_name, extracted_request.name)
                                 extractions[k] = extracted_request
                                 self.solver.extractions_count += 1
@@ -1311,6 +1553,10 @@ class _ResolvePhase(_Common):
                     req1, req2 = extracted_requests.conflict
                     conflict = DependencyConflict(req1, req2)
                     failure_reason = DependencyConflicts([conflict])
+
+                    self.solver._add_nogood(
+                        [scopes[j] for j in extracted_scopes_i[req1.name]],
+                        failure_reason)
                     return _create_phase(SolverStatus.failed)
                 elif self.pr:
                     self.pr("merged extractions: %s", extracted_requests)
@@ -1327,7 +1573,11 @@ class _ResolvePhase(_Common):
                             continue
 
                         # perform the intersection
-                        scope_ = scope.intersect(extracted_req.range)
+                        with self.solver.traced("intersect %s" % scope.package_name,
+                                                "intersect",
+                                                package=scope.package_name,
+                                                range=str(extracted_req.range)):
+                            scope_ = scope.intersect(extracted_req.range)
 
                         req_fams.append(extracted_req.name)
 
@@ -1336,6 +1586,11 @@ class _ResolvePhase(_Common):
                             conflict = DependencyConflict(
                                 extracted_req, scope.package_request)
                             failure_reason = DependencyConflicts([conflict])
+
+                            nogood_scopes = [scopes[j] for j in
+                                             extracted_scopes_i[scope.package_name]]
+                            self.solver._add_nogood(nogood_scopes + [scope],
+                                                    failure_reason)
                             return _create_phase(SolverStatus.failed)
 
                         if scope_ is not scope:
@@ -1449,11 +1704,17 @@ class _ResolvePhase(_Common):
                     if x == y:
                         continue
 
-                    new_scope, reductions = scopes[x].reduce_by(
-                        scopes[y].package_request)
+                    with self.solver.traced("reduce %s" % scopes[x].package_name,
+                                            "reduce",
+                                            package=scopes[x].package_name,
+                                            by=str(scopes[y].package_request)):
+                        new_scope, reductions = scopes[x].reduce_by(
+                            scopes[y].package_request)
 
                     if new_scope is None:
                         failure_reason = TotalReduction(reductions)
+                        self.solver._add_nogood([scopes[x], scopes[y]],
+                                                failure_reason)
                         return _create_phase(SolverStatus.failed)
 
                     elif new_scope is not scopes[x]:
@@ -1540,7 +1801,9 @@ class _ResolvePhase(_Common):
 
         for i, scope in enumerate(self.scopes):
             if split_i is None:
-                r = scope.split()
+                with self.solver.traced("split %s" % scope.package_name,
+                                        "split", package=scope.package_name):
+                    r = scope.split()
                 if r is not None:
                     scope_, next_scope = r
                     scopes.append(scope_)
@@ -1557,6 +1820,7 @@ class _ResolvePhase(_Common):
         phase.scopes = scopes
         phase.status = SolverStatus.pending
         phase.changed_scopes_i = set([split_i])
+        phase.split_path = self.split_path + (0,)
 
         # because a scope was narrowed by a split, other scopes need to be
         # reduced against it
@@ -1566,6 +1830,7 @@ class _ResolvePhase(_Common):
 
         next_phase = copy.copy(phase)
         next_phase.scopes = next_scopes
+        next_phase.split_path = self.split_path + (1,)
         return (phase, next_phase)
 
     def get_graph(self):
@@ -1876,6 +2141,71 @@ class _ResolvePhase(_Common):
         return ' '.join(str(x) for x in self.scopes)
 
 
+class _SpeculativePhase(_Common):
+    """A phase in the subtree of a phase that was solved by a worker process.
+
+    See `Solver.parallel_workers`. The worker reports the split path and status
+    of each phase it solved, so the phase itself is only recreated if it is
+    needed, such as to get the failure reason of a failed phase.
+    """
+    def __init__(self, solver, root, split_path, status, num_nogoods=None):
+        """
+        Args:
+            solver (`Solver`): Solver.
+            root (`_ResolvePhase`): Phase that the worker solved the subtree of.
+            split_path (tuple of int): Split path of this phase.
+            status (`SolverStatus`): Status of this phase.
+            num_nogoods (int): Number of nogoods learned by the solver at the
+                time this phase was solved, or None if this is an unsolved
+                phase resulting from a split.
+        """
+        self.solver = solver
+        self.root = root
+        self.split_path = split_path
+        self.status = status
+        self.num_nogoods = num_nogoods
+        self._phase = None
+
+    @property
+    def phase(self):
+        """Get the phase, recreating it if necessary."""
+        if self._phase is None:
+            self._phase = self._recreate()
+        return self._phase
+
+    @property
+    def failure_reason(self):
+        return self.phase.failure_reason
+
+    def get_graph(self):
+        return self.phase.get_graph()
+
+    def _recreate(self):
+        # Phases along the split path are solved without nogoods, which can
+        # only fail a phase early, and these phases did not fail. The phase
+        # itself is solved with the nogoods that existed at the time it was
+        # solved, so that it fails in exactly the same way.
+        #
+        nogoods = self.solver.nogoods
+        self.solver.nogoods = []
+
+        try:
+            phase = self.root
+            for i in self.split_path[len(self.root.split_path):]:
+                phase = phase.solve().split()[i]
+
+            if self.num_nogoods is not None:
+                self.solver.nogoods = nogoods[:self.num_nogoods]
+                phase = phase.solve()
+        finally:
+            self.solver.nogoods = nogoods
+
+        return phase
+
+    def __str__(self):
+        return str(self.phase)
+
+
 class Solver(_Common):
     """Solver.
 
@@ -1889,7 +2219,8 @@ class Solver(_Common):
                  package_filter=None, package_orderers=None, callback=None,
                  building=False, optimised=True, verbosity=0, buf=None,
                  package_load_callback=None, prune_unfailed=True,
-                 suppress_passive=False, print_stats=False):
+                 suppress_passive=False, print_stats=False,
+                 parallel_workers=None, package_variant_cache=None, trace=None):
         """Create a Solver.
 
         Args:
@@ -1922,6 +2253,21 @@ class Solver(_Common):
                 has had no effect on the solve. This argument only has an
                 effect if `verbosity` > 2.
             print_stats (bool): If true, print advanced solver stats at the end.
+            parallel_workers (int): Number of worker processes used to
+                speculatively solve the alternative phase of each split during
+                `solve`. The result is identical to a serial solve. If None,
+                config.solver_parallel_workers is used. Note that workers do
+                not have access to `context`, nor call `package_load_callback`.
+            package_variant_cache (`PackageVariantCache`): Cache of loaded
+                package variants. Pass the same cache to many solvers to share
+                package loading between them. If None, a cache private to this
+                solver is used.
+            trace (`rez.utils.trace.Trace`): If not None, timed events for each
+                solve step, split, extraction, intersection, reduction and
+                package load are recorded to this trace. Each event is tagged
+                with the package name and phase depth (the number of splits
+                that led to the phase). Note that phases solved by parallel
+                workers are only traced when replayed.
         """
         self.package_paths = package_paths
         self.package_filter = package_filter
@@ -1932,6 +2278,8 @@ class Solver(_Common):
         self.building = building
         self.request_list = None
         self.context = context
+        self.trace = trace
+        self.trace_depth = 0
 
         self.pr = _Printer(verbosity, buf=buf, suppress_passive=suppress_passive)
         self.print_stats = print_stats
@@ -1942,6 +2290,15 @@ class Solver(_Common):
         else:
             self.optimised = optimised
 
+        if parallel_workers is None:
+            parallel_workers = config.solver_parallel_workers
+        self.parallel_workers = parallel_workers
+        self.worker_pool = None
+        self.worker_abort_event = None
+        self.speculations = None
+        self.replay_root = None
+        self.replay_steps = None
+
         self.phase_stack = None
         self.failed_phase_list = None
         self.abort_reason = None
@@ -1967,9 +2324,20 @@ class Solver(_Common):
         self.reduction_time = [0.0]
         self.reduction_test_time = [0.0]
 
+        self.speculations_count = 0
+        self.speculation_hits_count = 0
+        self.worker_solves_count = 0
+        self.worker_fails_count = 0
+        self.worker_solve_time = 0.0
+
+        self.nogoods = None
+        self.nogood_keys = None
+        self.nogood_prunes_count = 0
+        self.nogood_test_time = [0.0]
+
         self._init()
 
-        self.package_cache = PackageVariantCache(self)
+        self.package_cache = package_variant_cache or PackageVariantCache(self)
 
         # merge the request
         if self.pr:
@@ -2002,6 +2370,33 @@ class Solver(_Common):
         secs = time.time() - t
         target[0] += secs
 
+    def traced(self, name, category, **args):
+        """Record the time spent within the context to the trace, if any.
+
+        The event is tagged with the depth of the phase being solved.
+        """
+        if self.trace is None:
+            return null_span
+        return self.trace.span(name, category, depth=self.trace_depth, **args)
+
+    @contextmanager
+    def traced_loading(self, name, package_name):
+        """Like `traced`, but package repository loads within the context are
+        also recorded (see `PackageRepositoryGlobalStats.package_loading`).
+        """
+        if self.trace is None:
+            yield
+            return
+
+        trace_ = package_repo_stats.trace
+        package_repo_stats.trace = self.trace
+
+        try:
+            with self.traced(name, "load", package=package_name):
+                yield
+        finally:
+            package_repo_stats.trace = trace_
+
     @property
     def status(self):
         """Return the current status of the solve.
@@ -2097,11 +2492,30 @@ class Solver(_Common):
         t1 = time.time()
         pt1 = package_repo_stats.package_load_time
 
+        if self.parallel_workers > 1:
+            from multiprocessing import Pool, Event
+            self.worker_abort_event = Event()
+            self.worker_pool = Pool(processes=self.parallel_workers,
+                                    initializer=_init_solver_worker,
+                                    initargs=(self.worker_abort_event,))
+
         # iteratively solve phases
-        while self.status == SolverStatus.unsolved:
-            self.solve_step()
-            if self.status == SolverStatus.unsolved and not self._do_callback():
-                break
+        try:
+            while self.status == SolverStatus.unsolved:
+                self.solve_step()
+                if self.status == SolverStatus.unsolved and not self._do_callback():
+                    break
+        finally:
+            if self.worker_pool is not None:
+                # Outstanding speculations are no longer needed. Workers are
+                # asked to stop rather than terminated, because a worker that
+                # is terminated while sending its result can deadlock the pool.
+                self.worker_abort_event.set()
+                self.worker_pool.close()
+                self.worker_pool.join()
+                self.worker_pool = None
+                self.worker_abort_event = None
+                self.speculations = {}
 
         self.load_time = package_repo_stats.package_load_time - pt1
         self.solve_time = time.time() - t1
@@ -2147,13 +2561,32 @@ class Solver(_Common):
             "load_time": self.load_time
         }
 
-        return {
+        learning_stats = {
+            "num_nogoods": len(self.nogoods),
+            "num_nogood_prunes": self.nogood_prunes_count,
+            "nogood_test_time": self.nogood_test_time[0]
+        }
+
+        stats = {
             "global": global_stats,
             "extractions": extraction_stats,
             "intersections": intersection_stats,
-            "reductions": reduction_stats
+            "reductions": reduction_stats,
+            "learning": learning_stats
         }
 
+        if self.parallel_workers > 1:
+            stats["parallel"] = {
+                "num_workers": self.parallel_workers,
+                "num_speculations": self.speculations_count,
+                "num_speculation_hits": self.speculation_hits_count,
+                "num_worker_solves": self.worker_solves_count,
+                "num_worker_fails": self.worker_fails_count,
+                "worker_solve_time": self.worker_solve_time
+            }
+
+        return stats
+
     def solve_step(self):
         """Perform a single solve step.
         """
@@ -2172,14 +2605,31 @@ class Solver(_Common):
             self.failed_phase_list.append(phase)
             phase = self._pop_phase()
 
-        if phase.status == SolverStatus.exhausted:
-            self.pr.subheader("SPLITTING:")
-            phase, next_phase = phase.split()
-            self._push_phase(next_phase)
-            if self.pr:
-                self.pr("new phase: %s", phase)
+        self.trace_depth = len(phase.split_path)
+        with self.traced("solve #%d" % (self.solve_count + 1), "solve"):
+            self._solve_step(phase)
+
+    def _solve_step(self, phase):
+        if self.replay_steps is None:
+            speculation = self.speculations.pop(phase.split_path, None)
+            if speculation is not None:
+                self._use_speculation(phase, speculation)
+
+        if self.replay_steps is not None:
+            # the phase has already been solved by a worker process
+            new_phase = self._replay_step(phase)
+        else:
+            if phase.status == SolverStatus.exhausted:
+                self.pr.subheader("SPLITTING:")
+                phase, next_phase = phase.split()
+                self.trace_depth = len(phase.split_path)
+                self._push_phase(next_phase)
+                self._speculate(next_phase)
+                if self.pr:
+                    self.pr("new phase: %s", phase)
+
+            new_phase = phase.solve()
 
-        new_phase = phase.solve()
         self.solve_count += 1
 
         if new_phase.status == SolverStatus.failed:
@@ -2324,6 +2774,20 @@ class Solver(_Common):
         self.reduction_time = [0.0]
         self.reduction_test_time = [0.0]
 
+        self.speculations = {}
+        self.replay_root = None
+        self.replay_steps = None
+        self.speculations_count = 0
+        self.speculation_hits_count = 0
+        self.worker_solves_count = 0
+        self.worker_fails_count = 0
+        self.worker_solve_time = 0.0
+
+        self.nogoods = []
+        self.nogood_keys = set()
+        self.nogood_prunes_count = 0
+        self.nogood_test_time = [0.0]
+
     def _latest_nonfailed_phase(self):
         if self.status == SolverStatus.failed:
             return None
@@ -2353,9 +2817,161 @@ class Solver(_Common):
 
         return keep_going
 
+    def _speculate(self, phase):
+        # solve the given phase in a worker process, so that its result is
+        # ready if/when the phase gets popped from the phase stack.
+        if self.worker_pool is None \
+                or len(self.speculations) >= self.parallel_workers:
+            return
+
+        if self.package_filter:
+            package_filter_data = self.package_filter.to_pod()
+        else:
+            package_filter_data = None
+
+        if self.package_orderers:
+            package_orderers_data = [package_order.to_pod(x)
+                                     for x in self.package_orderers]
+        else:
+            package_orderers_data = None
+
+        job_data = dict(
+            package_requests=[str(x) for x in self.request_list.requirements],
+            package_paths=self.package_paths,
+            package_filter=package_filter_data,
+            package_orderers=package_orderers_data,
+            building=self.building,
+            optimised=self.optimised,
+            variant_select_mode=config.variant_select_mode,
+            split_path=phase.split_path,
+            nogoods=self.nogoods
+        )
+
+        result = self.worker_pool.apply_async(_solve_speculative_phase,
+                                              (job_data,))
+        self.speculations[phase.split_path] = (result, len(self.nogoods))
+        self.speculations_count += 1
+
+        if self.pr:
+            self.pr("speculating %s: %s", self._depth_label(), phase)
+
+    def _use_speculation(self, phase, speculation):
+        # A worker has searched the phase's subtree, starting with the nogoods
+        # this solver had when the speculation began. If this solver has
+        # learned more since, the serial solver may have searched the subtree
+        # differently, so the speculation can't be used.
+        #
+        result, num_nogoods = speculation
+
+        if len(self.nogoods) != num_nogoods:
+            if self.pr:
+                self.pr("discarded speculated phase, nogoods were learned since")
+            return
+
+        result = result.get()
+        self.speculation_hits_count += 1
+        self._add_worker_stats(result["solve_stats"])
+
+        # learn what the worker learned, as the serial solver would have
+        for nogood in result["nogoods"]:
+            self.nogood_keys.add(nogood.key)
+            self.nogoods.append(nogood)
+
+        self.replay_root = phase
+        self.replay_steps = deque(result["steps"])
+
+        if self.pr:
+            self.pr("replaying %d speculated solve steps", len(self.replay_steps))
+
+    def _replay_step(self, phase):
+        # Perform the next solve step of a speculated subtree. Because solving
+        # is deterministic, the worker's steps are exactly those the serial
+        # solver would have taken. Phases are pushed and popped as in a
+        # serial solve, but are only recreated when needed.
+        #
+        if phase.status == SolverStatus.exhausted:
+            split_path = phase.split_path + (0,)
+            next_phase = _SpeculativePhase(self, self.replay_root,
+                                           phase.split_path + (1,),
+                                           SolverStatus.pending)
+            self._push_phase(next_phase)
+        else:
+            split_path = phase.split_path
+
+        step_split_path, status, num_nogoods = self.replay_steps.popleft()
+        assert step_split_path == split_path
+
+        new_phase = _SpeculativePhase(self, self.replay_root, split_path,
+                                      status, num_nogoods)
+
+        if not self.replay_steps:
+            # this is the phase the worker's search ended on
+            self.replay_root = None
+            self.replay_steps = None
+            new_phase = new_phase.phase
+
+        return new_phase
+
+    def _add_worker_stats(self, stats):
+        self.worker_solves_count += stats["global"]["num_solves"]
+        self.worker_fails_count += stats["global"]["num_fails"]
+        self.worker_solve_time += stats["global"]["solve_time"]
+
+        self.extractions_count += stats["extractions"]["num_extractions"]
+        self.extraction_time[0] += stats["extractions"]["extraction_time"]
+
+        stats_ = stats["intersections"]
+        self.intersections_count += stats_["num_intersections"]
+        self.intersection_tests_count += stats_["num_intersection_tests"]
+        self.intersection_broad_tests_count += stats_["num_intersection_broad_tests"]
+        self.intersection_time[0] += stats_["intersection_time"]
+        self.intersection_test_time[0] += stats_["intersection_test_time"]
+
+        stats_ = stats["reductions"]
+        self.reductions_count += stats_["num_reductions"]
+        self.reduction_tests_count += stats_["num_reduction_tests"]
+        self.reduction_broad_tests_count += stats_["num_reduction_broad_tests"]
+        self.reduction_time[0] += stats_["reduction_time"]
+        self.reduction_test_time[0] += stats_["reduction_test_time"]
+
+        stats_ = stats["learning"]
+        self.nogood_prunes_count += stats_["num_nogood_prunes"]
+        self.nogood_test_time[0] += stats_["nogood_test_time"]
+
+    def _add_nogood(self, scopes, failure_reason):
+        # learn from a failure, so that phases that are bound to fail the same
+        # way can be failed immediately
+        if not self.optimised:
+            return
+
+        nogood = _Nogood(scopes, failure_reason)
+        key = nogood.key
+
+        if key not in self.nogood_keys:
+            self.nogood_keys.add(key)
+            self.nogoods.append(nogood)
+
+            if self.pr:
+                self.pr("learned nogood: %s", nogood)
+
+    def _find_nogood(self, scopes):
+        # find a learned nogood that the given scopes are bound to fail by
+        if not self.nogoods:
+            return None
+
+        with self.timed(self.nogood_test_time):
+            scopes_ = dict((x.package_name, x) for x in scopes)
+
+            for nogood in self.nogoods:
+                if nogood.implied_by(scopes_):
+                    self.nogood_prunes_count += 1
+                    return nogood
+
+        return None
+
     def _get_variant_slice(self, package_name, range_):
         slice_ = self.package_cache.get_variant_slice(
-            package_name=package_name, range_=range_)
+            package_name=package_name, range_=range_, solver=self)
 
         return slice_
 
@@ -2416,6 +3032,89 @@ class Solver(_Common):
                              str(self.phase_stack[-1]))
 
 
+# set in solver worker processes, see `_init_solver_worker`
+_solver_worker_abort_event = None
+
+
+def _init_solver_worker(abort_event):
+    # Don't let workers inherit signal handlers (such as those installed by the
+    # rez cli, which kill the entire process group).
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    global _solver_worker_abort_event
+    _solver_worker_abort_event = abort_event
+
+
+def _solve_speculative_phase(job_data):
+    """Solve a phase in a worker process.
+
+    The phase is recreated by replaying its split path from the initial phase,
+    then its subtree is searched serially.
+
+    Returns:
+        dict: Containing:
+        - steps: A (split path, status, number of nogoods) tuple for the phase
+          resulting from each solve step, and the number of nogoods known
+          before that step;
+        - nogoods: Nogoods learned by the worker;
+        - solve_stats: Stats of the worker's solver.
+        Or None, if the calling solve finished before this one did.
+    """
+    if _solver_worker_abort_event.is_set():
+        return None
+
+    config.override("variant_select_mode", job_data["variant_select_mode"])
+
+    package_filter = None
+    if job_data["package_filter"] is not None:
+        package_filter = PackageFilterList.from_pod(job_data["package_filter"])
+
+    package_orderers = None
+    if job_data["package_orderers"] is not None:
+        package_orderers = [package_order.from_pod(x)
+                            for x in job_data["package_orderers"]]
+
+    solver = Solver(package_requests=[Requirement(x) for x in job_data["package_requests"]],
+                    package_paths=job_data["package_paths"],
+                    package_filter=package_filter,
+                    package_orderers=package_orderers,
+                    building=job_data["building"],
+                    optimised=job_data["optimised"],
+                    parallel_workers=0)
+
+    phase = solver._pop_phase()
+    for i in job_data["split_path"]:
+        phase = phase.solve().split()[i]
+
+    solver._push_phase(phase)
+
+    # search with the same nogoods as the calling solver
+    nogoods = job_data["nogoods"]
+    solver.nogoods = list(nogoods)
+    solver.nogood_keys = set(x.key for x in nogoods)
+
+    steps = []
+    t1 = time.time()
+
+    while solver.status == SolverStatus.unsolved:
+        if _solver_worker_abort_event.is_set():
+            return None
+
+        num_nogoods = len(solver.nogoods)
+        solver.solve_step()
+        new_phase = solver.phase_stack[-1]
+        steps.append((new_phase.split_path, new_phase.status, num_nogoods))
+
+    solver.solve_time = time.time() - t1
+
+    return dict(
+        steps=steps,
+        nogoods=solver.nogoods[len(nogoods):],
+        solve_stats=solver.solve_stats
+    )
+
+
 def _short_req_str(package_request):
     """print shortened version of '==X|==Y|==Z' ranged requests."""
     if not package_request.conflict:
@@ -52,7 +52,9 @@ class TestCompletion(TestBase):
         _eq("", ["bahish", "nada", "nopy", "pybah", "pydad", "pyfoo", "pymum",
                  "pyodd", "pyson", "pysplit", "python", "pyvariants",
                  "test_variant_split_start", "test_variant_split_mid1",
-                 "test_variant_split_mid2", "test_variant_split_end"])
+                 "test_variant_split_mid2", "test_variant_split_end",
+                 "test_nogood_start", "test_nogood_a", "test_nogood_b",
+                 "test_nogood_c", "test_nogood_d"])
         _eq("py", ["pybah", "pydad", "pyfoo", "pymum", "pyodd", "pyson",
             "pysplit", "python", "pyvariants"])
         _eq("pys", ["pyson", "pysplit"])
@@ -7,7 +7,8 @@ test resolved contexts
 """
 from rez.tests.util import restore_os_environ, restore_sys_path, TempdirMixin, \
     TestBase
-from rez.resolved_context import ResolvedContext
+from rez.resolved_context import ResolvedContext, resolve_many
+from rez.resolver import FileResolveCache
 from rez.bundle_context import bundle_context
 from rez.bind import hello_world
 from rez.utils.platform_ import platform_
@@ -57,6 +58,73 @@ class TestContext(TestBase, TempdirMixin):
             r.apply()
             self.assertEqual(os.environ.get("OH_HAI_WORLD"), "hello")
 
+    def test_resolve_cache(self):
+        """Test caching of resolves on local disk."""
+        cache_path = os.path.join(self.root, "resolve_cache")
+        self.update_settings(dict(resolve_caching=True,
+                                  resolve_cache_path=cache_path))
+
+        r = ResolvedContext(["hello_world"])
+        self.assertFalse(r.from_cache)
+
+        r2 = ResolvedContext(["hello_world"])
+        self.assertTrue(r2.from_cache)
+        self.assertEqual(r2.resolved_packages, r.resolved_packages)
+
+        # test LRU eviction
+        cache = FileResolveCache(os.path.join(self.root, "resolve_cache2"),
+                                 max_size=1000)
+        cache.set("a", "x" * 400)
+        cache.set("b", "x" * 400)
+        cache.atime_resolution = 0
+        self.assertIsNotNone(cache.get("a"))  # 'b' is now least recently used
+        cache.set("c", "x" * 400)
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertLessEqual(cache.get_size(), 1000)
+
+    def test_resolve_many(self):
+        """Test resolving many requests with shared package loading."""
+        requests = [["hello_world"], ["hello_world-1"], ["~hello_world-2"]]
+        expected = [ResolvedContext(x).resolved_packages for x in requests]
+
+        results = list(resolve_many(requests))
+        self.assertEqual([i for i, _ in results], [0, 1, 2])
+        self.assertEqual([r.resolved_packages for _, r in results], expected)
+
+        # the package is only loaded by the first resolve
+        self.assertEqual(results[0][1].num_loaded_packages, 1)
+        self.assertEqual(results[1][1].num_loaded_packages, 0)
+
+        # test resolving over a worker pool
+        results = dict(resolve_many(requests, max_workers=2))
+        self.assertEqual(sorted(results.keys()), [0, 1, 2])
+        for i, r in results.items():
+            self.assertEqual(r.resolved_packages, expected[i])
+
+    def test_seeded_resolve(self):
+        """Test resolving with a previous context as a seed."""
+        paths = [self.data_path("solver", "packages")]
+
+        def _resolve(request, seed_context=None):
+            r = ResolvedContext(request, package_paths=paths,
+                                seed_context=seed_context)
+            return [x.qualified_package_name for x in r.resolved_packages]
+
+        seed = ResolvedContext(["python-2.6.0"], package_paths=paths)
+
+        # seed variants are kept where still valid
+        self.assertEqual(_resolve(["pyfoo"]), ["python-2.6.8", "pyfoo-3.1.0"])
+        self.assertEqual(_resolve(["pyfoo"], seed),
+                         ["python-2.6.0", "pyfoo-3.1.0"])
+
+        # seed variants that conflict with the new request are replaced
+        self.assertEqual(_resolve(["pyfoo-3.0"], seed),
+                         ["python-2.5.2", "pyfoo-3.0.0"])
+        self.assertEqual(_resolve(["python-2.7"], seed), ["python-2.7.0"])
+
     # TODO make shell-dependent (wait until port to pytest)
     def test_execute_command(self):
         """Test command execution in context."""
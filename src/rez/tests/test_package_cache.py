@@ -8,13 +8,17 @@ Test package caching.
 from rez.tests.util import TestBase, TempdirMixin, restore_os_environ, \
     install_dependent
 from rez.packages import get_package
-from rez.package_cache import PackageCache
+from rez.package_cache import PackageCache, _Throttle
 from rez.resolved_context import ResolvedContext
 from rez.exceptions import PackageCacheError
 from rez.utils.filesystem import canonical_path
+from rez.utils import json
+import logging
 import os
 import os.path
+import shutil
 import time
+import threading
 import subprocess
 
 
@@ -123,6 +127,246 @@ class TestPackageCache(TestBase, TempdirMixin):
         with self.assertRaises(PackageCacheError):
             pkgcache.add_variant(variant)
 
+    def test_cache_index(self):
+        """Test lookup of cached variants via the cache index."""
+        cache_path = os.path.join(self.root, "package_cache4")
+        os.mkdir(cache_path)
+        pkgcache = PackageCache(cache_path)
+
+        variants = [
+            next(get_package("timestamped", version).iter_variants())
+            for version in ("1.0.5", "1.2.0")
+        ]
+
+        root_1, _ = pkgcache.add_variant(variants[0])
+        self.assertTrue(os.path.exists(pkgcache._index_filepath))
+
+        # cached variants are found without searching their hash dirs
+        def _get_hash_path(variant):
+            raise AssertionError("Hash dir was searched")
+
+        pkgcache._get_hash_path = _get_hash_path
+        self.assertEqual(pkgcache.get_cached_root(variants[0]), root_1)
+        del pkgcache._get_hash_path
+
+        # variants cached without an index are still found, and are added to
+        # the index once it is recreated
+        os.remove(pkgcache._index_filepath)
+        self.assertEqual(pkgcache.get_cached_root(variants[0]), root_1)
+
+        root_2, _ = pkgcache.add_variant(variants[1])
+        index = pkgcache._get_index()
+        self.assertEqual(len(index), 2)
+
+        pkgcache.remove_variant(variants[0])
+        self.assertEqual(pkgcache.get_cached_root(variants[0]), None)
+        self.assertEqual(len(pkgcache._get_index()), 1)
+        self.assertEqual(pkgcache.get_cached_root(variants[1]), root_2)
+
+        # variants deleted without updating the index can be cached again
+        shutil.rmtree(os.path.join(cache_path, "timestamped"))
+        self.assertEqual(pkgcache.get_cached_root(variants[1]), None)
+        self.assertEqual(len(pkgcache._get_index()), 0)
+
+        rootpath, status = pkgcache.add_variant(variants[1])
+        self.assertEqual(status, PackageCache.VARIANT_CREATED)
+        self.assertTrue(os.path.isdir(rootpath))
+
+    def test_cache_max_size(self):
+        """Test removal of least recently used variants from a full cache."""
+        self.update_settings({
+            "package_cache_max_size": 3,
+            "package_cache_low_watermark": 0.75
+        })
+
+        repo_path = os.path.join(self.root, "large_packages")
+        versions = ("1.0", "2.0", "3.0", "4.0")
+
+        for version in versions:
+            path = os.path.join(repo_path, "large", version)
+            os.makedirs(path)
+
+            with open(os.path.join(path, "package.py"), 'w') as f:
+                f.write("name = 'large'\nversion = '%s'\n" % version)
+            with open(os.path.join(path, "data.bin"), 'wb') as f:
+                f.write(b'\0' * 1024 * 1024)
+
+        cache_path = os.path.join(self.root, "package_cache5")
+        os.mkdir(cache_path)
+        pkgcache = PackageCache(cache_path)
+
+        roots = []
+        for i, version in enumerate(versions):
+            variant = next(get_package("large", version, paths=[repo_path]).iter_variants())
+            rootpath, _ = pkgcache.add_variant(variant, force=True)
+            roots.append(rootpath)
+
+            # make earlier versions less recently used
+            t = time.time() - 1000 + i
+            os.utime(rootpath + ".json", (t, t))
+
+        # nothing is removed if the time limit expires while sizing variants
+        pkgcache.clean(time_limit=0)
+        remaining = [x for x in roots if os.path.exists(x)]
+        self.assertEqual(remaining, roots)
+
+        # the least recently used variant is in use, so is not removed
+        pkgcache.mark_in_use([roots[0]])
+        pkgcache.clean()
+
+        remaining = [x for x in roots if os.path.exists(x)]
+        self.assertEqual(remaining, [roots[0], roots[3]])
+
+    def test_prefetch(self):
+        """Test caching of several variants at once."""
+        self.update_settings({"package_cache_max_bandwidth": 1})
+
+        cache_path = os.path.join(self.root, "package_cache6")
+        os.mkdir(cache_path)
+        pkgcache = PackageCache(cache_path)
+
+        variants = [
+            next(get_package(name, version).iter_variants())
+            for name, version in (
+                ("timestamped", "1.2.0"),
+                ("versioned", "3.0"),
+                ("timestamped", "1.1.1"),  # not cachable
+                ("timestamped", "1.2.0")
+            )
+        ]
+
+        callbacks = []
+        results = pkgcache.prefetch(variants, callback=lambda *x: callbacks.append(x))
+        self.assertEqual(len(results), 3)
+        self.assertEqual(len(callbacks), 3)
+
+        statuses = dict((x[0], x[2]) for x in results)
+        self.assertEqual(statuses[variants[0]], PackageCache.VARIANT_CREATED)
+        self.assertEqual(statuses[variants[1]], PackageCache.VARIANT_CREATED)
+        self.assertEqual(statuses[variants[2]], None)
+
+        self.assertTrue(os.path.isfile(
+            os.path.join(pkgcache.get_cached_root(variants[0]), "stuff.txt")))
+
+        # variants being copied by another process are waited for
+        pkgcache = PackageCache(cache_path)
+        statuses = [PackageCache.VARIANT_COPYING] * 2
+        get_cached_root = pkgcache._get_cached_root
+
+        def _get_cached_root(variant):
+            if statuses:
+                return statuses.pop(), ''
+            return get_cached_root(variant)
+
+        pkgcache._get_cached_root = _get_cached_root
+        results = pkgcache.prefetch(variants[1:2])
+        self.assertEqual(statuses, [])
+        self.assertEqual(results[0][2], PackageCache.VARIANT_FOUND)
+        self.assertEqual(results[0][1], get_cached_root(variants[1])[1])
+
+    def test_throttle(self):
+        """Test that the copy rate limit is shared across threads."""
+        chunk_size = 1 << 20
+        throttle = _Throttle(16 * chunk_size)  # 16MB/s
+
+        def _copy():
+            for _ in range(2):
+                throttle.consume(chunk_size)
+
+        threads = [threading.Thread(target=_copy) for _ in range(4)]
+        start = time.time()
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # 8MB in total, the first chunk of which is not waited for
+        elapsed = time.time() - start
+        self.assertGreaterEqual(elapsed, 7 * chunk_size / throttle.rate)
+
+    def test_add_pending_variants(self):
+        """Test concurrent copying of pending variants into the cache."""
+        self.update_settings({
+            "package_cache_workers": 3,
+            "package_cache_copy_threads": 4
+        })
+
+        cache_path = os.path.join(self.root, "package_cache2")
+        os.mkdir(cache_path)
+        pkgcache = PackageCache(cache_path)
+
+        variants = [
+            next(get_package(name, version).iter_variants())
+            for name, version in (("timestamped", "1.0.5"),
+                                  ("versioned", "3.0"),
+                                  ("timestamped", "1.2.0"),
+                                  ("timestamped", "2.0.0"))
+        ]
+
+        # queue variants, as `add_variants_async` does
+        for i, variant in enumerate(variants):
+            filename = "%s-%d.json" % (variant.parent.qualified_name, i)
+            with open(os.path.join(pkgcache._pending_dir, filename), 'w') as f:
+                f.write(json.dumps(variant.handle.to_dict()))
+
+        pkgcache._add_pending_variants(logging.getLogger("rez-pkg-cache-test"))
+
+        self.assertEqual(os.listdir(pkgcache._pending_dir), [])
+
+        for variant in variants:
+            cached_root = pkgcache.get_cached_root(variant)
+            self.assertNotEqual(cached_root, None)
+            self.assertEqual(sorted(os.listdir(cached_root)),
+                             sorted(os.listdir(variant.root)))
+
+    def test_cache_dedupe(self):
+        """Test deduplication of cached variant payload files."""
+        self.update_settings({"package_cache_dedupe": True})
+
+        repo_path = os.path.join(self.root, "dedupe_packages")
+        for version in ("1.0", "2.0"):
+            path = os.path.join(repo_path, "dupe", version)
+            os.makedirs(path)
+
+            for filename, content in (("package.py", "name = 'dupe'\nversion = '%s'\n" % version),
+                                      ("shared.txt", "shared"),
+                                      ("own.txt", version)):
+                with open(os.path.join(path, filename), 'w') as f:
+                    f.write(content)
+
+        cache_path = os.path.join(self.root, "package_cache3")
+        os.mkdir(cache_path)
+        pkgcache = PackageCache(cache_path)
+
+        variants = [
+            next(get_package("dupe", version, paths=[repo_path]).iter_variants())
+            for version in ("1.0", "2.0")
+        ]
+
+        roots = [pkgcache.add_variant(x, force=True)[0] for x in variants]
+
+        def _blobs():
+            blobs_dir = pkgcache._blobs_dir
+            return [name for dirname in os.listdir(blobs_dir) if dirname != "tmp"
+                    for name in os.listdir(os.path.join(blobs_dir, dirname))]
+
+        st_1 = os.stat(os.path.join(roots[0], "shared.txt"))
+        st_2 = os.stat(os.path.join(roots[1], "shared.txt"))
+        self.assertEqual(st_1.st_ino, st_2.st_ino)
+        self.assertEqual(st_1.st_nlink, 3)
+        self.assertEqual(len(_blobs()), 5)
+
+        with open(os.path.join(roots[1], "own.txt")) as f:
+            self.assertEqual(f.read(), "2.0")
+
+        # only blobs that are no longer used are deleted
+        pkgcache.remove_variant(variants[1])
+        pkgcache.clean()
+
+        self.assertEqual(len(_blobs()), 3)
+        self.assertEqual(os.stat(os.path.join(roots[0], "shared.txt")).st_nlink, 2)
+
     @install_dependent()
     def test_caching_on_resolve(self):
         """Test that cache is updated as expected on resolved env."""
@@ -8,24 +8,29 @@ test package iteration, serialization etc
 from rez.packages import iter_package_families, iter_packages, get_package, \
     create_package, get_developer_package, get_variant_from_uri, \
     get_package_from_uri, get_package_from_repository, \
-    get_package_family_from_repository
+    get_package_family_from_repository, prefetch_packages, \
+    get_last_release_time, get_last_release_times
 from rez.exceptions import PackageRepositoryError
 from rez.package_py_utils import expand_requirement
 from rez.package_resources import package_release_keys
 from rez.package_move import move_package
 from rez.package_remove import remove_package, remove_packages_ignored_since, \
     remove_package_family
-from rez.package_repository import package_repository_manager
+from rez.package_repository import package_repository_manager, package_repo_stats, \
+    PackageRepositoryManager
 from rez.tests.util import TestBase, TempdirMixin
 from rez.utils.formatting import PackageRequest
 from rez.utils.sourcecode import SourceCode
+from rez.utils.resources import Resource, ResourcePool
 import unittest
 from rez.vendor.version.version import Version
 from rez.vendor.version.util import VersionError
 from rez.utils.filesystem import canonical_path
 import shutil
+import gc
 import os.path
 import os
+import sys
 
 
 ALL_PACKAGES = set([
@@ -47,6 +52,10 @@ ALL_PACKAGES = set([
     'test_variant_split_mid2-1.0', 'test_variant_split_mid2-2.0',
     'test_variant_split_end-1.0', 'test_variant_split_end-2.0',
     'test_variant_split_end-3.0', 'test_variant_split_end-4.0',
+    'test_nogood_start-1',
+    'test_nogood_a-1', 'test_nogood_a-2', 'test_nogood_a-3',
+    'test_nogood_b-1', 'test_nogood_b-2',
+    'test_nogood_c-1', 'test_nogood_d-1',
     # packages from data/packages/py_packages and .../yaml_packages
     'unversioned',
     'unversioned_py',
@@ -617,6 +626,414 @@ class TestPackages(TestBase, TempdirMixin):
         i = repo.unignore_package(pkg_name, pkg_version)
         self.assertEqual(i, -1)
 
+    def test_repository_index(self):
+        """Test the filesystem repository index."""
+        repo_path = os.path.join(self.root, "tmp7_packages")
+        shutil.copytree(self.solver_packages_path, repo_path)
+        repo = package_repository_manager.get_repository(repo_path)
+
+        def _qnames():
+            return set(
+                pkg.qualified_name
+                for fam in iter_package_families(paths=[repo_path])
+                for pkg in iter_packages(fam.name, paths=[repo_path])
+            )
+
+        expected_qnames = _qnames()
+        repo.update_index()
+        repo.clear_caches()
+
+        # packages are found via the index
+        self.assertEqual(_qnames(), expected_qnames)
+        self.assertEqual(_to_names(repo.iter_package_families()),
+                         set(x.split('-')[0] for x in expected_qnames))
+
+        pkg = get_package_from_repository("pydad", Version("2"), repo_path)
+        self.assertEqual(pkg.resource.indexed_data["requires"], ["pyson-2"])
+        self.assertEqual(pkg.requires, [PackageRequest("pyson-2")])
+
+        # removing a package keeps the index current
+        self.assertTrue(remove_package("pydad", Version("2"), repo_path))
+        entry = repo.get_indexed_family("pydad")
+        self.assertEqual(sorted(entry["packages"].keys()), ["1", "3"])
+        self.assertEqual(get_package_from_repository("pydad", Version("2"), repo_path), None)
+
+        # a family changed outside of rez is read from the filesystem instead
+        fam_path = os.path.join(repo_path, "pyfoo")
+        shutil.rmtree(os.path.join(fam_path, "3.0.0"))
+        os.utime(fam_path, (0, 0))
+        repo.clear_caches()
+
+        self.assertEqual(repo.get_indexed_family("pyfoo"), None)
+        self.assertEqual(_to_qnames(iter_packages("pyfoo", paths=[repo_path])),
+                         set(["pyfoo-3.1.0"]))
+
+        self.assertTrue(repo.remove_index())
+        self.assertEqual(repo.index, None)
+
+    def test_prefetch_packages(self):
+        """Test concurrent scanning of family directories."""
+        repo_path = os.path.join(self.root, "tmp8_packages")
+        shutil.copytree(self.solver_packages_path, repo_path)
+
+        with open(os.path.join(repo_path, "settings.yaml"), 'w') as f:
+            f.write("scan_workers: 4\n")
+
+        repo = package_repository_manager.get_repository(repo_path)
+        self.assertEqual(repo.scan_workers, 4)
+
+        expected_qnames = set(
+            pkg.qualified_name for pkg in
+            get_package_family_from_repository("pydad", self.solver_packages_path).iter_packages()
+        )
+
+        prefetch_packages(paths=[repo_path])
+
+        # family directories have already been scanned
+        def _scandir(path):
+            raise AssertionError("unexpected directory scan: %s" % path)
+
+        fs_module = sys.modules[repo.__class__.__module__]
+        scandir = fs_module._scandir
+        fs_module._scandir = _scandir
+
+        try:
+            qnames = _to_qnames(iter_packages("pydad", paths=[repo_path]))
+            fams = _to_names(iter_package_families(paths=[repo_path]))
+        finally:
+            fs_module._scandir = scandir
+
+        self.assertEqual(qnames, expected_qnames)
+        self.assertIn("pydad", fams)
+
+    def test_package_file_cache(self):
+        """Test the on-disk cache of loaded package definition files."""
+        from rez import serialise
+
+        cache_path = os.path.join(self.root, "package_file_cache")
+        self.update_settings(dict(package_file_cache_path=cache_path))
+
+        filepath = os.path.join(self.root, "tmp9_package.py")
+        shutil.copy(os.path.join(self.py_packages_path, "variants_py", "2.0", "package.py"),
+                    filepath)
+
+        data = serialise.load_from_file(filepath, serialise.FileFormat.py,
+                                        disable_memcache=True,
+                                        use_package_file_cache=True)
+
+        # the file is not executed again
+        def _load_py(stream, filepath=None):
+            raise AssertionError("unexpected file load: %s" % filepath)
+
+        load_py = serialise.load_functions[serialise.FileFormat.py]
+        serialise.load_functions[serialise.FileFormat.py] = _load_py
+
+        try:
+            cached_data = serialise.load_from_file(filepath, serialise.FileFormat.py,
+                                                   disable_memcache=True,
+                                                   use_package_file_cache=True)
+        finally:
+            serialise.load_functions[serialise.FileFormat.py] = load_py
+
+        self.assertEqual(cached_data["variants"], data["variants"])
+        self.assertTrue(isinstance(cached_data["commands"], SourceCode))
+        self.assertEqual(cached_data["commands"].source, data["commands"].source)
+
+        # a changed file is loaded again
+        with open(filepath, 'a') as f:
+            f.write("\nrequires = ['python-3']\n")
+
+        data = serialise.load_from_file(filepath, serialise.FileFormat.py,
+                                        disable_memcache=True,
+                                        use_package_file_cache=True)
+        self.assertEqual(data["requires"], ["python-3"])
+
+        # unused entries are cleaned up
+        cache = serialise.get_package_file_cache()
+        for dirpath, _, filenames in os.walk(cache_path):
+            for name in filenames:
+                os.utime(os.path.join(dirpath, name), (0, 0))
+
+        self.assertEqual(cache.clean(), 2)
+
+        # loads that don't opt in, such as developer packages, are not cached
+        serialise.load_from_file(filepath, serialise.FileFormat.py,
+                                 disable_memcache=True)
+        entries = [
+            name for dirpath, _, filenames in os.walk(cache_path)
+            if dirpath != cache_path for name in filenames
+        ]
+        self.assertEqual(entries, [])
+
+    def test_lazy_package_loading(self):
+        """Test that indexed packages are only loaded when needed."""
+        repo_path = os.path.join(self.root, "tmp10_packages")
+        shutil.copytree(self.solver_packages_path, repo_path)
+        repo = package_repository_manager.get_repository(repo_path)
+        repo.update_index()
+        repo.clear_caches()
+
+        load_count = package_repo_stats.package_load_count
+        pkg = get_package_from_repository("pyvariants", Version("2"), repo_path)
+
+        # solver-relevant attributes come from the index
+        self.assertEqual(pkg.requires, None)
+        self.assertEqual(pkg.variants, [[PackageRequest("python-2.7.0")],
+                                        [PackageRequest("python-2.6.8"),
+                                         PackageRequest("nada")]])
+        self.assertEqual(_to_qnames(pkg.iter_variants()),
+                         set(["pyvariants-2[0]", "pyvariants-2[1]"]))
+        self.assertEqual(package_repo_stats.package_load_count, load_count)
+
+        # other attributes load the package definition
+        self.assertEqual(pkg.commands, None)
+        self.assertEqual(package_repo_stats.package_load_count, load_count + 1)
+
+    def test_repository_watch(self):
+        """Test cache invalidation of changed families in a watched repository."""
+        repo_path = os.path.join(self.root, "tmp11_packages")
+        shutil.copytree(self.solver_packages_path, repo_path)
+
+        self.update_settings({
+            "plugins": {
+                "package_repository": {
+                    "filesystem": {
+                        "watch_method": "poll",
+                        "watch_poll_interval": 3600
+                    }
+                }
+            }
+        })
+        repo = package_repository_manager.get_repository(repo_path)
+        repo.start_watching()
+
+        def _versions(name):
+            return set(str(x.version) for x in iter_packages(name, paths=[repo_path]))
+
+        try:
+            self.assertEqual(_versions("pyfoo"), set(["3.0.0", "3.1.0"]))
+            pydad_packages = repo.get_packages(repo.get_package_family("pydad"))
+
+            # add a package
+            shutil.copytree(os.path.join(repo_path, "pyfoo", "3.1.0"),
+                            os.path.join(repo_path, "pyfoo", "4.0.0"))
+            self.assertEqual(repo._watcher.poll(), 1)
+            self.assertEqual(_versions("pyfoo"), set(["3.0.0", "3.1.0", "4.0.0"]))
+
+            # edit a loaded package in place
+            pkg = get_package_from_repository("pyfoo", Version("3.0.0"), repo_path)
+            self.assertEqual(pkg.requires[0], PackageRequest("python-2.5"))
+
+            filepath = pkg.resource.filepath
+            with open(filepath, 'a') as f:
+                f.write("\nrequires = ['python-2.6']\n")
+            os.utime(filepath, (0, 0))
+
+            self.assertEqual(repo._watcher.poll(), 1)
+            pkg = get_package_from_repository("pyfoo", Version("3.0.0"), repo_path)
+            self.assertEqual(pkg.requires, [PackageRequest("python-2.6")])
+
+            # data of other families is kept
+            self.assertTrue(
+                repo.get_packages(repo.get_package_family("pydad")) is pydad_packages)
+        finally:
+            repo.stop_watching()
+
+    def test_family_names_cache(self):
+        """Test that lookups of missing families use the cached family names."""
+        repo_path = os.path.join(self.root, "tmp13_packages")
+        shutil.copytree(self.solver_packages_path, repo_path)
+        repo = package_repository_manager.get_repository(repo_path)
+
+        self.assertEqual(repo.get_package_family("missing"), None)
+        self.assertTrue(repo.get_package_family("pyfoo") is not None)
+        family_names = repo._family_names
+
+        # a missing family does not touch its family dir or package file
+        def _get_file(path, package_filename=None):
+            raise AssertionError("unexpected file lookup: %s" % package_filename)
+
+        get_file = repo.get_file
+        repo.get_file = _get_file
+        repo.get_family.cache_clear()
+
+        try:
+            self.assertEqual(repo.get_package_family("missing2"), None)
+        finally:
+            repo.get_file = get_file
+
+        self.assertTrue(repo._family_names is family_names)
+
+        # adding a family changes the root dir, which refreshes the names
+        shutil.copytree(os.path.join(repo_path, "pyfoo"),
+                        os.path.join(repo_path, "missing"))
+        os.utime(repo_path, (0, 0))
+        repo.get_family.cache_clear()
+        self.assertTrue(repo.get_package_family("missing") is not None)
+
+    def test_resource_pool_memory(self):
+        """Test that the resource pool's memory limit bounds live resources."""
+        repo_path = os.path.join(self.root, "tmp16_packages")
+        shutil.copytree(self.solver_packages_path, repo_path)
+
+        pool = ResourcePool(max_memory=20000)
+        repo = PackageRepositoryManager(pool).get_repository(repo_path)
+
+        def _num_live_resources():
+            gc.collect()
+            return len([
+                x for x in gc.get_objects()
+                if isinstance(x, Resource) and x.get("location") == repo_path
+            ])
+
+        num_resources = 0
+        for family in repo.iter_package_families():
+            num_resources += 1
+            for package in repo.iter_packages(family):
+                package.validated_data()
+                num_resources += 1
+                for variant in repo.iter_variants(package):
+                    variant.validated_data()
+                    num_resources += 1
+
+        del family, package, variant
+        stats = pool.get_stats()
+        self.assertGreater(stats["evictions"], 0)
+        self.assertLess(stats["entries"], num_resources)
+
+        # evicted resources are not kept alive by the repository
+        self.assertLessEqual(_num_live_resources(), stats["entries"])
+
+    def test_sqlite_repository(self):
+        """Test the sqlite package repository."""
+        repo_path = os.path.join(self.root, "tmp12_packages")
+        sqlite_path = "sqlite@" + repo_path
+
+        # install packages with and without variants
+        for name in ("developer", "developer_novar"):
+            path = os.path.join(self.packages_base_path, name)
+            package = get_developer_package(path)
+            variant = next(package.iter_variants())
+            self.assertEqual(variant.install(sqlite_path, dry_run=True), None)
+
+            for variant in package.iter_variants():
+                variant.install(sqlite_path)
+
+            self.assertNotEqual(variant.install(sqlite_path, dry_run=True), None)
+            installed_package = get_package(package.name, package.version,
+                                            paths=[sqlite_path])
+            self.assertEqual(installed_package.requires, package.requires)
+            self.assertEqual(len(list(installed_package.iter_variants())),
+                             len(list(package.iter_variants())))
+
+        repo = package_repository_manager.get_repository(sqlite_path)
+        families = set(x.name for x in iter_package_families(paths=[sqlite_path]))
+        self.assertEqual(families, set(["foo", "blah"]))
+
+        # solver data is served without loading packages
+        repo.clear_caches()
+        family = repo.get_package_family("foo")
+        self.assertGreater(repo.get_last_release_time(family), 0)
+        package_repo_stats.package_load_count = 0
+        package = get_package_from_repository("foo", Version("3.0.1"), sqlite_path)
+        self.assertEqual(str(package.version), "3.0.1")
+        self.assertEqual(len(package.variants), 2)
+        self.assertEqual(package_repo_stats.package_load_count, 0)
+        package.description
+        self.assertEqual(package_repo_stats.package_load_count, 1)
+
+        # ignore, unignore, remove
+        self.assertEqual(repo.ignore_package("foo", Version("3.0.1")), 1)
+        self.assertEqual(get_package("foo", "3.0.1", paths=[sqlite_path]), None)
+        self.assertEqual(repo.ignore_package("foo", Version("3.0.1")), 0)
+        self.assertEqual(repo.unignore_package("foo", Version("3.0.1")), 1)
+        self.assertNotEqual(get_package("foo", "3.0.1", paths=[sqlite_path]), None)
+
+        payload_path = repo.get_package_payload_path("foo", "3.0.1")
+        os.makedirs(payload_path)
+        self.assertTrue(repo.remove_package("foo", Version("3.0.1")))
+        self.assertFalse(os.path.exists(payload_path))
+        self.assertEqual(get_package("foo", "3.0.1", paths=[sqlite_path]), None)
+        self.assertFalse(repo.remove_package("foo", Version("3.0.1")))
+
+    def test_uncached_iteration(self):
+        """Test iteration over packages without caching."""
+        repo_path = os.path.join(self.root, "tmp14_packages")
+        shutil.copytree(self.solver_packages_path, repo_path)
+        paths = [repo_path, self.solver_packages_path]
+
+        expected_names = sorted(x.name for x in iter_package_families(paths=[repo_path]))
+        expected_qnames = set(x.qualified_name for x in iter_packages("pyfoo", paths=paths))
+
+        package_repository_manager.clear_caches()
+        pool = package_repository_manager.pool
+
+        # families are in name order
+        names = [x.name for x in iter_package_families(paths=[repo_path], cache=False)]
+        self.assertEqual(names, expected_names)
+
+        # packages are in version order, and earlier paths take precedence
+        packages = list(iter_packages("pyfoo", paths=paths, cache=False))
+        self.assertEqual(set(x.qualified_name for x in packages), expected_qnames)
+        self.assertEqual([x.version for x in packages],
+                         sorted(x.version for x in packages))
+        for package in packages:
+            self.assertTrue(package.uri.startswith(repo_path + os.sep))
+
+        packages = list(iter_packages("pyfoo", range_="3.1+", paths=paths, cache=False))
+        self.assertEqual([x.qualified_name for x in packages], ["pyfoo-3.1.0"])
+
+        # nothing was cached
+        self.assertEqual(pool.get_stats()["entries"], 0)
+
+    def test_last_release_times(self):
+        """Test getting the release times of many families at once."""
+        repo_path = os.path.join(self.root, "tmp15_packages")
+        shutil.copytree(self.solver_packages_path, repo_path)
+        repo = package_repository_manager.get_repository(repo_path)
+
+        names = ["pyfoo", "pybah", "pydad", "python", "missing"]
+        times = get_last_release_times(names, paths=[repo_path])
+        self.assertEqual(set(times.keys()), set(names))
+        self.assertEqual(times["missing"], 0)
+
+        for name in names[:-1]:
+            family = repo.get_package_family(name)
+            self.assertGreater(times[name], 0)
+            self.assertEqual(times[name], repo.get_last_release_time(family))
+            self.assertEqual(times[name], get_last_release_time(name, paths=[repo_path]))
+
+        # the latest time across repositories is used
+        os.utime(os.path.join(repo_path, "pyfoo"), (0, 1))
+        times = get_last_release_times(names, paths=[self.solver_packages_path, repo_path])
+        self.assertGreater(times["pyfoo"], 1)
+        self.assertEqual(get_last_release_times(["pyfoo"], paths=[repo_path]), {"pyfoo": 1})
+
+        # without cached family names, the families are stat'd directly
+        self.update_settings({
+            "plugins": {
+                "package_repository": {
+                    "filesystem": {"cache_family_names": False}
+                }
+            }
+        })
+
+        def _get_family_names():
+            raise AssertionError("unexpected listing of family names")
+
+        package_repository_manager.clear_caches()
+        repo = package_repository_manager.get_repository(self.yaml_packages_path)
+        expected_times = repo.get_last_release_times(["multi", "versioned"])
+        self.assertEqual(set(expected_times.keys()), set(["multi", "versioned"]))
+
+        repo._get_family_names = _get_family_names
+        try:
+            times = repo.get_last_release_times(["multi", "versioned", "missing"])
+        finally:
+            del repo._get_family_names
+
+        self.assertEqual(times, expected_times)
+
 
 class TestMemoryPackages(TestBase):
     def test_1_memory_variant_parent(self):
@@ -306,6 +306,48 @@ class TestResources_(TestBase):
                                       age=0.6,
                                       owner="joe.bloggs"))
 
+    def test_4(self):
+        """resource pool limits and statistics."""
+        pool = PetPool(cache_size=None, subpool_limits={"kitten": {"maxsize": 2}})
+        PetRepository(pool)
+
+        obi = pool.get_resource("kitten", dict(name="obi"))
+        pool.get_resource("kitten", dict(name="scully"))
+        self.assertTrue(pool.get_resource("kitten", dict(name="obi")) is obi)
+
+        # scully is least recently used, so is evicted
+        pool.get_resource("kitten", dict(name="mordor"))
+        pool.get_resource("puppy", dict(name="taco"))
+        self.assertTrue(pool.get_resource("kitten", dict(name="obi")) is obi)
+
+        stats = pool.get_stats()
+        self.assertEqual(stats["entries"], 3)
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 4)
+        self.assertEqual(stats["subpools"]["kitten"]["evictions"], 1)
+        self.assertEqual(stats["subpools"]["puppy"]["entries"], 1)
+
+        # loaded data counts towards memory use
+        memory = stats["subpools"]["kitten"]["memory"]
+        obi.validated_data()
+        pool.get_resource("kitten", dict(name="obi"))
+        self.assertTrue(pool.get_stats()["subpools"]["kitten"]["memory"] > memory)
+
+        # memory limit evicts least recently used resources across sub-pools
+        pool = PetPool(max_memory=stats["memory"] - 1)
+        PetRepository(pool)
+
+        taco = pool.get_resource("puppy", dict(name="taco"))
+        pool.get_resource("puppy", dict(name="ringo"))
+        pool.get_resource("kitten", dict(name="obi"))
+        scully = pool.get_resource("kitten", dict(name="scully"))
+
+        stats = pool.get_stats()
+        self.assertTrue(stats["memory"] <= pool.max_memory)
+        self.assertEqual(stats["subpools"]["kitten"]["evictions"], 0)
+        self.assertTrue(pool.get_resource("kitten", dict(name="scully")) is scully)
+        self.assertTrue(pool.get_resource("puppy", dict(name="taco")) is not taco)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -8,11 +8,15 @@ test dependency resolving algorithm
 from __future__ import print_function
 
 from rez.vendor.version.requirement import Requirement
-from rez.solver import Solver, Cycle, SolverStatus
+from rez.vendor.version.version import VersionRange
+from rez.solver import Solver, Cycle, SolverStatus, SolverCallbackReturn
 from rez.config import config
+from rez.utils.trace import Trace
+import rez.solver
 import unittest
 from rez.tests.util import TestBase
 import itertools
+import json
 
 
 solver_verbosity = 1
@@ -248,6 +252,120 @@ class TestSolver(TestBase):
                      "test_variant_split_mid2-2.0[0]",
                      "test_variant_split_start-1.0[1]"])
 
+    def test_12_parallel_solve(self):
+        """Parallel solves give the same result as serial solves."""
+        def _test(*packages, **kwargs):
+            reqs = [Requirement(x) for x in packages]
+            s1 = Solver(reqs, self.packages_path, verbosity=solver_verbosity,
+                        **kwargs)
+            s2 = Solver(reqs, self.packages_path, verbosity=solver_verbosity,
+                        parallel_workers=2, **kwargs)
+
+            s1.solve()
+            s2.solve()
+            self.assertEqual(s2.status, s1.status)
+
+            if s1.status == SolverStatus.solved:
+                self.assertEqual([str(x) for x in s2.resolved_packages],
+                                 [str(x) for x in s1.resolved_packages])
+            else:
+                self.assertEqual(s2.failure_reason(), s1.failure_reason())
+
+            # failures in subtrees solved by workers are included
+            self.assertEqual(s2.num_solves, s1.num_solves)
+            self.assertEqual(s2.num_fails, s1.num_fails)
+
+            for i in range(s1.num_fails):
+                self.assertEqual(s2.failure_reason(i), s1.failure_reason(i))
+                self.assertEqual(s2.failure_description(i),
+                                 s1.failure_description(i))
+
+            return s2
+
+        _test("python", "pyodd")
+        _test("python", "bahish", "pybah")
+        _test("test_variant_split_start")
+        _test("pyvariants", "python", "nada")
+        _test("bahish", "pybah<5")
+        _test("pymum-1")
+
+        # failures occur in the subtrees solved by workers
+        s = _test("test_nogood_start")
+        self.assertEqual(s.status, SolverStatus.failed)
+        self.assertGreater(s.solve_stats["parallel"]["num_speculation_hits"], 0)
+
+        # a callback stops the solve at the same failure
+        def _callback(state):
+            if state.num_fails >= 3:
+                return SolverCallbackReturn.fail, "fail limit reached"
+            return SolverCallbackReturn.keep_going, ''
+
+        s = _test("test_nogood_start", callback=_callback)
+        self.assertEqual(s.num_fails, 3)
+
+    def test_13_nogood_learning(self):
+        """Phases that are bound to fail the same way as a previous failure are
+        failed without being solved."""
+        s = self._fail("test_nogood_start")
+        self.assertEqual(s.solve_stats["learning"]["num_nogoods"], 2)
+        self.assertGreater(s.solve_stats["learning"]["num_nogood_prunes"], 0)
+
+    def test_14_version_index(self):
+        """Intersections found via the family version index match a linear
+        containment test."""
+        s = Solver([], self.packages_path)
+        ranges = ["", "2.6", "2.6+<2.7", ">2.6.0", "<=2.6.8", "==2.5.2",
+                  "2.5|2.7", "3+", "<2.5|2.6.8..2.7.0", ">2.5.2<2.6.8"]
+
+        for range_str in ranges:
+            range_ = VersionRange(range_str)
+            slice_ = s._get_variant_slice("python", range_)
+            variant_list = s.package_cache.variant_lists["python"]
+
+            expected = sorted((x.version for x, _ in variant_list.entries
+                               if x.version in range_), reverse=True)
+            versions = [x.version for x in slice_.entries] if slice_ else []
+            self.assertEqual(versions, expected)
+
+        # the number of cached indexes is limited
+        max_indexes = rez.solver._max_family_version_indexes
+        rez.solver._max_family_version_indexes = 2
+
+        try:
+            for name in ("pyfoo", "pybah", "pydad"):
+                s._get_variant_slice(name, VersionRange())
+            self.assertEqual(list(rez.solver._family_version_indexes.keys()),
+                             [("pybah", tuple(s.package_paths)),
+                              ("pydad", tuple(s.package_paths))])
+        finally:
+            rez.solver._max_family_version_indexes = max_indexes
+
+    def test_15_solver_trace(self):
+        """Test recording of solver events to a trace."""
+        trace = Trace()
+        reqs = [Requirement("test_variant_split_start")]
+        s = Solver(reqs, self.packages_path, trace=trace)
+        s.solve()
+        self.assertEqual(s.status, SolverStatus.solved)
+
+        data = json.loads(json.dumps(trace.to_dict()))
+        events = data["traceEvents"]
+        categories = set(x["cat"] for x in events)
+        for category in ("solve", "split", "extract", "intersect", "reduce", "load"):
+            self.assertIn(category, categories)
+
+        for event in events:
+            self.assertEqual(event["ph"], 'X')
+            self.assertGreaterEqual(event["dur"], 0)
+            if event["cat"] != "repository":
+                self.assertIn("depth", event["args"])
+            if event["cat"] != "solve":
+                self.assertTrue(event["args"]["package"])
+
+        # phases are deeper after a split
+        self.assertGreater(max(x["args"]["depth"] for x in events
+                               if x["cat"] == "solve"), 0)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -6,7 +6,8 @@
 unit tests for 'utils.filesystem' module
 """
 import os
-from rez.tests.util import TestBase
+import shutil
+from rez.tests.util import TestBase, TempdirMixin
 from rez.utils import filesystem
 from rez.utils.platform_ import Platform, platform_
 
@@ -48,3 +49,44 @@ class TestCanonicalPath(TestBase):
         path = filesystem.canonical_path('/a/b/File.txt', platform)
         expects = '/a/b/file.txt'.replace('\\', os.sep)
         self.assertEqual(path, expects)
+
+
+class TestParallelCopytree(TestBase, TempdirMixin):
+    @classmethod
+    def setUpClass(cls):
+        TempdirMixin.setUpClass()
+        cls.settings = dict()
+
+    @classmethod
+    def tearDownClass(cls):
+        TempdirMixin.tearDownClass()
+
+    def test_unlistable_dir(self):
+        """Test that a dir that cannot be listed causes the copy to fail."""
+        src = os.path.join(self.root, "src")
+        os.makedirs(os.path.join(src, "sub"))
+
+        for filepath in ("a.txt", os.path.join("sub", "b.txt")):
+            with open(os.path.join(src, filepath), 'w') as f:
+                f.write("hello")
+
+        # os.walk lists dirs with scandir in py3, and listdir in py2
+        attr = "scandir" if hasattr(os, "scandir") else "listdir"
+        list_func = getattr(os, attr)
+        sub_path = os.path.join(src, "sub")
+
+        def _list(path='.'):
+            if path == sub_path:
+                raise OSError(13, "Permission denied", path)
+            return list_func(path)
+
+        setattr(os, attr, _list)
+        try:
+            for num_threads in (1, 4):
+                dst = os.path.join(self.root, "dst%d" % num_threads)
+                with self.assertRaises(shutil.Error):
+                    filesystem.parallel_copytree(
+                        src, dst, num_threads=num_threads,
+                        copy_function=shutil.copy2)
+        finally:
+            setattr(os, attr, list_func)
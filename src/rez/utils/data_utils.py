@@ -574,6 +574,10 @@ class LazyAttributeMeta(type):
     validation, OR, if the class has a `_validate_key` method, will call this
     method, passing the key, key value and key schema.
 
+    If the class has a `_data_for_key` method, the getters call this method,
+    passing the key, to get the dict to read the key from, rather than using
+    `_data`. This lets a class serve some keys from a cheaper data source.
+
     This metaclass creates the following attributes:
         - for each key in cls.schema, creates an attribute of the same name,
           unless that attribute already exists;
@@ -661,12 +665,17 @@ class LazyAttributeMeta(type):
     @classmethod
     def _make_getter(cls, key, attribute, optional, key_schema):
         def getter(self):
-            if key not in (self._data or {}):
+            if hasattr(self, "_data_for_key"):
+                data = self._data_for_key(key) or {}
+            else:
+                data = self._data or {}
+
+            if key not in data:
                 if optional:
                     return None
                 raise self.schema_error("Required key is missing: %r" % key)
 
-            attr = self._data[key]
+            attr = data[key]
             if hasattr(self, "_validate_key"):
                 return self._validate_key(key, attr, key_schema)
             else:
@@ -476,6 +476,84 @@ def copytree(src, dst, symlinks=False, ignore=None, hardlinks=False):
         raise shutil.Error(errors)
 
 
+def parallel_copytree(src, dst, num_threads=8, copy_function=None):
+    """Like `shutil.copytree`, but copies files concurrently.
+
+    This is much faster than a serial copy when copying many files from
+    high-latency storage. As with `shutil.copytree`, symlinks are followed, and
+    errors are raised together as a `shutil.Error` once every other file has
+    been copied.
+
+    Args:
+        src (str): Directory to copy.
+        dst (str): Destination directory, must not exist.
+        num_threads (int): Number of files to copy at once.
+        copy_function (callable): Called as `copy_function(src, dst)` to copy
+            each file. Defaults to `shutil.copy2`.
+    """
+    if num_threads < 2 and copy_function is None:
+        shutil.copytree(src, dst)
+        return
+
+    copy_function = copy_function or shutil.copy2
+
+    from multiprocessing.pool import ThreadPool
+
+    dirs = []
+    files = []
+    errors = []
+
+    # a dir that can't be listed would otherwise be silently skipped
+    def _onerror(e):
+        dstname = os.path.join(dst, os.path.relpath(e.filename, src))
+        errors.append((e.filename, dstname, str(e)))
+
+    for root, _, filenames in os.walk(src, onerror=_onerror, followlinks=True):
+        relpath = os.path.relpath(root, src)
+        if relpath == os.curdir:
+            dst_root = dst
+        else:
+            dst_root = os.path.join(dst, relpath)
+
+        os.makedirs(dst_root)
+        dirs.append((root, dst_root))
+
+        for name in filenames:
+            files.append((os.path.join(root, name), os.path.join(dst_root, name)))
+
+    def _copy(item):
+        srcname, dstname = item
+        try:
+            copy_function(srcname, dstname)
+        except (IOError, os.error) as why:
+            return (srcname, dstname, str(why))
+        return None
+
+    if num_threads < 2:
+        errors.extend(x for x in map(_copy, files) if x)
+
+    elif files:
+        pool = ThreadPool(min(num_threads, len(files)))
+        try:
+            errors.extend(
+                x for x in pool.imap_unordered(_copy, files, chunksize=1) if x)
+        finally:
+            pool.close()
+            pool.join()
+
+    # copy dir stats last, deepest first, since copying into a dir changes its
+    # mtime, and it may be made read-only
+    for src_dir, dst_dir in reversed(dirs):
+        try:
+            shutil.copystat(src_dir, dst_dir)
+        except OSError as why:
+            if platform.system() != "Windows":  # can't copy access times
+                errors.append((src_dir, dst_dir, str(why)))
+
+    if errors:
+        raise shutil.Error(errors)
+
+
 def movetree(src, dst):
     """Attempts a move, and falls back to a copy+delete if this fails
     """
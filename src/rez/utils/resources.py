@@ -37,9 +37,12 @@ from rez.utils.data_utils import cached_property, AttributeForwardMeta, \
     LazyAttributeMeta
 from rez.config import config
 from rez.exceptions import ResourceError
-from rez.backport.lru_cache import lru_cache
 from rez.utils.logging_ import print_debug
 from rez.vendor.six import six
+from collections import OrderedDict, deque
+import threading
+import weakref
+import sys
 
 
 class Resource(six.with_metaclass(LazyAttributeMeta, object)):
@@ -187,6 +190,50 @@ class ResourceHandle(object):
         return hash(self._hashable_repr())
 
 
+class _PoolEntry(object):
+    __slots__ = ("handle", "resource", "size", "tick", "loaded")
+
+    def __init__(self, handle, resource, tick):
+        self.handle = handle
+        self.resource = resource
+        self.tick = tick
+        self.loaded = _is_loaded(resource)
+        self.size = _resource_size(resource)
+
+
+class _SubPool(object):
+    """The cached resources of one resource type, in least recently used
+    order."""
+    def __init__(self, maxsize=None, max_memory=None):
+        self.entries = OrderedDict()  # handle -> _PoolEntry
+        self.memory = 0
+        self.maxsize = maxsize
+        self.max_memory = max_memory
+
+        # recently added entries whose data wasn't loaded yet, see
+        # `ResourcePool._update_sizes`
+        self.unsized = deque(maxlen=8)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def over_limit(self):
+        return ((self.maxsize is not None and len(self.entries) > self.maxsize)
+                or (self.max_memory is not None and self.memory > self.max_memory))
+
+    def get_stats(self):
+        return {
+            "entries": len(self.entries),
+            "memory": self.memory,
+            "maxsize": self.maxsize,
+            "max_memory": self.max_memory,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+
 class ResourcePool(object):
     """A resource pool.
 
@@ -194,11 +241,42 @@ class ResourcePool(object):
     resource cache. It will create any resource you ask for - typically
     resources are created via some factory class, which first checks for the
     existence of the resource before creating one from a pool.
+
+    Each resource type is cached in its own sub-pool, so that (for example)
+    many variants do not evict the package families that they belong to.
+    Least recently used resources are evicted when the pool, or a sub-pool,
+    reaches its entry or memory limit. Memory use is approximate - it is the
+    size of each resource's variables, plus that of its data once loaded.
+
+    Objects that keep their own references to pooled resources (such as
+    package repositories) should register with `add_eviction_listener`, so
+    that evicted resources can actually be freed.
     """
-    def __init__(self, cache_size=None):
+    def __init__(self, cache_size=None, max_memory=None, subpool_limits=None):
+        """Create a resource pool.
+
+        Args:
+            cache_size (int): Maximum number of cached resources. Zero disables
+                caching, None means no limit.
+            max_memory (int): Maximum approximate memory use of the cached
+                resources, in bytes. None means no limit.
+            subpool_limits (dict): Limits of resource types, keyed by resource
+                key. Each value is a dict that may contain "maxsize" (maximum
+                number of cached resources) and "max_memory" (in bytes).
+        """
         self.resource_classes = {}
-        cache = lru_cache(maxsize=cache_size)
-        self.cached_get_resource = cache(self._get_resource)
+        self.cache_size = cache_size
+        self.max_memory = max_memory
+        self.subpool_limits = subpool_limits or {}
+
+        self._subpools = {}
+        self._num_entries = 0
+        self._memory = 0
+        self._tick = 0
+        self._lock = threading.RLock()
+
+        self._listeners = []  # weak references
+        self._evicted = []  # handles evicted but not yet notified
 
     def register_resource(self, resource_class):
         resource_key = resource_class.key
@@ -218,11 +296,113 @@ class ResourcePool(object):
 
         self.resource_classes[resource_key] = resource_class
 
+    def add_eviction_listener(self, listener):
+        """Add an object to notify of evicted resources.
+
+        `listener.on_resource_evicted(resource_handle)` is called for each
+        resource evicted to keep the pool within its limits. It is not called
+        for resources removed by `clear_caches` or `discard_resources`.
+        Listeners are weakly referenced.
+
+        Args:
+            listener (object): Object to notify.
+        """
+        with self._lock:
+            self._listeners = [x for x in self._listeners if x() is not None]
+            self._listeners.append(weakref.ref(listener))
+
     def get_resource_from_handle(self, resource_handle):
-        return self.cached_get_resource(resource_handle)
+        if self.cache_size == 0:
+            return self._get_resource(resource_handle)
+
+        with self._lock:
+            subpool = self._get_subpool(resource_handle.key)
+            entry = subpool.entries.pop(resource_handle, None)
+
+            if entry is not None:
+                subpool.hits += 1
+                self._tick += 1
+                entry.tick = self._tick
+                subpool.entries[resource_handle] = entry
+
+                self._update_sizes(subpool, entry)
+            else:
+                subpool.misses += 1
+
+        if entry is not None:
+            self._notify_evicted()
+            return entry.resource
+
+        resource = self._get_resource(resource_handle)
+
+        with self._lock:
+            entry = subpool.entries.get(resource_handle)
+            if entry is not None:
+                # added by another thread in the meantime
+                return entry.resource
+
+            self._tick += 1
+            entry = _PoolEntry(resource_handle, resource, self._tick)
+
+            subpool.entries[resource_handle] = entry
+            subpool.memory += entry.size
+            self._num_entries += 1
+            self._memory += entry.size
+
+            self._update_sizes(subpool)
+            if not entry.loaded:
+                subpool.unsized.append(entry)
+            self._evict(subpool)
+
+        self._notify_evicted()
+        return resource
 
     def clear_caches(self):
-        self.cached_get_resource.cache_clear()
+        with self._lock:
+            for subpool in self._subpools.values():
+                subpool.entries.clear()
+                subpool.unsized.clear()
+                subpool.memory = 0
+
+            del self._evicted[:]
+            self._num_entries = 0
+            self._memory = 0
+
+    def discard_resources(self, func):
+        """Remove the cached resources whose handle satisfies `func(handle)`."""
+        with self._lock:
+            for subpool in self._subpools.values():
+                for handle in list(subpool.entries.keys()):
+                    if func(handle):
+                        self._remove(subpool, handle)
+
+    def get_stats(self):
+        """Get cache statistics.
+
+        Returns:
+            dict: Statistics of the whole pool, plus a "subpools" dict with the
+            statistics of each resource type. Statistics are "entries",
+            "memory" (approximate, in bytes), the "maxsize" and "max_memory"
+            limits (None if unlimited), "hits", "misses" and "evictions".
+        """
+        with self._lock:
+            subpools = dict(
+                (key, subpool.get_stats())
+                for key, subpool in self._subpools.items()
+            )
+
+        stats = {
+            "entries": sum(x["entries"] for x in subpools.values()),
+            "memory": sum(x["memory"] for x in subpools.values()),
+            "maxsize": self.cache_size,
+            "max_memory": self.max_memory,
+            "subpools": subpools
+        }
+
+        for name in ("hits", "misses", "evictions"):
+            stats[name] = sum(x[name] for x in subpools.values())
+
+        return stats
 
     def get_resource_class(self, resource_key):
         resource_class = self.resource_classes.get(resource_key)
@@ -235,6 +415,120 @@ class ResourcePool(object):
         resource_class = self.get_resource_class(resource_handle.key)
         return resource_class(resource_handle.variables)
 
+    def _get_subpool(self, resource_key):
+        subpool = self._subpools.get(resource_key)
+        if subpool is None:
+            limits = self.subpool_limits.get(resource_key) or {}
+            subpool = _SubPool(maxsize=limits.get("maxsize"),
+                               max_memory=limits.get("max_memory"))
+            self._subpools[resource_key] = subpool
+        return subpool
+
+    def _update_sizes(self, subpool, entry=None):
+        # Resource data is loaded lazily, typically just after the resource is
+        # retrieved from the pool. So, resize recently added entries whose
+        # data has since been loaded, as well as the entry being accessed
+        entries = [x for x in subpool.unsized if _is_loaded(x.resource)]
+        if entry is not None and not entry.loaded and _is_loaded(entry.resource) \
+                and entry not in entries:
+            entries.append(entry)
+
+        for entry_ in entries:
+            entry_.loaded = True
+            if entry_ in subpool.unsized:
+                subpool.unsized.remove(entry_)
+
+            if subpool.entries.get(entry_.handle) is not entry_:
+                continue  # already evicted
+
+            size = _resource_size(entry_.resource)
+            subpool.memory += size - entry_.size
+            self._memory += size - entry_.size
+            entry_.size = size
+
+        if entries:
+            self._evict(subpool)
+
+    def _evict(self, subpool):
+        while subpool.over_limit() and subpool.entries:
+            handle = next(iter(subpool.entries))
+            self._remove(subpool, handle)
+            self._evicted.append(handle)
+            subpool.evictions += 1
+
+        while self._over_limit():
+            # evict the least recently used entry across sub-pools
+            subpools = [x for x in self._subpools.values() if x.entries]
+            if not subpools:
+                break
+
+            subpool_ = min(subpools, key=lambda x: next(iter(x.entries.values())).tick)
+            handle = next(iter(subpool_.entries))
+            self._remove(subpool_, handle)
+            self._evicted.append(handle)
+            subpool_.evictions += 1
+
+    def _notify_evicted(self):
+        # listeners are called outside of the lock, as they may well access
+        # the pool themselves
+        with self._lock:
+            if not self._evicted:
+                return
+
+            handles = self._evicted
+            self._evicted = []
+            listeners = [x() for x in self._listeners]
+
+        for listener in listeners:
+            if listener is not None:
+                for handle in handles:
+                    listener.on_resource_evicted(handle)
+
+    def _over_limit(self):
+        return ((self.cache_size is not None and self._num_entries > self.cache_size)
+                or (self.max_memory is not None and self._memory > self.max_memory))
+
+    def _remove(self, subpool, handle):
+        entry = subpool.entries.pop(handle)
+        if entry in subpool.unsized:
+            subpool.unsized.remove(entry)
+
+        subpool.memory -= entry.size
+        self._num_entries -= 1
+        self._memory -= entry.size
+
+
+def _is_loaded(resource):
+    return ("_data" in resource.__dict__)
+
+
+def _resource_size(resource):
+    size = sys.getsizeof(resource) + _approx_size(resource.variables)
+    if _is_loaded(resource):
+        size += _approx_size(resource.__dict__["_data"])
+    return size
+
+
+def _approx_size(obj, depth=8):
+    size = sys.getsizeof(obj)
+    if depth == 0:
+        return size
+
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += _approx_size(key, depth - 1) + _approx_size(value, depth - 1)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for value in obj:
+            size += _approx_size(value, depth - 1)
+    elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+        # eg SourceCode. Only count the object's own plain values, objects it
+        # refers to may be shared
+        for value in obj.__dict__.values():
+            if isinstance(value, six.string_types):
+                size += sys.getsizeof(value)
+
+    return size
+
 
 class ResourceWrapper(six.with_metaclass(AttributeForwardMeta, object)):
     """An object that wraps a resource instance.
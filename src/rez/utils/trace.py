@@ -0,0 +1,97 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright Contributors to the Rez Project
+
+
+"""
+Recording of timed events, in Chrome trace format.
+
+The output can be viewed with chrome://tracing, https://ui.perfetto.dev or
+https://www.speedscope.app (which will also display it as a flamegraph).
+"""
+from contextlib import contextmanager
+import threading
+import json
+import time
+import os
+
+
+class _NullSpan(object):
+    """Context manager that does nothing, used when tracing is disabled."""
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+null_span = _NullSpan()
+
+
+class Trace(object):
+    """A list of timed events.
+
+    Events are recorded as Chrome trace 'complete' events - each has a start
+    time and a duration, and events nested within each other in time (on the
+    same thread) appear nested in the trace.
+
+    Example:
+
+        >>> trace = Trace()
+        >>> with trace.span("load foo", "load", package="foo"):
+        >>>     load_foo()
+        >>> trace.write("/tmp/trace.json")
+    """
+    def __init__(self):
+        self.events = []
+        self.start_time = time.time()
+        self.pid = os.getpid()
+
+    @contextmanager
+    def span(self, name, category, **args):
+        """Record the time spent within the context as an event.
+
+        Args:
+            name (str): Event name.
+            category (str): Event category, eg 'solve'.
+            args: Extra event data, such as the package name.
+        """
+        t = time.time()
+        try:
+            yield
+        finally:
+            self.add_event(name, category, t, time.time(), **args)
+
+    def add_event(self, name, category, start_time, end_time, **args):
+        """Record an event.
+
+        Args:
+            name (str): Event name.
+            category (str): Event category.
+            start_time (float): Epoch time the event started.
+            end_time (float): Epoch time the event ended.
+            args: Extra event data.
+        """
+        self.events.append({
+            "name": name,
+            "cat": category,
+            "ph": 'X',
+            "ts": self._microsecs(start_time),
+            "dur": (end_time - start_time) * 1e6,
+            "pid": self.pid,
+            "tid": threading.current_thread().ident,
+            "args": args
+        })
+
+    def to_dict(self):
+        return {
+            "traceEvents": self.events,
+            "displayTimeUnit": "ms"
+        }
+
+    def write(self, filepath):
+        """Write the trace to a json file."""
+        with open(filepath, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    def _microsecs(self, t):
+        return (t - self.start_time) * 1e6
@@ -0,0 +1,369 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright Contributors to the Rez Project
+
+
+"""
+Watching of files and directories for changes.
+
+On Linux, changes are detected with inotify. Elsewhere (or if inotify is not
+available), watched paths are polled for changes in their modification time.
+"""
+from rez.utils.logging_ import print_debug, print_warning
+from rez.config import config
+import threading
+import select
+import struct
+import errno
+import sys
+import os
+
+
+class PollingWatcher(object):
+    """Watches files and directories by periodically checking their mtime.
+
+    Note that this only detects changes to a directory's entries (files added,
+    removed or renamed), not changes to the contents of files within it. Watch
+    a file directly to detect changes to its contents.
+    """
+    def __init__(self, callback, poll_interval=5.0):
+        """Create a watcher.
+
+        Args:
+            callback (callable): Called as `callback(path, name)` when a
+                watched path changes. `name` is the name of the entry within a
+                watched directory that changed, or None if not known.
+            poll_interval (float): Seconds between checks.
+        """
+        self.callback = callback
+        self.poll_interval = poll_interval
+
+        self._mtimes = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def watch(self, path):
+        """Start watching a file or directory. This has no effect if the path
+        is already being watched."""
+        with self._lock:
+            if path not in self._mtimes:
+                self._mtimes[path] = _getmtime(path)
+
+    def unwatch(self, path):
+        """Stop watching a file or directory."""
+        with self._lock:
+            self._mtimes.pop(path, None)
+
+    @property
+    def paths(self):
+        """Get the watched paths."""
+        with self._lock:
+            return list(self._mtimes.keys())
+
+    @property
+    def running(self):
+        return (self._thread is not None)
+
+    def start(self):
+        """Start watching, in a background thread."""
+        if self._thread is not None:
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="rez-watcher")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching, and wait for the background thread to finish."""
+        if self._thread is None:
+            return
+
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def poll(self):
+        """Check watched paths for changes, and call the callback for each
+        changed path.
+
+        Returns:
+            int: Number of changed paths.
+        """
+        with self._lock:
+            items = list(self._mtimes.items())
+
+        changed = []
+        for path, mtime in items:
+            new_mtime = _getmtime(path)
+            if new_mtime != mtime:
+                changed.append(path)
+                with self._lock:
+                    if path in self._mtimes:
+                        self._mtimes[path] = new_mtime
+
+        for path in changed:
+            self._notify(path, None)
+        return len(changed)
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            self.poll()
+
+    def _notify(self, path, name):
+        if config.debug("file_loads"):
+            print_debug("Watched path changed: %s (%s)", path, name)
+
+        try:
+            self.callback(path, name)
+        except Exception as e:
+            print_warning("Error handling change to %s: %s", path, e)
+
+
+class InotifyWatcher(PollingWatcher):
+    """Watches files and directories using inotify (Linux only).
+
+    Files are watched via their parent directory, so that files that are
+    replaced (rather than modified in place) continue to be watched. Paths that
+    cannot be watched with inotify (for example, because the user's watch limit
+    has been reached) are polled instead.
+    """
+    IN_MODIFY = 0x2
+    IN_ATTRIB = 0x4
+    IN_CLOSE_WRITE = 0x8
+    IN_MOVED_FROM = 0x40
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_DELETE_SELF = 0x400
+    IN_MOVE_SELF = 0x800
+    IN_Q_OVERFLOW = 0x4000
+    IN_IGNORED = 0x8000
+    IN_NONBLOCK = 0x800
+    IN_CLOEXEC = 0x80000
+
+    watch_mask = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM
+                  | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+                  | IN_MOVE_SELF)
+
+    _event_header = struct.Struct("iIII")
+    _libc = None
+
+    def __init__(self, callback, poll_interval=5.0):
+        super(InotifyWatcher, self).__init__(callback, poll_interval=poll_interval)
+
+        libc = self._get_libc()
+        if libc is None:
+            raise OSError("inotify is not available")
+
+        self._fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError("inotify_init1 failed: %s"
+                          % os.strerror(_get_errno()))
+
+        # wd -> (dirpath, filenames). `filenames` is None if the whole
+        # directory is watched
+        self._watches = {}
+        self._wds = {}  # dirpath -> wd
+
+    @classmethod
+    def is_available(cls):
+        return (cls._get_libc() is not None)
+
+    def watch(self, path):
+        if os.path.isdir(path):
+            dirpath, filename = path, None
+        else:
+            dirpath, filename = os.path.split(path)
+
+        with self._lock:
+            wd = self._wds.get(dirpath)
+
+            if wd is None:
+                wd = self._get_libc().inotify_add_watch(
+                    self._fd, dirpath.encode(sys.getfilesystemencoding()),
+                    self.watch_mask)
+
+                if wd < 0:
+                    err = _get_errno()
+                    if err != errno.ENOENT:
+                        print_debug("Polling %s, could not watch with inotify: %s",
+                                    path, os.strerror(err))
+                    wd = None
+                else:
+                    self._wds[dirpath] = wd
+                    self._watches[wd] = (dirpath, set())
+
+            if wd is not None:
+                filenames = self._watches[wd][1]
+                if filename is None:
+                    self._watches[wd] = (dirpath, None)
+                elif filenames is not None:
+                    filenames.add(filename)
+                return
+
+        # fall back to polling
+        super(InotifyWatcher, self).watch(path)
+
+    def unwatch(self, path):
+        super(InotifyWatcher, self).unwatch(path)
+
+        if os.path.isdir(path):
+            dirpath, filename = path, None
+        else:
+            dirpath, filename = os.path.split(path)
+
+        with self._lock:
+            wd = self._wds.get(dirpath)
+            if wd is None:
+                return
+
+            filenames = self._watches[wd][1]
+            if filename is not None and filenames:
+                filenames.discard(filename)
+                if filenames:
+                    return
+
+            del self._wds[dirpath]
+            del self._watches[wd]
+            self._get_libc().inotify_rm_watch(self._fd, wd)
+
+    @property
+    def paths(self):
+        paths = super(InotifyWatcher, self).paths
+
+        with self._lock:
+            for dirpath, filenames in self._watches.values():
+                if filenames is None:
+                    paths.append(dirpath)
+                else:
+                    paths.extend(os.path.join(dirpath, x) for x in filenames)
+
+        return paths
+
+    def close(self):
+        """Stop watching, and release the inotify instance."""
+        self.stop()
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                readable, _, _ = select.select([self._fd], [], [], self.poll_interval)
+            except (OSError, select.error) as e:
+                if e.args[0] == errno.EINTR:
+                    continue
+                raise
+
+            if readable:
+                self._read_events()
+            self.poll()
+
+    def _read_events(self):
+        try:
+            buf = os.read(self._fd, 65536)
+        except OSError as e:
+            if e.errno in (errno.EAGAIN, errno.EINTR):
+                return
+            raise
+
+        changes = []
+        header_size = self._event_header.size
+        i = 0
+
+        while i < len(buf):
+            wd, mask, _, len_ = self._event_header.unpack_from(buf, i)
+            name = buf[i + header_size:i + header_size + len_].rstrip(b'\0')
+            i += header_size + len_
+
+            if mask & self.IN_Q_OVERFLOW:
+                # events were lost, so every watched path may have changed
+                with self._lock:
+                    changes.extend((x[0], None) for x in self._watches.values())
+                continue
+
+            with self._lock:
+                watch = self._watches.get(wd)
+                if watch is None:
+                    continue
+
+                if mask & self.IN_IGNORED:
+                    # watched directory was removed
+                    del self._watches[wd]
+                    self._wds.pop(watch[0], None)
+
+            dirpath, filenames = watch
+            name = name.decode(sys.getfilesystemencoding()) if name else None
+
+            if filenames is None:
+                changes.append((dirpath, name))
+            elif name in filenames:
+                changes.append((os.path.join(dirpath, name), None))
+            elif mask & (self.IN_DELETE_SELF | self.IN_MOVE_SELF | self.IN_IGNORED):
+                changes.extend((os.path.join(dirpath, x), None) for x in filenames)
+
+        seen = set()
+        for change in changes:
+            if change not in seen:
+                seen.add(change)
+                self._notify(*change)
+
+    @classmethod
+    def _get_libc(cls):
+        if cls._libc is None:
+            cls._libc = False
+
+            if sys.platform.startswith("linux"):
+                try:
+                    import ctypes
+                    import ctypes.util
+
+                    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6",
+                                       use_errno=True)
+                    if hasattr(libc, "inotify_init1"):
+                        cls._libc = libc
+                except (ImportError, OSError):
+                    pass
+
+        return cls._libc or None
+
+
+def create_watcher(callback, method="auto", poll_interval=5.0):
+    """Create a file watcher.
+
+    Args:
+        callback (callable): Called as `callback(path, name)` when a watched
+            path changes, from the watcher's thread. See `PollingWatcher`.
+        method (str): One of:
+            - "inotify": Use inotify;
+            - "poll": Poll paths for changes;
+            - "auto": Use inotify if available, otherwise poll.
+        poll_interval (float): Seconds between checks of polled paths.
+
+    Returns:
+        `PollingWatcher`: The watcher. Call `start` to start watching.
+    """
+    if method == "poll" or (method == "auto" and not InotifyWatcher.is_available()):
+        return PollingWatcher(callback, poll_interval=poll_interval)
+
+    try:
+        return InotifyWatcher(callback, poll_interval=poll_interval)
+    except OSError as e:
+        if method == "inotify":
+            raise
+        print_debug("inotify is not available, polling instead: %s", e)
+        return PollingWatcher(callback, poll_interval=poll_interval)
+
+
+def _get_errno():
+    import ctypes
+    return ctypes.get_errno()
+
+
+def _getmtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
@@ -5,15 +5,18 @@
 """
 Filesystem-based package repository
 """
+from collections import deque
 from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
 import os.path
 import os
 import stat
 import errno
 import time
 import shutil
+import pickle
 
-from rez.package_repository import PackageRepository
+from rez.package_repository import PackageRepository, package_repo_stats
 from rez.package_resources import PackageFamilyResource, VariantResourceHelper, \
     PackageResourceHelper, package_pod_schema, \
     package_release_keys, package_build_only_keys
@@ -31,8 +34,10 @@ from rez.utils.filesystem import make_path_writable, \
     canonical_path, is_subdirectory
 from rez.utils.platform_ import platform_
 from rez.utils.yaml import load_yaml
+from rez.utils.watcher import create_watcher
 from rez.config import config
 from rez.backport.lru_cache import lru_cache
+from rez.vendor.atomicwrites import atomic_write
 from rez.vendor.schema.schema import Schema, Optional, And, Use, Or
 from rez.vendor.six import six
 from rez.vendor.version.version import Version, VersionRange
@@ -84,6 +89,194 @@ class PackageDefinitionFileMissing(PackageMetadataError):
     pass
 
 
+class RepositoryIndex(object):
+    """An index of the package families and packages in a repository.
+
+    The index is a single binary file under the repository root, created and
+    updated by `rez-index` (see `FileSystemPackageRepository.update_index`).
+    It lets the repository skip the directory listings and file stats that are
+    otherwise needed to find packages, and it stores the solver-relevant data
+    of each package (see `package_keys`).
+
+    Each family entry records the mtime of the family directory at the time it
+    was indexed. The repository touches this directory whenever a package is
+    added, removed or ignored, so an entry whose mtime no longer matches is
+    stale, and the filesystem is used instead. Likewise, the family list is
+    only used while the repository root's mtime is unchanged.
+
+    Note that package definition files edited in place are not detected -
+    run `rez-index` again if you do this.
+    """
+    dirname = ".rez_index"
+    filename = "index"
+    format_version = 2
+
+    # package data stored in the index
+    package_keys = ("version", "requires", "build_requires",
+                    "private_build_requires", "variants", "timestamp")
+
+    def __init__(self, location, data=None):
+        self.location = location
+        self.data = data or {
+            "format_version": self.format_version,
+            "mtime": None,
+            "families": {}
+        }
+        self._family_valid = {}
+        self._root_valid = None
+
+    @classmethod
+    def get_filepath(cls, location):
+        return os.path.join(location, cls.dirname, cls.filename)
+
+    @classmethod
+    def load(cls, location):
+        """Load the index of a repository.
+
+        Returns:
+            `RepositoryIndex`: The index, or None if there isn't one, or it
+            could not be read.
+        """
+        filepath = cls.get_filepath(location)
+
+        try:
+            with open(filepath, "rb") as f:
+                data = pickle.load(f)
+        except IOError as e:
+            if e.errno != errno.ENOENT:
+                print_warning("Could not read repository index %s: %s", filepath, e)
+            return None
+        except Exception as e:
+            print_warning("Could not read repository index %s: %s", filepath, e)
+            return None
+
+        if data.get("format_version") != cls.format_version:
+            return None
+
+        return cls(location, data)
+
+    def save(self):
+        path = os.path.join(self.location, self.dirname)
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+        filepath = self.get_filepath(self.location)
+        with atomic_write(filepath, mode="wb", overwrite=True) as f:
+            pickle.dump(self.data, f, protocol=2)
+
+    @property
+    def families(self):
+        """Get the indexed families.
+
+        Returns:
+            dict: Family name -> family entry, or None if the repository root
+            has changed since the family list was indexed.
+        """
+        if self._root_valid is None:
+            self._root_valid = (self.data["mtime"] == _getmtime(self.location))
+
+        return self.data["families"] if self._root_valid else None
+
+    def invalidate(self, name=None):
+        """Check the given family entry (or the family list, if `name` is
+        None) against the filesystem again, next time it is used."""
+        if name is None:
+            self._root_valid = None
+        else:
+            self._family_valid.pop(name, None)
+
+    def get_family(self, name):
+        """Get the index entry of a versioned package family.
+
+        Returns:
+            dict: Family entry, with a "packages" dict mapping version strings
+            to package entries. None if the family is not indexed, or the entry
+            is stale.
+        """
+        entry = self.data["families"].get(name)
+        if entry is None or entry["packages"] is None:
+            return None
+
+        valid = self._family_valid.get(name)
+        if valid is None:
+            path = os.path.join(self.location, name)
+            valid = (entry["mtime"] == _getmtime(path))
+            self._family_valid[name] = valid
+
+        return entry if valid else None
+
+    def get_package(self, name, version_str):
+        """Get the index entry of a package.
+
+        Returns:
+            dict: Package entry with keys "filename", "mtime" (of the package
+            definition file) and "data" (see `package_keys`, may be None), or
+            None if the package is not indexed or its entry is stale.
+        """
+        entry = self.get_family(name)
+        if entry is None:
+            return None
+        return entry["packages"].get(version_str)
+
+    def set_families(self, mtime, family_dirs):
+        """Set the family list, as returned by `_get_family_dirs`.
+
+        Entries of families that still exist are kept.
+        """
+        families = self.data["families"]
+        self.data["families"] = dict(
+            (name, families.get(name) or {"ext": ext, "mtime": None, "packages": None})
+            for name, ext in family_dirs
+        )
+        self.data["mtime"] = mtime
+
+    def set_family(self, name, entry):
+        self.data["families"][name] = entry
+        self._family_valid.pop(name, None)
+
+
+def _scandir(path):
+    """List a directory.
+
+    `os.scandir` is used where available, which avoids a stat per entry on
+    most filesystems.
+
+    Returns:
+        List of (str, bool) tuples: Entry names, and whether each entry is a
+        directory (or a symlink to one).
+    """
+    if not hasattr(os, "scandir"):  # py2
+        return [(name, os.path.isdir(os.path.join(path, name)))
+                for name in os.listdir(path)]
+
+    entries = []
+    for entry in os.scandir(path):
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        entries.append((entry.name, is_dir))
+    return entries
+
+
+def _getmtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _is_pod(value):
+    if isinstance(value, (list, tuple)):
+        return all(_is_pod(x) for x in value)
+    elif isinstance(value, dict):
+        return all(isinstance(k, basestring) and _is_pod(v)
+                   for k, v in value.items())
+    else:
+        return (value is None or isinstance(value, (basestring, bool, float)
+                                            + six.integer_types))
+
+
 # ------------------------------------------------------------------------------
 # resources
 # ------------------------------------------------------------------------------
@@ -108,8 +301,12 @@ class FileSystemPackageFamilyResource(PackageFamilyResource):
             return 0
 
     def iter_packages(self):
+        # indexed families are always versioned, and only contain valid
+        # package directories
+        indexed = (self._repository.get_indexed_family(self.name) is not None)
+
         # check for unversioned package
-        if config.allow_unversioned_packages:
+        if config.allow_unversioned_packages and not indexed:
             filepath, _ = self._repository._get_file(self.path)
             if filepath:
                 package = self._repository.get_resource(
@@ -121,7 +318,7 @@ class FileSystemPackageFamilyResource(PackageFamilyResource):
 
         # versioned packages
         for version_str in self._repository._get_version_dirs(self.path):
-            if _settings.check_package_definition_files:
+            if _settings.check_package_definition_files and not indexed:
                 path = os.path.join(self.path, version_str)
                 if not self._repository._get_file(path)[0]:
                     continue
@@ -154,10 +351,29 @@ class FileSystemPackageResource(PackageResourceHelper):
 
     @cached_property
     def state_handle(self):
+        entry = self._index_entry
+        if entry:
+            return entry["mtime"]
+
         if self.filepath:
             return os.path.getmtime(self.filepath)
         return None
 
+    @cached_property
+    def indexed_data(self):
+        """Get the solver-relevant package data stored in the repository index.
+
+        Returns:
+            dict: Package data (see `RepositoryIndex.package_keys`), or None if
+            the package is not indexed.
+        """
+        entry = self._index_entry
+        return entry["data"] if entry else None
+
+    @property
+    def _light_data(self):
+        return self.indexed_data
+
     @property
     def base(self):
         # Note: '_redirected_base' is a special attribute set by the build
@@ -186,18 +402,35 @@ class FileSystemPackageResource(PackageResourceHelper):
 
     @cached_property
     def _filepath_and_format(self):
+        entry = self._index_entry
+        if entry:
+            filepath = os.path.join(self.path, entry["filename"])
+            ext = os.path.splitext(filepath)[-1][1:]
+            return filepath, FileFormat[ext]
+
         return self._repository._get_file(self.path)
 
+    @cached_property
+    def _index_entry(self):
+        version_str = self.get("version")
+        if not version_str:
+            return None
+        return self._repository.get_indexed_package(self.name, version_str)
+
     def _load(self):
         if self.filepath is None:
             raise PackageDefinitionFileMissing(
                 "Missing package definition file: %r" % self)
 
-        data = load_from_file(
-            self.filepath,
-            self.file_format,
-            disable_memcache=self._repository.disable_memcache
-        )
+        self._repository._watch(self.filepath)
+
+        with package_repo_stats.package_loading(self.name, filepath=self.filepath):
+            data = load_from_file(
+                self.filepath,
+                self.file_format,
+                disable_memcache=self._repository.disable_memcache,
+                use_package_file_cache=True
+            )
 
         check_format_version(self.filepath, data)
 
@@ -335,11 +568,12 @@ class FileSystemCombinedPackageFamilyResource(PackageFamilyResource):
 
     def _load(self):
         format_ = FileFormat[self.ext]
-        data = load_from_file(
-            self.filepath,
-            format_,
-            disable_memcache=self._repository.disable_memcache
-        )
+        with package_repo_stats.package_loading(self.name, filepath=self.filepath):
+            data = load_from_file(
+                self.filepath,
+                format_,
+                disable_memcache=self._repository.disable_memcache
+            )
 
         check_format_version(self.filepath, data)
         return data
@@ -468,9 +702,19 @@ class FileSystemPackageRepository(PackageRepository):
     schema_dict = {"file_lock_timeout": int,
                    "file_lock_dir": Or(None, str),
                    "file_lock_type": Or("default", "link", "mkdir"),
-                   "package_filenames": [basestring]}
+                   "package_filenames": [basestring],
+                   "use_index": bool,
+                   "scan_workers": int,
+                   "cache_family_names": bool,
+                   "watch_for_changes": bool,
+                   "watch_method": Or("auto", "inotify", "poll"),
+                   "watch_poll_interval": Or(int, float)}
 
     building_prefix = ".building"
+
+    # minimum number of paths that are stat'd concurrently, see
+    # `get_last_release_times`
+    parallel_stat_threshold = 4
     ignore_prefix = ".ignore"
 
     package_file_mode = (
@@ -486,13 +730,23 @@ class FileSystemPackageRepository(PackageRepository):
         return "filesystem"
 
     def __init__(self, location, resource_pool, disable_memcache=None,
-                 disable_pkg_ignore=False):
+                 disable_pkg_ignore=False, disable_index=None, disable_watch=None,
+                 disable_cache=False):
         """Create a filesystem package repository.
 
         Args:
             location (str): Path containing the package repository.
             disable_memcache (bool): Don't use memcache memcache if True
             disable_pkg_ignore (bool): If True, .ignore* files have no effect
+            disable_index (bool): Don't use the repository index if True (see
+                `RepositoryIndex`). If None, the 'use_index' setting is used.
+                The index is always disabled if `disable_pkg_ignore` is True.
+            disable_watch (bool): Don't watch the repository for changes if
+                True (see `start_watching`). If None, the 'watch_for_changes'
+                setting is used.
+            disable_cache (bool): Don't cache families, packages or package
+                files if True, and iterate in deterministic order. See
+                `uncached_copy`.
         """
 
         # ensure that differing case doesn't get interpreted as different repos
@@ -518,6 +772,23 @@ class FileSystemPackageRepository(PackageRepository):
         global _settings
         _settings = config.plugins.package_repository.filesystem
 
+        # number of threads used to scan family directories, see
+        # `prefetch_packages`
+        self.scan_workers = local_settings.get("scan_workers", _settings.scan_workers)
+
+        if disable_index is None:
+            disable_index = not _settings.use_index
+        self.disable_index = (disable_index or disable_pkg_ignore)
+        self._index = None
+        self._watcher = None
+
+        # (root dir stat, family names), see `_get_family_names`
+        self._family_names = None
+        self._uncached_repo = None
+
+        # handles evicted from the pool, see `on_resource_evicted`
+        self._evicted_handles = deque()
+
         self.register_resource(FileSystemPackageFamilyResource)
         self.register_resource(FileSystemPackageResource)
         self.register_resource(FileSystemVariantResource)
@@ -526,11 +797,14 @@ class FileSystemPackageRepository(PackageRepository):
         self.register_resource(FileSystemCombinedPackageResource)
         self.register_resource(FileSystemCombinedVariantResource)
 
-        self.get_families = lru_cache(maxsize=None)(self._get_families)
-        self.get_family = lru_cache(maxsize=None)(self._get_family)
-        self.get_packages = lru_cache(maxsize=None)(self._get_packages)
-        self.get_variants = lru_cache(maxsize=None)(self._get_variants)
-        self.get_file = lru_cache(maxsize=None)(self._get_file)
+        self.disable_cache = disable_cache
+        cache_size = 0 if disable_cache else None
+
+        self.get_families = lru_cache(maxsize=cache_size)(self._get_families)
+        self.get_family = lru_cache(maxsize=cache_size)(self._get_family)
+        self.get_packages = lru_cache(maxsize=cache_size)(self._get_packages)
+        self.get_variants = lru_cache(maxsize=cache_size)(self._get_variants)
+        self.get_file = lru_cache(maxsize=cache_size)(self._get_file)
 
         # decorate with memcachemed memoizers unless told otherwise
         if not self.disable_memcache:
@@ -550,6 +824,11 @@ class FileSystemPackageRepository(PackageRepository):
             )
             self._get_version_dirs = decorator2(self._get_version_dirs)
 
+        if disable_watch is None:
+            disable_watch = not _settings.watch_for_changes
+        if not disable_watch:
+            self.start_watching()
+
     def _uid(self):
         t = ["filesystem", self.location]
         if os.path.exists(self.location):
@@ -558,20 +837,101 @@ class FileSystemPackageRepository(PackageRepository):
         return tuple(t)
 
     def get_package_family(self, name):
-        return self.get_family(name)
+        family = self.get_family(name)
+        self._discard_evicted()
+        return family
 
     @pool_memcached_connections
     def iter_package_families(self):
-        for family in self.get_families():
+        if self.disable_cache:
+            for name, ext in sorted(self._list_family_dirs()):
+                yield self._get_family_resource(name, ext)
+            return
+
+        families = self.get_families()
+        self._discard_evicted()
+
+        for family in families:
             yield family
 
     @pool_memcached_connections
     def iter_packages(self, package_family_resource):
-        for package in self.get_packages(package_family_resource):
+        if self.disable_cache:
+            packages = package_family_resource.iter_packages()
+            for package in sorted(packages, key=lambda x: x.version):
+                yield package
+            return
+
+        package_family_resource = self._get_pooled(package_family_resource)
+        packages = self.get_packages(package_family_resource)
+        self._discard_evicted()
+
+        for package in packages:
             yield package
 
+    def uncached_copy(self):
+        """Get a copy of this repository that does not cache resources.
+
+        Families and packages of the copy are not cached (including by the
+        resource pool), and are iterated over in name and version order
+        respectively. The repository index and memcached directory listings
+        are still used.
+        """
+        if self.disable_cache:
+            return self
+
+        if self._uncached_repo is None:
+            self._uncached_repo = self.__class__(
+                self.location,
+                ResourcePool(cache_size=0),
+                disable_memcache=self.disable_memcache,
+                disable_pkg_ignore=self.disable_pkg_ignore,
+                disable_index=self.disable_index,
+                disable_watch=True,
+                disable_cache=True
+            )
+
+        return self._uncached_repo
+
+    def prefetch_packages(self, family_names=None):
+        """Scan family directories concurrently, using `scan_workers` threads.
+
+        This makes a subsequent iteration over the packages of these families
+        much faster on high-latency filesystems. Errors are ignored here - they
+        are raised as usual when the packages are iterated.
+        """
+        if self.scan_workers < 2:
+            return
+
+        families = self.get_families()
+        if family_names is not None:
+            family_names = set(family_names)
+            families = [x for x in families if x.name in family_names]
+
+        if len(families) < 2:
+            return
+
+        def _prefetch(family):
+            try:
+                self.get_packages(self._get_pooled(family))
+            except Exception:
+                pass
+
+        pool = ThreadPool(min(self.scan_workers, len(families)))
+        try:
+            pool.map(_prefetch, families, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
+        self._discard_evicted()
+
     def iter_variants(self, package_resource):
-        for variant in self.get_variants(package_resource):
+        package_resource = self._get_pooled(package_resource)
+        variants = self.get_variants(package_resource)
+        self._discard_evicted()
+
+        for variant in variants:
             yield variant
 
     def get_parent_package_family(self, package_resource):
@@ -587,6 +947,58 @@ class FileSystemPackageRepository(PackageRepository):
     def get_last_release_time(self, package_family_resource):
         return package_family_resource.get_last_release_time()
 
+    def get_last_release_times(self, family_names):
+        """See `PackageRepository.get_last_release_times`.
+
+        The release time of a family is the mtime of its directory (or package
+        file, for combined families). If `cache_family_names` is enabled,
+        families not in this repository are skipped without touching the
+        filesystem (see `_get_family_names`). Families are stat'd concurrently,
+        using up to `scan_workers` threads.
+        """
+        if _settings.cache_family_names:
+            families = self._get_family_names()
+            names = [x for x in family_names if x in families]
+        else:
+            families = None
+            names = list(family_names)
+
+        def _get_path(name):
+            if families is not None:
+                ext = families[name]
+                if ext is None:
+                    return os.path.join(self.location, name)
+                return os.path.join(self.location, "%s.%s" % (name, ext))
+
+            path = os.path.join(self.location, name)
+            if os.path.isdir(path):
+                return path
+
+            filepath, _ = self.get_file(self.location, package_filename=name)
+            return filepath
+
+        def _get_mtime(name):
+            path = _get_path(name)
+            if path is None:
+                return name, None
+
+            try:
+                return name, os.path.getmtime(path)
+            except OSError:
+                return name, 0
+
+        if self.scan_workers < 2 or len(names) < self.parallel_stat_threshold:
+            results = map(_get_mtime, names)
+        else:
+            pool = ThreadPool(min(self.scan_workers, len(names)))
+            try:
+                results = pool.map(_get_mtime, names)
+            finally:
+                pool.close()
+                pool.join()
+
+        return dict((name, t) for name, t in results if t is not None)
+
     def get_package_from_uri(self, uri):
         """
         Example URIs:
@@ -733,6 +1145,7 @@ class FileSystemPackageRepository(PackageRepository):
         # unignore (just so the .ignore{ver} file is removed)
         self.unignore_package(pkg_name, pkg_version)
 
+        self._on_changed(pkg_name)
         return True
 
     def remove_package_family(self, pkg_name, force=False):
@@ -773,10 +1186,13 @@ class FileSystemPackageRepository(PackageRepository):
             if verbose:
                 print_info(msg, *nargs)
 
-        for fam in self._get_families():
-            fam_path = os.path.join(self.location, fam.name)
+        for fam_name, ext in self._list_family_dirs():
+            if ext is not None:
+                continue  # combined-style package
+
+            fam_path = os.path.join(self.location, fam_name)
             if not os.path.isdir(fam_path):
-                continue  # might be a combined-style package
+                continue
 
             for name in os.listdir(fam_path):
                 if not name.startswith(self.ignore_prefix):
@@ -796,12 +1212,12 @@ class FileSystemPackageRepository(PackageRepository):
 
                 # remove the package
                 if dry_run:
-                    _info("Would remove %s-%s from %s", fam.name, ver_str, self)
+                    _info("Would remove %s-%s from %s", fam_name, ver_str, self)
                     num_removed += 1
 
-                elif self.remove_package(fam.name, Version(ver_str)):
+                elif self.remove_package(fam_name, Version(ver_str)):
                     num_removed += 1
-                    _info("Removed %s-%s from %s", fam.name, ver_str, self)
+                    _info("Removed %s-%s from %s", fam_name, ver_str, self)
 
         return num_removed
 
@@ -959,6 +1375,7 @@ class FileSystemPackageRepository(PackageRepository):
         """
         Make a copy of the repo that does not share resources with this one.
         """
+        kwargs.setdefault("disable_watch", True)
         pool = ResourcePool(cache_size=None)
         repo_copy = self.__class__(self.location, pool, **kwargs)
         return repo_copy
@@ -1013,9 +1430,195 @@ class FileSystemPackageRepository(PackageRepository):
             self._get_family_dirs.forget()
             self._get_version_dirs.forget()
 
+        self._index = None
+        self._family_names = None
+        self._uncached_repo = None
+
         # unfortunately we need to clear file cache across the board
         clear_file_caches()
 
+    def on_resource_evicted(self, resource_handle):
+        if resource_handle.variables.get("location") == self.location:
+            self._evicted_handles.append(resource_handle)
+
+    @property
+    def index(self):
+        """Get the repository index.
+
+        Returns:
+            `RepositoryIndex`: The index, or None if the repository has no
+            index, or it is disabled.
+        """
+        if self.disable_index:
+            return None
+
+        if self._index is None:
+            self._index = RepositoryIndex.load(self.location) or False
+        return self._index or None
+
+    def get_indexed_family(self, name):
+        """Get the index entry of a family, if it is indexed and up to date.
+
+        Returns:
+            dict: See `RepositoryIndex.get_family`.
+        """
+        index = self.index
+        return index.get_family(name) if index else None
+
+    def get_indexed_package(self, name, version_str):
+        """Get the index entry of a package, if it is indexed and up to date.
+
+        Returns:
+            dict: See `RepositoryIndex.get_package`.
+        """
+        index = self.index
+        return index.get_package(name, version_str) if index else None
+
+    def update_index(self, family_names=None):
+        """Create or update the repository index.
+
+        The index is updated from the filesystem, so it is fine to run this on
+        a live repository. Families that change while the index is being
+        updated are just seen as stale when the index is read.
+
+        Args:
+            family_names (list of str): Only update the index entries of these
+                families, plus the family list. If None, every family is
+                indexed, and an existing index is replaced.
+
+        Returns:
+            `RepositoryIndex`: The updated index.
+        """
+        repo_copy = self._copy(disable_memcache=True, disable_index=True)
+        index = None
+
+        if family_names is not None:
+            index = RepositoryIndex.load(self.location)
+        if index is None:
+            index = RepositoryIndex(self.location)
+            family_names = None
+
+        # create the index dir first, as this changes the root's mtime
+        path = os.path.join(self.location, RepositoryIndex.dirname)
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+        # stat before listing, so that a concurrent change to the repository
+        # makes the index stale, rather than wrong
+        mtime = _getmtime(self.location)
+        family_dirs = repo_copy._get_family_dirs()
+        index.set_families(mtime, family_dirs)
+
+        if family_names is not None:
+            family_names = set(family_names)
+
+        for name, ext in family_dirs:
+            if ext is None and (family_names is None or name in family_names):
+                prev_entry = index.data["families"][name]
+                entry = repo_copy._create_index_family_entry(name, prev_entry)
+                index.set_family(name, entry)
+
+        index.save()
+        self._index = None
+        return index
+
+    def remove_index(self):
+        """Delete the repository index.
+
+        Returns:
+            bool: True if an index was deleted.
+        """
+        path = os.path.join(self.location, RepositoryIndex.dirname)
+        if not os.path.exists(path):
+            return False
+
+        shutil.rmtree(path)
+        self._index = None
+        return True
+
+    def start_watching(self):
+        """Watch the repository for changes, and invalidate cached data of the
+        families that change.
+
+        This is for long-running processes, which would otherwise have to call
+        `clear_caches` (losing all cached data) to see changes to the
+        repository. Only what has been read is watched - the family list, the
+        directories of families whose packages have been listed, and the
+        package definition files that have been loaded. Changes are detected
+        with inotify where available (see the 'watch_method' setting).
+
+        Note that there is a short delay before a change is seen, and a longer
+        one (up to 'watch_poll_interval' seconds) when polling.
+        """
+        if self._watcher is not None:
+            return
+
+        self.clear_caches()
+
+        self._watcher = create_watcher(
+            self._on_watched_path_changed,
+            method=_settings.watch_method,
+            poll_interval=_settings.watch_poll_interval
+        )
+
+        self._watcher.watch(self.location)
+        self._watcher.start()
+
+    def stop_watching(self):
+        """Stop watching the repository for changes."""
+        watcher = self._watcher
+        if watcher is None:
+            return
+
+        self._watcher = None
+        if hasattr(watcher, "close"):
+            watcher.close()
+        else:
+            watcher.stop()
+
+    def invalidate_family(self, name):
+        """Clear cached data of a package family.
+
+        Unlike `clear_caches`, data of other families is kept.
+
+        Args:
+            name (str): Name of the package family.
+        """
+        family_path = os.path.join(self.location, name)
+
+        def _is_family_path(path, package_filename=None):
+            if path == self.location:
+                return (package_filename == name)
+            return (path == family_path or path.startswith(family_path + os.sep))
+
+        def _is_family_handle(handle):
+            variables = handle.variables
+            return (variables.get("location") == self.location
+                    and variables.get("name") == name)
+
+        self.get_family.cache_discard(lambda name_: name_ == name)
+        self.get_packages.cache_discard(lambda family: family.name == name)
+        self.get_variants.cache_discard(lambda package: package.name == name)
+        self.get_file.cache_discard(_is_family_path)
+        self.pool.discard_resources(_is_family_handle)
+        self._uncached_repo = None
+
+        if self._index:
+            self._index.invalidate(name)
+
+    def invalidate_families(self):
+        """Clear the cached list of package families.
+
+        Cached data of the families themselves is kept.
+        """
+        self.get_families.cache_clear()
+        self.get_family.cache_clear()
+        self._family_names = None
+        self._uncached_repo = None
+
+        if self._index:
+            self._index.invalidate()
+
     def get_package_payload_path(self, package_name, package_version=None):
         path = os.path.join(self.location, package_name)
 
@@ -1026,6 +1629,44 @@ class FileSystemPackageRepository(PackageRepository):
 
     # -- internal
 
+    def _get_pooled(self, resource):
+        # The getter caches must only hold resources that are in the pool, see
+        # `_discard_evicted`. The given resource may have been evicted since
+        # the caller got it.
+        if self.pool.cache_size == 0:
+            return resource
+        return self.get_resource_from_handle(resource.handle, verify_repo=False)
+
+    def _discard_evicted(self):
+        # Discard getter cache entries that refer to resources evicted from the
+        # pool, as they would otherwise be kept alive (and returned again, in
+        # place of the pool's newer copies). This is done after each getter
+        # call rather than on eviction, so that resources evicted while the
+        # getter was running are discarded too.
+        #
+        while self._evicted_handles:
+            try:
+                handle = self._evicted_handles.popleft()
+            except IndexError:
+                break
+
+            resource_cls = self.pool.get_resource_class(handle.key)
+            name = handle.variables.get("name")
+            version = handle.variables.get("version")
+
+            def _is_package(package):
+                return (package.name == name and package.get("version") == version)
+
+            if issubclass(resource_cls, PackageFamilyResource):
+                self.get_families.cache_clear()
+                self.get_family.cache_discard(lambda name_: name_ == name)
+                self.get_packages.cache_discard(lambda family: family.name == name)
+            elif issubclass(resource_cls, PackageResourceHelper):
+                self.get_packages.cache_discard(lambda family: family.name == name)
+                self.get_variants.cache_discard(_is_package)
+            elif issubclass(resource_cls, VariantResourceHelper):
+                self.get_variants.cache_discard(_is_package)
+
     def _get_family_dirs__key(self):
         if os.path.isdir(self.location):
             st = os.stat(self.location)
@@ -1034,17 +1675,21 @@ class FileSystemPackageRepository(PackageRepository):
             return str(("listdir", self.location))
 
     def _get_family_dirs(self):
+        index = self.index
+        if index is not None:
+            families = index.families
+            if families is not None:
+                return [(name, entry["ext"]) for name, entry in families.items()]
+
         dirs = []
         if not os.path.isdir(self.location):
             return dirs
 
-        for name in os.listdir(self.location):
-            path = os.path.join(self.location, name)
-
+        for name, is_dir in _scandir(self.location):
             if name in ("settings.yaml", self.file_lock_dir):
                 continue  # skip reserved file/dirnames
 
-            if os.path.isdir(path):
+            if is_dir:
                 if is_valid_package_name(name):
                     dirs.append((name, None))
             else:
@@ -1054,31 +1699,79 @@ class FileSystemPackageRepository(PackageRepository):
 
         return dirs
 
+    def _get_family_names(self):
+        """Get the names of all package families in the repository.
+
+        The names are cached for as long as the repository root directory is
+        unchanged, so that lookups of families that are not in this repository
+        cost a single stat of the root, rather than several stats of missing
+        files. Note that the listing itself is also memcached, see
+        `_get_family_dirs`.
+
+        Returns:
+            dict: Family name -> extension of its package file for combined
+            families, or None for family directories.
+        """
+        family_names = self._family_names
+
+        if family_names is None or family_names[0] != self._get_root_key():
+            self._list_family_dirs()
+            family_names = self._family_names
+
+        return family_names[1] if family_names else {}
+
+    def _get_root_key(self):
+        try:
+            st = os.stat(self.location)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime)
+
+    def _list_family_dirs(self):
+        # list families, and update the cached family names
+        key = self._get_root_key()
+        dirs = self._get_family_dirs()
+
+        if key is None:
+            self._family_names = None
+        else:
+            self._family_names = (key, dict(dirs))
+
+        return dirs
+
     def _get_version_dirs__key(self, root):
         st = os.stat(root)
         return str(("listdir", root, int(st.st_ino), st.st_mtime))
 
     def _get_version_dirs(self, root):
+        parent, name = os.path.split(root)
+        if parent == self.location:
+            entry = self.get_indexed_family(name)
+            if entry is not None:
+                return list(entry["packages"].keys())
+
+        entries = _scandir(root)
+        names = set(x[0] for x in entries)
+
         # Ignore a version if there is a .ignore<version> file next to it
         def ignore_dir(name):
             if self.disable_pkg_ignore:
                 return False
             else:
-                path = os.path.join(root, self.ignore_prefix + name)
-                return os.path.isfile(path)
+                return (self.ignore_prefix + name) in names
 
         # simpler case if this test is on
         #
         if _settings.check_package_definition_files:
             dirs = []
 
-            for name in os.listdir(root):
+            for name, is_dir in entries:
                 if name.startswith('.'):
                     continue
 
                 path = os.path.join(root, name)
 
-                if os.path.isdir(path) and not ignore_dir(name) \
+                if is_dir and not ignore_dir(name) \
                         and self._is_valid_package_directory(path):
                     dirs.append(name)
 
@@ -1092,7 +1785,7 @@ class FileSystemPackageRepository(PackageRepository):
         building_dirs = set()
 
         # find dirs and dirs marked as 'building'
-        for name in os.listdir(root):
+        for name, is_dir in entries:
             if name.startswith('.'):
                 if not name.startswith(self.building_prefix):
                     continue
@@ -1100,9 +1793,7 @@ class FileSystemPackageRepository(PackageRepository):
                 ver_str = name[len(self.building_prefix):]
                 building_dirs.add(ver_str)
 
-            path = os.path.join(root, name)
-
-            if os.path.isdir(path) and not ignore_dir(name):
+            if is_dir and not ignore_dir(name):
                 dirs.add(name)
 
         # check 'building' dirs for validity
@@ -1122,25 +1813,49 @@ class FileSystemPackageRepository(PackageRepository):
         return bool(self._get_file(path, "package")[0])
 
     def _get_families(self):
-        families = []
-        for name, ext in self._get_family_dirs():
-            if ext is None:  # is a directory
-                family = self.get_resource(
+        return [self._get_family_resource(name, ext)
+                for name, ext in self._list_family_dirs()]
+
+    def _get_family_resource(self, name, ext):
+        if ext is None:  # is a directory
+            return self.get_resource(
+                FileSystemPackageFamilyResource.key,
+                location=self.location,
+                name=name)
+        else:
+            return self.get_resource(
+                FileSystemCombinedPackageFamilyResource.key,
+                location=self.location,
+                name=name,
+                ext=ext)
+
+    def _get_family(self, name):
+        is_valid_package_name(name, raise_error=True)
+
+        index = self.index
+        families = index.families if index else None
+
+        if families is not None:
+            entry = families.get(name)
+            if entry is None:
+                return None
+            elif entry["ext"] is None:
+                return self.get_resource(
                     FileSystemPackageFamilyResource.key,
                     location=self.location,
-                    name=name)
+                    name=name
+                )
             else:
-                family = self.get_resource(
+                return self.get_resource(
                     FileSystemCombinedPackageFamilyResource.key,
                     location=self.location,
                     name=name,
-                    ext=ext)
-            families.append(family)
+                    ext=entry["ext"]
+                )
 
-        return families
+        if _settings.cache_family_names and name not in self._get_family_names():
+            return None
 
-    def _get_family(self, name):
-        is_valid_package_name(name, raise_error=True)
         if os.path.isdir(os.path.join(self.location, name)):
             # force case-sensitive match on pkg family dir, on case-insensitive platforms
             if not platform_.has_case_sensitive_filesystem and \
@@ -1170,6 +1885,11 @@ class FileSystemPackageRepository(PackageRepository):
         return None
 
     def _get_packages(self, package_family_resource):
+        if package_family_resource.get("ext"):
+            self._watch(package_family_resource.filepath)
+        else:
+            self._watch(os.path.join(self.location, package_family_resource.name))
+
         return [x for x in package_family_resource.iter_packages()]
 
     def _get_variants(self, package_resource):
@@ -1189,6 +1909,59 @@ class FileSystemPackageRepository(PackageRepository):
                     return filepath, format_
         return None, None
 
+    def _create_index_family_entry(self, name, prev_entry=None):
+        path = os.path.join(self.location, name)
+        entry = {"ext": None, "mtime": _getmtime(path), "packages": None}
+
+        # unversioned packages are not indexed
+        if config.allow_unversioned_packages and self._get_file(path)[0]:
+            return entry
+
+        family = self.get_package_family(name)
+        if family is None:
+            return entry
+
+        prev_packages = (prev_entry or {}).get("packages") or {}
+        packages = {}
+
+        for package in self.iter_packages(family):
+            version_str = package.get("version")
+            filepath = package.filepath
+            if filepath is None:
+                continue
+
+            filename = os.path.basename(filepath)
+            mtime = _getmtime(filepath)
+
+            # reuse the data of packages that haven't changed
+            prev = prev_packages.get(version_str)
+            if prev and prev["filename"] == filename and prev["mtime"] == mtime:
+                packages[version_str] = prev
+                continue
+
+            try:
+                data = dict(
+                    (k, v) for k, v in package._data.items()
+                    if k in RepositoryIndex.package_keys
+                )
+
+                # data is used in place of the package definition, so it is
+                # only stored if complete
+                if not _is_pod(data):
+                    data = None
+            except (PackageMetadataError, ResourceError) as e:
+                print_warning("Package %s not indexed: %s", filepath, e)
+                data = None
+
+            packages[version_str] = {
+                "filename": filename,
+                "mtime": mtime,
+                "data": data
+            }
+
+        entry["packages"] = packages
+        return entry
+
     def _create_family(self, name):
         path = os.path.join(self.location, name)
         if not os.path.exists(path):
@@ -1486,6 +2259,31 @@ class FileSystemPackageRepository(PackageRepository):
 
         return new_variant
 
+    def _watch(self, path):
+        watcher = self._watcher
+        if watcher is not None:
+            watcher.watch(path)
+
+    def _on_watched_path_changed(self, path, name):
+        if path == self.location:
+            if name is None:
+                self.invalidate_families()
+                return
+
+            name_, ext = os.path.splitext(name)
+            if ext in (".py", ".yaml"):
+                # combined package family file
+                name = name_
+
+            if is_valid_package_name(name):
+                self.invalidate_families()
+                self.invalidate_family(name)
+            return
+
+        relpath = os.path.relpath(path, self.location)
+        name = os.path.splitext(relpath.split(os.sep)[0])[0]
+        self.invalidate_family(name)
+
     def _on_changed(self, pkg_name):
         """Called when a package is added/removed/changed.
         """
@@ -1501,6 +2299,16 @@ class FileSystemPackageRepository(PackageRepository):
         # clear internal caches, otherwise change may not be visible
         self.clear_caches()
 
+        # keep the index current. Note that failing to do so is not an error,
+        # the family entry is just stale
+        if not self.disable_index and \
+                os.path.exists(RepositoryIndex.get_filepath(self.location)):
+            try:
+                self.update_index([pkg_name])
+            except Exception as e:
+                print_warning("Could not update repository index for %s: %s",
+                              pkg_name, e)
+
     def _delete_stale_build_tagfiles(self, family_path):
         now = time.time()
 
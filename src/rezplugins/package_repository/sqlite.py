@@ -0,0 +1,895 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright Contributors to the Rez Project
+
+
+"""
+SQLite-based package repository
+"""
+from contextlib import contextmanager
+import threading
+import sqlite3
+import shutil
+import json
+import time
+import os.path
+import os
+
+from rez.package_repository import PackageRepository, package_repo_stats
+from rez.package_resources import PackageFamilyResource, VariantResourceHelper, \
+    PackageResourceHelper, package_pod_schema, package_release_keys, \
+    package_build_only_keys
+from rez.serialise import FileFormat, load_py
+from rez.package_serialise import dump_package_data
+from rez.exceptions import PackageMetadataError, PackageRepositoryError, \
+    ResourceError, RezSystemError
+from rez.utils.resources import ResourcePool, cached_property
+from rez.utils.formatting import is_valid_package_name
+from rez.utils.filesystem import canonical_path
+from rez.utils.logging_ import print_info
+from rez.utils.platform_ import platform_
+from rez.config import config
+from rez.backport.lru_cache import lru_cache
+from rez.vendor.six import six
+from rez.vendor.six.six.moves import StringIO
+from rez.vendor.version.requirement import VersionedObject
+from rez.vendor.version.version import Version
+
+
+basestring = six.string_types[0]
+
+debug_print = config.debug_printer("resources")
+
+
+# ------------------------------------------------------------------------------
+# resource classes
+# ------------------------------------------------------------------------------
+
+class SqlitePackageFamilyResource(PackageFamilyResource):
+    key = "sqlite.family"
+    repository_type = "sqlite"
+
+    def _uri(self):
+        return "%s:%s" % (self._repository.filepath, self.name)
+
+    def get_last_release_time(self):
+        return self._repository._get_last_release_time(self.name)
+
+    def iter_packages(self):
+        for version_str in self._repository.get_package_rows(self.name).keys():
+            package = self._repository.get_resource(
+                SqlitePackageResource.key,
+                location=self.location,
+                name=self.name,
+                version=version_str)
+            yield package
+
+
+class SqlitePackageResource(PackageResourceHelper):
+    key = "sqlite.package"
+    variant_key = "sqlite.variant"
+    repository_type = "sqlite"
+    schema = package_pod_schema
+
+    def _uri(self):
+        obj = VersionedObject.construct(self.name, self.version)
+        return "%s:%s" % (self._repository.filepath, str(obj))
+
+    @cached_property
+    def parent(self):
+        family = self._repository.get_resource(
+            SqlitePackageFamilyResource.key,
+            location=self.location,
+            name=self.name)
+        return family
+
+    @property
+    def base(self):
+        # see `FileSystemPackageResource.base`
+        redirected_base = self._data.get("_redirected_base")
+        return redirected_base or self.path
+
+    @cached_property
+    def path(self):
+        return self._repository.get_package_payload_path(
+            self.name, self.get("version"))
+
+    @cached_property
+    def state_handle(self):
+        row = self._row
+        return row["mtime"] if row else None
+
+    @property
+    def _light_data(self):
+        row = self._row
+        return row["solver_data"] if row else None
+
+    @property
+    def _row(self):
+        rows = self._repository.get_package_rows(self.name)
+        return rows.get(self.get("version", ""))
+
+    def _load(self):
+        definition = self._repository._get_definition(
+            self.name, self.get("version", ""))
+
+        if definition is None:
+            raise PackageMetadataError("Missing package definition: %r" % self)
+
+        with package_repo_stats.package_loading(self.name, uri=self.uri):
+            data = load_py(StringIO(definition), filepath=self.uri)
+
+        data.pop("format_version", None)
+        return data
+
+
+class SqliteVariantResource(VariantResourceHelper):
+    key = "sqlite.variant"
+    repository_type = "sqlite"
+
+    @cached_property
+    def parent(self):
+        package = self._repository.get_resource(
+            SqlitePackageResource.key,
+            location=self.location,
+            name=self.name,
+            version=self.get("version"))
+        return package
+
+
+# ------------------------------------------------------------------------------
+# repository
+# ------------------------------------------------------------------------------
+
+class SqlitePackageRepository(PackageRepository):
+    """A package repository stored in an SQLite database.
+
+    Package definitions are stored in a single database file in the repository
+    location, as package.py source. The solver-relevant data of each package
+    (see `PackageResourceHelper.light_keys`) is stored separately, so resolves
+    do not need to load package definitions. Package payloads are stored on
+    disk, in the same layout as the 'filesystem' repository type:
+
+        /LOCATION/packages.db
+                 /pkgA/1.0.0/...
+                 /pkgA/1.0.1/...
+
+    SQLite locking makes it safe for many processes to install packages at
+    once, however this is unreliable over NFS, so the database should be on
+    local disk.
+
+    To use this repository type, add an entry such as 'sqlite@/svr/packages' to
+    your packages path.
+    """
+    schema_dict = {"database_filename": basestring,
+                   "lock_timeout": int,
+                   "journal_mode": basestring}
+
+    # database schema version, stored in 'PRAGMA user_version'
+    schema_version = 1
+
+    @classmethod
+    def name(cls):
+        return "sqlite"
+
+    def __init__(self, location, resource_pool, disable_pkg_ignore=False,
+                 disable_cache=False):
+        """Create an SQLite package repository.
+
+        Args:
+            location (str): Path containing the package repository.
+            disable_pkg_ignore (bool): If True, ignored packages are visible.
+            disable_cache (bool): Don't cache families or packages if True, and
+                iterate in deterministic order. See `uncached_copy`.
+        """
+        location = canonical_path(location, platform_)
+        super(SqlitePackageRepository, self).__init__(location, resource_pool)
+
+        global _settings
+        _settings = config.plugins.package_repository.sqlite
+
+        self.disable_pkg_ignore = disable_pkg_ignore
+        self.disable_cache = disable_cache
+        self._local = threading.local()
+        self._uncached_repo = None
+
+        self.register_resource(SqlitePackageFamilyResource)
+        self.register_resource(SqlitePackageResource)
+        self.register_resource(SqliteVariantResource)
+
+        # when uncached, only the rows of the family being iterated over are
+        # kept, since each package looks up its own row
+        self.get_families = lru_cache(maxsize=(0 if disable_cache else None))(
+            self._get_families)
+        self.get_package_rows = lru_cache(maxsize=(1 if disable_cache else None))(
+            self._get_package_rows)
+
+    @property
+    def filepath(self):
+        """Path of the database file."""
+        return os.path.join(self.location, _settings.database_filename)
+
+    def _uid(self):
+        t = ["sqlite", self.location]
+        if os.path.exists(self.location):
+            st = os.stat(self.location)
+            t.append(int(st.st_ino))
+        return tuple(t)
+
+    def get_package_family(self, name):
+        is_valid_package_name(name, raise_error=True)
+        if not self._family_exists(name):
+            return None
+
+        return self.get_resource(
+            SqlitePackageFamilyResource.key,
+            location=self.location,
+            name=name)
+
+    def iter_package_families(self):
+        for name in self.get_families():
+            yield self.get_package_family(name)
+
+    def iter_packages(self, package_family_resource):
+        packages = package_family_resource.iter_packages()
+        if self.disable_cache:
+            packages = sorted(packages, key=lambda x: x.version)
+
+        for package in packages:
+            yield package
+
+    def uncached_copy(self):
+        """Get a copy of this repository that does not cache resources.
+
+        Families and packages of the copy are iterated over in name and version
+        order respectively.
+        """
+        if self.disable_cache:
+            return self
+
+        if self._uncached_repo is None:
+            self._uncached_repo = self.__class__(
+                self.location,
+                ResourcePool(cache_size=0),
+                disable_pkg_ignore=self.disable_pkg_ignore,
+                disable_cache=True
+            )
+
+        return self._uncached_repo
+
+    def iter_variants(self, package_resource):
+        for variant in package_resource.iter_variants():
+            yield variant
+
+    def get_package(self, name, version):
+        # look up the version directly, rather than iterating over the family
+        if not self._family_exists(name):
+            return None
+
+        version_str = str(version)
+        if version_str not in self.get_package_rows(name):
+            return None
+
+        return self.get_resource(
+            SqlitePackageResource.key,
+            location=self.location,
+            name=name,
+            version=version_str)
+
+    def get_parent_package_family(self, package_resource):
+        return package_resource.parent
+
+    def get_parent_package(self, variant_resource):
+        return variant_resource.parent
+
+    def get_variant_state_handle(self, variant_resource):
+        package_resource = variant_resource.parent
+        return package_resource.state_handle
+
+    def get_last_release_time(self, package_family_resource):
+        return package_family_resource.get_last_release_time()
+
+    def get_last_release_times(self, family_names):
+        conn = self.connection
+        if conn is None:
+            return {}
+
+        family_names = list(family_names)
+        times = {}
+
+        # stay under sqlite's default limit on query parameters
+        for i in range(0, len(family_names), 500):
+            names = family_names[i:i + 500]
+            query = "SELECT name, last_release_time FROM families WHERE name IN (%s)" \
+                % ", ".join('?' * len(names))
+
+            for name, time_ in conn.execute(query, names):
+                times[name] = time_
+
+        return times
+
+    def get_package_from_uri(self, uri):
+        """
+        Example URIs:
+        - /svr/packages/packages.db:mypkg-1.0.0
+        - /svr/packages/packages.db:mypkg  # (unversioned package - rare)
+        """
+        prefix = self.filepath + ':'
+        if not uri.startswith(prefix):
+            return None
+
+        obj = VersionedObject(uri[len(prefix):])
+        return self.get_package(obj.name, obj.version)
+
+    def get_variant_from_uri(self, uri):
+        """
+        Example URIs:
+        - /svr/packages/packages.db:mypkg-1.0.0[1]
+        - /svr/packages/packages.db:mypkg-1.0.0[]  # ("null" variant)
+        """
+        i = uri.rfind('[')
+        if i == -1:
+            return None
+
+        pkg = self.get_package_from_uri(uri[:i])
+        if pkg is None:
+            return None
+
+        variant_index_str = uri[i + 1:-1]
+        variant_index = int(variant_index_str) if variant_index_str else None
+
+        for variant in pkg.iter_variants():
+            if variant.index == variant_index:
+                return variant
+
+        return None
+
+    def get_package_payload_path(self, package_name, package_version=None):
+        path = os.path.join(self.location, package_name)
+
+        if package_version:
+            path = os.path.join(path, str(package_version))
+
+        return path
+
+    def ignore_package(self, pkg_name, pkg_version, allow_missing=False):
+        version_str = str(pkg_version)
+
+        with self._transaction() as conn:
+            if not allow_missing and not self._package_exists(conn, pkg_name, version_str):
+                return -1
+
+            row = conn.execute(
+                "SELECT 1 FROM ignored WHERE family = ? AND version = ?",
+                (pkg_name, version_str)).fetchone()
+
+            if row:
+                return 0
+
+            conn.execute(
+                "INSERT INTO ignored (family, version, time) VALUES (?, ?, ?)",
+                (pkg_name, version_str, time.time()))
+
+            self._on_changed(conn, pkg_name)
+
+        self.clear_family_caches(pkg_name)
+        return 1
+
+    def unignore_package(self, pkg_name, pkg_version):
+        version_str = str(pkg_version)
+
+        with self._transaction() as conn:
+            cur = conn.execute(
+                "DELETE FROM ignored WHERE family = ? AND version = ?",
+                (pkg_name, version_str))
+
+            unignored = (cur.rowcount > 0)
+            exists = self._package_exists(conn, pkg_name, version_str)
+
+            if unignored:
+                self._on_changed(conn, pkg_name)
+
+        if unignored:
+            self.clear_family_caches(pkg_name)
+
+        if not exists:
+            return -1
+        return 1 if unignored else 0
+
+    def remove_package(self, pkg_name, pkg_version):
+        version_str = str(pkg_version)
+
+        with self._transaction() as conn:
+            cur = conn.execute(
+                "DELETE FROM packages WHERE family = ? AND version = ?",
+                (pkg_name, version_str))
+
+            if not cur.rowcount:
+                return False
+
+            conn.execute(
+                "DELETE FROM ignored WHERE family = ? AND version = ?",
+                (pkg_name, version_str))
+
+            self._on_changed(conn, pkg_name)
+
+        self.clear_family_caches(pkg_name)
+
+        # delete the payload. The package is already gone, so a partially
+        # deleted payload is never visible
+        path = self.get_package_payload_path(pkg_name, pkg_version)
+        if os.path.exists(path):
+            shutil.rmtree(path)
+
+        return True
+
+    def remove_package_family(self, pkg_name, force=False):
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM families WHERE name = ?", (pkg_name,)).fetchone()
+
+            if row is None:
+                return False
+
+            if not force:
+                row = conn.execute(
+                    "SELECT 1 FROM packages WHERE family = ? LIMIT 1",
+                    (pkg_name,)).fetchone()
+
+                if row is not None:
+                    raise PackageRepositoryError(
+                        "Cannot remove non-empty package family %r" % pkg_name
+                    )
+
+            for table, column in (("packages", "family"),
+                                  ("ignored", "family"),
+                                  ("families", "name")):
+                conn.execute("DELETE FROM %s WHERE %s = ?" % (table, column),
+                             (pkg_name,))
+
+        self.clear_family_caches(pkg_name)
+
+        path = self.get_package_payload_path(pkg_name)
+        if os.path.exists(path):
+            shutil.rmtree(path)
+
+        return True
+
+    def remove_ignored_since(self, days, dry_run=False, verbose=False):
+        conn = self.connection
+        if conn is None:
+            return 0
+
+        cutoff = time.time() - (days * 3600 * 24)
+        rows = conn.execute(
+            "SELECT family, version FROM ignored WHERE time <= ?",
+            (cutoff,)).fetchall()
+
+        num_removed = 0
+
+        def _info(msg, *nargs):
+            if verbose:
+                print_info(msg, *nargs)
+
+        for name, version_str in rows:
+            if dry_run:
+                _info("Would remove %s-%s from %s", name, version_str, self)
+                num_removed += 1
+
+            elif self.remove_package(name, Version(version_str)):
+                num_removed += 1
+                _info("Removed %s-%s from %s", name, version_str, self)
+
+        return num_removed
+
+    def install_variant(self, variant_resource, dry_run=False, overrides=None):
+        overrides = (overrides or {}).copy()
+
+        # Name and version overrides are a special case - they change the
+        # destination variant to be created/replaced.
+        #
+        variant_name = overrides.pop("name", None) or variant_resource.name
+        variant_version = overrides.pop("version", None) or variant_resource.version
+
+        if variant_name is self.remove:
+            raise PackageRepositoryError("Cannot remove package attribute 'name'")
+        if variant_version is self.remove:
+            raise PackageRepositoryError("Cannot remove package attribute 'version'")
+
+        if isinstance(variant_version, basestring):
+            variant_version = Version(variant_version)
+
+        # cannot install over one's self, just return existing variant
+        if variant_resource._repository is self and \
+                variant_name == variant_resource.name and \
+                variant_version == variant_resource.version:
+            return variant_resource
+
+        if dry_run:
+            return self._create_variant(variant_resource, variant_name,
+                                        variant_version, overrides, conn=None)
+
+        # the transaction locks the database, so that concurrent installs of
+        # variants into the same package do not lose each other's variants
+        with self._transaction(create=True) as conn:
+            variant_index = self._create_variant(variant_resource, variant_name,
+                                                 variant_version, overrides, conn=conn)
+
+        self.clear_family_caches(variant_name)
+
+        # load the new variant, from a copy of this repo with package ignore
+        # disabled, so that variants can be installed into a hidden package
+        repo_copy = self._copy(disable_pkg_ignore=True)
+        pkg = repo_copy.get_package(variant_name, variant_version)
+
+        if pkg is not None:
+            for variant in repo_copy.iter_variants(pkg):
+                if variant.index == variant_index:
+                    variant._repository = self
+                    return variant
+
+        raise RezSystemError("Internal failure - expected installed variant")
+
+    def clear_caches(self):
+        super(SqlitePackageRepository, self).clear_caches()
+        self.get_families.cache_clear()
+        self.get_package_rows.cache_clear()
+        self._uncached_repo = None
+
+    def clear_family_caches(self, name):
+        """Clear cached data of a package family.
+
+        Args:
+            name (str): Name of the package family.
+        """
+        def _is_family_handle(handle):
+            variables = handle.variables
+            return (variables.get("location") == self.location
+                    and variables.get("name") == name)
+
+        self.get_families.cache_clear()
+        self.get_package_rows.cache_discard(lambda name_: name_ == name)
+        self.pool.discard_resources(_is_family_handle)
+
+        if self._uncached_repo is not None:
+            self._uncached_repo.clear_family_caches(name)
+
+    @property
+    def connection(self):
+        """Get the database connection of the current thread.
+
+        Returns:
+            `sqlite3.Connection`: The connection, or None if the database does
+            not exist.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if not os.path.exists(self.filepath):
+                return None
+
+            conn = self._connect()
+            self._local.conn = conn
+
+        return conn
+
+    # -- internal
+
+    def _copy(self, **kwargs):
+        """
+        Make a copy of the repo that does not share resources with this one.
+        """
+        pool = ResourcePool(cache_size=None)
+        return self.__class__(self.location, pool, **kwargs)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.filepath, timeout=_settings.lock_timeout,
+                               isolation_level=None)
+
+        conn.execute("PRAGMA journal_mode=%s" % _settings.journal_mode)
+
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == self.schema_version:
+            return conn
+        elif version > self.schema_version:
+            raise PackageRepositoryError(
+                "Package repository %s was created by a newer version of rez "
+                "(schema version %d)" % (self.filepath, version))
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS families ("
+                "name TEXT PRIMARY KEY, last_release_time REAL NOT NULL)")
+
+            # 'solver_data' is json-encoded `light_keys` data, or NULL if the
+            # package's data for these keys is not plain data
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS packages ("
+                "family TEXT NOT NULL, version TEXT NOT NULL, "
+                "definition TEXT NOT NULL, solver_data TEXT, mtime REAL NOT NULL, "
+                "PRIMARY KEY (family, version))")
+
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ignored ("
+                "family TEXT NOT NULL, version TEXT NOT NULL, time REAL NOT NULL, "
+                "PRIMARY KEY (family, version))")
+
+            conn.execute("PRAGMA user_version = %d" % self.schema_version)
+        except:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+        return conn
+
+    @contextmanager
+    def _transaction(self, create=False):
+        conn = self.connection
+
+        if conn is None:
+            if not create:
+                raise PackageRepositoryError(
+                    "Package repository %s does not exist" % self.filepath)
+
+            try:
+                os.makedirs(self.location)
+            except OSError:
+                if not os.path.isdir(self.location):
+                    raise
+
+            conn = self._connect()
+            self._local.conn = conn
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    def _get_families(self):
+        conn = self.connection
+        if conn is None:
+            return []
+
+        rows = conn.execute("SELECT name FROM families ORDER BY name").fetchall()
+        return [x[0] for x in rows]
+
+    def _family_exists(self, name):
+        if not self.disable_cache:
+            return (name in self.get_families())
+
+        conn = self.connection
+        if conn is None:
+            return False
+
+        row = conn.execute(
+            "SELECT 1 FROM families WHERE name = ?", (name,)).fetchone()
+        return (row is not None)
+
+    def _get_package_rows(self, name):
+        # Get the visible packages of a family, as a dict of version string ->
+        # {"solver_data", "mtime"}
+        conn = self.connection
+        if conn is None:
+            return {}
+
+        query = "SELECT p.version, p.solver_data, p.mtime FROM packages p " \
+                "WHERE p.family = ?"
+
+        if not self.disable_pkg_ignore:
+            query += " AND NOT EXISTS (SELECT 1 FROM ignored i " \
+                     "WHERE i.family = p.family AND i.version = p.version)"
+
+        rows = {}
+        for version_str, solver_data, mtime in conn.execute(query, (name,)):
+            rows[version_str] = {
+                "solver_data": json.loads(solver_data) if solver_data else None,
+                "mtime": mtime
+            }
+
+        return rows
+
+    def _get_definition(self, name, version_str):
+        conn = self.connection
+        if conn is None:
+            return None
+
+        row = conn.execute(
+            "SELECT definition FROM packages WHERE family = ? AND version = ?",
+            (name, version_str)).fetchone()
+
+        return row[0] if row else None
+
+    def _get_last_release_time(self, name):
+        conn = self.connection
+        if conn is None:
+            return 0
+
+        row = conn.execute(
+            "SELECT last_release_time FROM families WHERE name = ?",
+            (name,)).fetchone()
+
+        return row[0] if row else 0
+
+    def _package_exists(self, conn, name, version_str):
+        row = conn.execute(
+            "SELECT 1 FROM packages WHERE family = ? AND version = ?",
+            (name, version_str)).fetchone()
+        return (row is not None)
+
+    def _on_changed(self, conn, name):
+        # Called within a transaction, when a package is added/removed/changed
+        conn.execute(
+            "INSERT OR REPLACE INTO families (name, last_release_time) "
+            "VALUES (?, ?)", (name, time.time()))
+
+    def _create_variant(self, variant, variant_name, variant_version, overrides,
+                        conn=None):
+        # This follows `FileSystemPackageRepository._create_variant`. Returns
+        # the installed variant's index, or in dry-run mode (`conn` is None),
+        # the existing equivalent variant, if any.
+        #
+        repo_copy = self._copy(disable_pkg_ignore=True)
+        existing_package = repo_copy.get_package(variant_name, variant_version)
+
+        if existing_package:
+            uuids = set([variant.uuid, existing_package.uuid])
+            if len(uuids) > 1 and None not in uuids:
+                raise ResourceError(
+                    "Cannot install variant %r into package %r - the "
+                    "packages are not the same (UUID mismatch)"
+                    % (variant, existing_package))
+
+            if variant.index is None:
+                if existing_package.variants:
+                    raise ResourceError(
+                        "Attempting to install a package without variants "
+                        "(%r) into an existing package with variants (%r)"
+                        % (variant, existing_package))
+            elif not existing_package.variants:
+                raise ResourceError(
+                    "Attempting to install a variant (%r) into an existing "
+                    "package without variants (%r)" % (variant, existing_package))
+
+        # Need to treat 'config' as special case. In validated data, this is
+        # converted to a Config object. We need it as the raw dict that you'd
+        # see in a package.py.
+        #
+        def _get_package_data(pkg):
+            data = pkg.validated_data()
+            if hasattr(pkg, "_data"):
+                raw_data = pkg._data
+            else:
+                raw_data = pkg.resource._data
+
+            raw_config_data = raw_data.get('config')
+            data.pop("config", None)
+
+            if raw_config_data:
+                data["config"] = raw_config_data
+
+            for key in package_build_only_keys:
+                data.pop(key, None)
+            return data
+
+        new_package_data = _get_package_data(variant.parent)
+        new_package_data.pop("variants", None)
+        new_package_data["name"] = variant_name
+        if variant_version:
+            new_package_data["version"] = variant_version
+
+        package_changed = False
+        release_data = {}
+        existing_package_data = None
+
+        if existing_package:
+            existing_package_data = _get_package_data(existing_package)
+
+            # detect case where new variant introduces package changes outside
+            # of variant
+            data_1 = existing_package_data.copy()
+            data_2 = new_package_data.copy()
+
+            for key in package_release_keys:
+                data_2.pop(key, None)
+                value = data_1.pop(key, None)
+                if value is not None:
+                    release_data[key] = value
+
+            for key in ("format_version", "base", "variants"):
+                data_1.pop(key, None)
+                data_2.pop(key, None)
+
+            package_changed = (data_1 != data_2)
+
+        # check for existing installed variant
+        existing_installed_variant = None
+        installed_variant_index = None
+
+        if existing_package:
+            if variant.index is None:
+                existing_installed_variant = \
+                    next(repo_copy.iter_variants(existing_package))
+            else:
+                for variant_ in repo_copy.iter_variants(existing_package):
+                    if existing_package.variants[variant_.index] == variant.variant_requires:
+                        installed_variant_index = variant_.index
+                        existing_installed_variant = variant_
+
+        if conn is None:
+            if existing_installed_variant and not package_changed:
+                existing_installed_variant._repository = self
+                return existing_installed_variant
+            return None
+
+        # construct package data for new package definition
+        if existing_package and not package_changed:
+            package_data = existing_package_data
+        else:
+            package_data = new_package_data
+            if existing_package and variant.index is not None:
+                package_data["variants"] = existing_package_data.get("variants", [])
+
+        package_data.update(release_data)
+
+        # merge the new variant into the package
+        if installed_variant_index is None and variant.index is not None:
+            if not package_data.get("variants"):
+                package_data["variants"] = []
+            package_data["variants"].append(variant.variant_requires)
+            installed_variant_index = len(package_data["variants"]) - 1
+
+        package_data.pop("base", None)
+
+        # Apply overrides. Existing attributes of an existing package take
+        # precedence, see `FileSystemPackageRepository._create_variant`
+        #
+        for key, value in overrides.items():
+            if existing_package:
+                if key not in package_data:
+                    package_data[key] = value
+            elif value is self.remove:
+                package_data.pop(key, None)
+            else:
+                package_data[key] = value
+
+        if not package_data.get("timestamp"):
+            package_data["timestamp"] = int(time.time())
+
+        if not package_data.get("version") and not config.allow_unversioned_packages:
+            raise PackageMetadataError("Unversioned package is not allowed "
+                                       "in current configuration.")
+
+        buf = StringIO()
+        dump_package_data(package_data, buf=buf, format_=FileFormat.py)
+        definition = buf.getvalue()
+
+        # store solver-relevant data as it would be loaded
+        data = load_py(StringIO(definition))
+        solver_data = dict(
+            (k, data[k]) for k in SqlitePackageResource.light_keys if k in data
+        )
+
+        try:
+            solver_data = json.dumps(solver_data)
+        except (TypeError, ValueError):
+            solver_data = None  # not plain data
+
+        conn.execute(
+            "INSERT OR REPLACE INTO packages "
+            "(family, version, definition, solver_data, mtime) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (variant_name, str(variant_version or ''), definition, solver_data,
+             time.time()))
+
+        self._on_changed(conn, variant_name)
+
+        debug_print("Installed variant %s into %s", variant.uri, self)
+        return installed_variant_index
+
+
+def register_plugin():
+    return SqlitePackageRepository